@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""Benchmarks for the llm-history parsing in gantt.py."""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import gantt
+from extract_turn import extract_turn_messages
+from gantt import Turn, epoch_ms, gather_gaps, iter_request_messages, tool_names_from_messages
+from synth_llm_history import SynthSpec, write_history
+
+_MODELS = ("gpt-5", "gpt-5-mini", "claude-sonnet-4-5", "gemini-2.5-pro")
+_TOOLS = ("searchSymbols", "getFileContents", "editFile", "runTests", "answer")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark llm-history parsing in gantt.py.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    tool_names = subparsers.add_parser(
+        "tool-names",
+        help="Compare streaming tool-name extraction with a full JSON decode of request.json.",
+    )
+    tool_names.add_argument(
+        "requests",
+        nargs="*",
+        type=Path,
+        help="request.json files to measure; a synthetic payload is generated when omitted.",
+    )
+    tool_names.add_argument(
+        "--synthetic-mb",
+        type=float,
+        default=8.0,
+        help="Approximate size of the generated request.json in MiB (default: 8).",
+    )
+    tool_names.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed runs per implementation; the fastest is reported (default: 3).",
+    )
+    tool_names.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON instead of a table.",
+    )
+
+    turn_memory = subparsers.add_parser(
+        "turn-memory",
+        help="Measure the memory held by loaded turns and gaps compared with the previous dataclass layout.",
+    )
+    turn_memory.add_argument(
+        "--turns",
+        type=int,
+        default=1_000_000,
+        help="Number of synthetic turns to build (default: 1000000).",
+    )
+    turn_memory.add_argument(
+        "--turns-per-directory",
+        type=int,
+        default=50,
+        help="Turns per synthetic task directory (default: 50).",
+    )
+    turn_memory.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON instead of a table.",
+    )
+
+    ingest = subparsers.add_parser(
+        "ingest",
+        help="Time load_data, print_debug and extract_turn_messages on synthetic histories of several sizes.",
+    )
+    ingest.add_argument(
+        "--turns",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Total turns per generated history (default: 1000 10000 100000).",
+    )
+    ingest.add_argument(
+        "--turns-per-directory",
+        type=int,
+        default=100,
+        help="Turns per synthetic task directory, and in the Code session extract_turn reads (default: 100).",
+    )
+    ingest.add_argument(
+        "--request-kib",
+        type=float,
+        default=8.0,
+        help="Approximate size of each request.json in KiB (default: 8).",
+    )
+    ingest.add_argument(
+        "--log-kib",
+        type=float,
+        default=2.0,
+        help="Approximate size of each response .log in KiB (default: 2).",
+    )
+    ingest.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for load_data (default: 1).",
+    )
+    ingest.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Timed runs per measurement; the fastest is reported (default: 1).",
+    )
+    ingest.add_argument(
+        "--work-dir",
+        type=Path,
+        help=(
+            "Generate histories here and keep them, replacing any turns-N tree left by an earlier run;"
+            " a temporary directory is used and removed when omitted."
+        ),
+    )
+    ingest.add_argument(
+        "--output",
+        type=Path,
+        help="Write the results as JSON to this file, for diffing between commits.",
+    )
+    ingest.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON instead of a table.",
+    )
+    return parser
+
+
+def _best_seconds(function: Callable[[], Any], repeat: int) -> float:
+    best_seconds = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best_seconds = elapsed if best_seconds is None else min(best_seconds, elapsed)
+    return round(best_seconds or 0.0, 6)
+
+
+def _bench_ingest_size(work_dir: Path, turn_count: int, args: argparse.Namespace) -> dict[str, Any]:
+    turn_count = max(1, turn_count)
+    turns_per_directory = max(1, args.turns_per_directory)
+    # the Code session extract_turn reads takes whatever the full Ask/Search directories leave,
+    # so the history holds exactly turn_count turns
+    directories = (turn_count - 1) // turns_per_directory
+    spec = SynthSpec(
+        directories=directories,
+        turns_per_directory=turns_per_directory,
+        request_bytes=int(args.request_kib * 1024),
+        log_bytes=int(args.log_kib * 1024),
+        optypes=("Ask", "Search"),
+        code_session_turns=turn_count - directories * turns_per_directory,
+    )
+    worktree = work_dir / f"turns-{turn_count}"
+    if worktree.exists():
+        shutil.rmtree(worktree)
+    started = time.perf_counter()
+    summary = write_history(worktree, spec)
+    generate_seconds = time.perf_counter() - started
+
+    history_root = summary.history_root
+    catalog = gantt.HistoryCatalog.scan(history_root)
+    day_start, day_end = catalog.first_timestamp(), catalog.last_timestamp()
+
+    def load(use_index: bool) -> tuple[list[Turn], list[Any]]:
+        return gantt.load_data(history_root, day_start, day_end, use_index=use_index, jobs=args.jobs)
+
+    cold_seconds = _best_seconds(lambda: load(False), args.repeat)
+    load(True)
+    warm_seconds = _best_seconds(lambda: load(True), args.repeat)
+    turns, _ = load(True)
+
+    def debug() -> None:
+        with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+            gantt.print_debug(gantt.directory_turn_groups(turns))
+
+    middle_turn = (spec.code_session_turns + 1) // 2
+    return {
+        "turns": summary.turns,
+        "directories": summary.directories,
+        "files": summary.files,
+        "bytes": summary.bytes_written,
+        "generate_seconds": round(generate_seconds, 6),
+        "load_data_cold_seconds": cold_seconds,
+        "load_data_indexed_seconds": warm_seconds,
+        "print_debug_seconds": _best_seconds(debug, args.repeat),
+        "extract_turn_seconds": _best_seconds(lambda: extract_turn_messages(worktree, middle_turn), args.repeat),
+    }
+
+
+def _bench_ingest(args: argparse.Namespace) -> dict[str, Any]:
+    results: list[dict[str, Any]] = []
+    with contextlib.ExitStack() as stack:
+        work_dir = args.work_dir or Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        work_dir.mkdir(parents=True, exist_ok=True)
+        for turn_count in args.turns:
+            results.append(_bench_ingest_size(work_dir, turn_count, args))
+    return {
+        "python": platform.python_version(),
+        "numpy": gantt.np is not None,
+        "jobs": args.jobs,
+        "request_kib": args.request_kib,
+        "log_kib": args.log_kib,
+        "results": results,
+    }
+
+
+def _format_ingest(result: dict[str, Any]) -> str:
+    columns = (
+        ("turns", "turns", 8, "d"),
+        ("MiB", "bytes", 8, ".1f"),
+        ("generate", "generate_seconds", 9, ".3f"),
+        ("load cold", "load_data_cold_seconds", 10, ".3f"),
+        ("load index", "load_data_indexed_seconds", 11, ".3f"),
+        ("debug", "print_debug_seconds", 8, ".3f"),
+        ("extract", "extract_turn_seconds", 8, ".3f"),
+    )
+    lines = [" ".join(f"{title:>{width}}" for title, _, width, _ in columns)]
+    for measured in result["results"]:
+        cells = []
+        for _, key, width, spec in columns:
+            value = measured[key] / (1024 * 1024) if key == "bytes" else measured[key]
+            cells.append(f"{value:>{width}{spec}}")
+        lines.append(" ".join(cells))
+    return "\n".join(lines)
+
+
+@dataclass
+class _DictTurn:
+    # the layout Turn had before it was slotted: a __dict__, datetimes, a Path per log and a list
+    directory_name: str
+    optype: str
+    row_label: str
+    request_index: str
+    request_ts: datetime
+    response_ts: datetime
+    model: str | None
+    log_path: Path | None
+    log_ts: datetime | None
+    service_tier: str | None
+    input_tokens: int
+    cached_input_tokens: int
+    output_tokens: int
+    tools: list[str]
+
+
+@dataclass
+class _DictGap:
+    from_request: str
+    to_request: str
+    directory_name: str
+    optype: str
+    start: datetime
+    end: datetime
+    turn_duration_ms: int
+    tools: list[str]
+
+
+def _synthetic_turn_fields(turn_count: int, turns_per_directory: int) -> Any:
+    started = datetime(2024, 5, 1, 0, 0, 0)
+    root = Path("/history/llm-history")
+    directory = root
+    for position in range(turn_count):
+        directory_number, turn_number = divmod(position, turns_per_directory)
+        if turn_number == 0:
+            directory = root / f"2024-05-01-00-00-00 Code task {directory_number}"
+        seconds = position * 7
+        request_ts = started + timedelta(seconds=seconds)
+        yield {
+            # str() and join copies mimic the fresh strings that regex groups and json.loads produce
+            "directory": directory,
+            "optype": str("Code"),
+            "row_label": f"Code task{directory_number % 10}",
+            "request_index": f"{turn_number + 1:03d}",
+            "request_ts": request_ts,
+            "response_ts": request_ts + timedelta(seconds=5),
+            "model": "".join(_MODELS[position % len(_MODELS)]),
+            "log_name": f"{seconds // 3600 % 24:02d}-{seconds // 60 % 60:02d}.{seconds % 60:02d} {turn_number + 1:03d}-Response.log",
+            "tools": ["".join(tool) for tool in _TOOLS[: position % 3]],
+        }
+
+
+def _build_compact_turns(turn_count: int, turns_per_directory: int) -> list[Turn]:
+    turns: list[Turn] = []
+    directory = None
+    for fields in _synthetic_turn_fields(turn_count, turns_per_directory):
+        if directory != fields["directory"]:
+            directory = fields["directory"]
+            directory_name = sys.intern(directory.name)
+        turns.append(
+            Turn(
+                directory_name=directory_name,
+                optype=sys.intern(fields["optype"]),
+                row_label=sys.intern(fields["row_label"]),
+                request_index=sys.intern(fields["request_index"]),
+                request_ms=epoch_ms(fields["request_ts"]),
+                response_ms=epoch_ms(fields["response_ts"]),
+                model=sys.intern(fields["model"]),
+                directory_path=directory,
+                log_name=fields["log_name"],
+                log_ms=epoch_ms(fields["response_ts"]),
+                service_tier=None,
+                input_tokens=12_000,
+                cached_input_tokens=8_000,
+                output_tokens=400,
+                tools=tuple(map(sys.intern, fields["tools"])),
+            )
+        )
+    return turns
+
+
+def _build_dict_turns(turn_count: int, turns_per_directory: int) -> list[_DictTurn]:
+    return [
+        _DictTurn(
+            directory_name=fields["directory"].name,
+            optype=fields["optype"],
+            row_label=fields["row_label"],
+            request_index=fields["request_index"],
+            request_ts=fields["request_ts"],
+            response_ts=fields["response_ts"],
+            model=fields["model"],
+            log_path=fields["directory"] / fields["log_name"],
+            log_ts=fields["response_ts"],
+            service_tier=None,
+            input_tokens=12_000,
+            cached_input_tokens=8_000,
+            output_tokens=400,
+            tools=fields["tools"],
+        )
+        for fields in _synthetic_turn_fields(turn_count, turns_per_directory)
+    ]
+
+
+def _dict_gaps(turns: list[_DictTurn]) -> list[_DictGap]:
+    return [
+        _DictGap(
+            from_request=previous.request_index,
+            to_request=following.request_index,
+            directory_name=following.directory_name,
+            optype=following.optype,
+            start=previous.response_ts,
+            end=following.request_ts,
+            turn_duration_ms=int((following.response_ts - following.request_ts).total_seconds() * 1000),
+            tools=following.tools,
+        )
+        for previous, following in zip(turns, turns[1:])
+        if previous.directory_name == following.directory_name
+    ]
+
+
+def _measure_retained(build: Callable[[], tuple[list[Any], list[Any]]]) -> dict[str, Any]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        turns, gaps = build()
+        retained_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result = {
+        "retained_bytes": retained_bytes,
+        "peak_bytes": peak_bytes,
+        "bytes_per_turn": round(retained_bytes / max(1, len(turns)), 1),
+        "turn_count": len(turns),
+        "gap_count": len(gaps),
+    }
+    del turns, gaps
+    return result
+
+
+def _bench_turn_memory(turn_count: int, turns_per_directory: int) -> dict[str, Any]:
+    def compact() -> tuple[list[Any], list[Any]]:
+        turns = _build_compact_turns(turn_count, turns_per_directory)
+        return turns, gather_gaps(turns)
+
+    def dict_layout() -> tuple[list[Any], list[Any]]:
+        turns = _build_dict_turns(turn_count, turns_per_directory)
+        return turns, _dict_gaps(turns)
+
+    return {"turns": turn_count, "compact": _measure_retained(compact), "dataclass_dict": _measure_retained(dict_layout)}
+
+
+def _format_turn_memory(result: dict[str, Any]) -> str:
+    lines = [f"{'layout':<16} {'turns':>10} {'retained MiB':>13} {'peak MiB':>10} {'bytes/turn':>11}"]
+    for layout in ("compact", "dataclass_dict"):
+        measured = result[layout]
+        lines.append(
+            f"{layout:<16} {measured['turn_count']:>10} "
+            f"{measured['retained_bytes'] / (1024 * 1024):>13.1f} {measured['peak_bytes'] / (1024 * 1024):>10.1f} "
+            f"{measured['bytes_per_turn']:>11.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _write_synthetic_request(path: Path, target_bytes: int) -> None:
+    file_body = "\n".join(f'    line {index}: value = "{index}" \\ path\\to\\file' for index in range(200))
+    messages: list[dict[str, Any]] = [{"role": "system", "content": "You are a coding agent."}]
+    size = 0
+    turn = 0
+    while size < target_bytes:
+        turn += 1
+        messages.append(
+            {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [
+                    {
+                        "id": f"call_{turn}",
+                        "type": "function",
+                        "function": {"name": f"tool{turn % 7}", "arguments": json.dumps({"file": f"f{turn}.py"})},
+                    }
+                ],
+            }
+        )
+        messages.append({"role": "tool", "name": f"tool{turn % 7}", "content": file_body})
+        size += len(file_body) + 200
+    path.write_text(json.dumps({"model": "synthetic", "messages": messages}), encoding="utf-8")
+
+
+def _parse_tool_names_streaming(path: Path) -> list[str]:
+    # what parse_tool_names does above gantt.JSON_SCAN_MIN_BYTES, whatever the payload size
+    with path.open("r", encoding="utf-8") as file:
+        return tool_names_from_messages(iter_request_messages(file))
+
+
+def _parse_tool_names_full_decode(path: Path) -> list[str]:
+    with path.open("r", encoding="utf-8") as file:
+        payload = json.load(file)
+    messages = payload.get("messages") if isinstance(payload, dict) else None
+    return tool_names_from_messages(messages) if isinstance(messages, list) else []
+
+
+def _measure(function: Callable[[Path], list[str]], path: Path, repeat: int) -> dict[str, Any]:
+    best_seconds = None
+    result: list[str] = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = function(path)
+        elapsed = time.perf_counter() - started
+        best_seconds = elapsed if best_seconds is None else min(best_seconds, elapsed)
+
+    tracemalloc.start()
+    try:
+        function(path)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": round(best_seconds or 0.0, 6),
+        "peak_bytes": peak_bytes,
+        "tool_count": len(result),
+    }
+
+
+def _bench_tool_names(paths: list[Path], repeat: int) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for path in paths:
+        streaming = _measure(_parse_tool_names_streaming, path, repeat)
+        full_decode = _measure(_parse_tool_names_full_decode, path, repeat)
+        if streaming["tool_count"] != full_decode["tool_count"]:
+            raise ValueError(f"tool names differ between implementations for {path}")
+        results.append(
+            {
+                "request": str(path),
+                "bytes": path.stat().st_size,
+                "streaming": streaming,
+                "full_decode": full_decode,
+            }
+        )
+    return results
+
+
+def _format_tool_names(results: list[dict[str, Any]]) -> str:
+    lines = [f"{'request':<40} {'MiB':>8} {'impl':<12} {'seconds':>10} {'peak MiB':>10}"]
+    for result in results:
+        name = Path(result["request"]).name[-40:]
+        size_mib = result["bytes"] / (1024 * 1024)
+        for impl in ("streaming", "full_decode"):
+            measured = result[impl]
+            lines.append(
+                f"{name:<40} {size_mib:>8.2f} {impl:<12} {measured['seconds']:>10.4f} "
+                f"{measured['peak_bytes'] / (1024 * 1024):>10.2f}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None, stdout: object | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    output_stream = stdout if stdout is not None else sys.stdout
+
+    if args.command == "ingest":
+        result = _bench_ingest(args)
+        if args.output is not None:
+            args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        if args.json:
+            print(json.dumps(result, indent=2), file=output_stream)
+        else:
+            print(_format_ingest(result), file=output_stream)
+        return 0
+
+    if args.command == "turn-memory":
+        result = _bench_turn_memory(args.turns, max(1, args.turns_per_directory))
+        if args.json:
+            print(json.dumps(result, indent=2), file=output_stream)
+        else:
+            print(_format_turn_memory(result), file=output_stream)
+        return 0
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = list(args.requests)
+        if not paths:
+            synthetic = Path(temp_dir) / "00-00.00 001-request.json"
+            _write_synthetic_request(synthetic, int(args.synthetic_mb * 1024 * 1024))
+            paths = [synthetic]
+        results = _bench_tool_names(paths, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2), file=output_stream)
+    else:
+        print(_format_tool_names(results), file=output_stream)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
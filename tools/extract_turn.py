@@ -68,7 +68,7 @@ def _resolve_worktree_path(worktree: Path) -> Path:
     raise FileNotFoundError(f"worktree path does not exist: {resolved}")
 
 
-def _resolve_worktree_reference(path: Path) -> Path:
+def resolve_worktree_reference(path: Path) -> Path:
     if path.suffix != ".json" or not path.is_file():
         return _resolve_worktree_path(path)
 
@@ -442,7 +442,7 @@ def extract_turn_messages(worktree: Path, turn: int) -> dict[str, Any]:
     if turn < 1:
         raise ValueError("turn must be a positive integer")
 
-    location = _resolve_worktree_reference(worktree)
+    location = resolve_worktree_reference(worktree)
     if not location.is_dir() and location.suffix != ".zip":
         raise ValueError(f"unsupported worktree location: {location}")
 
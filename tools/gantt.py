@@ -10,17 +10,48 @@
 from __future__ import annotations
 
 import argparse
+import colorsys
+import fnmatch
+import glob
+import gzip
+import hashlib
+import heapq
+import html
+import io
 import json
+import math
+import mmap
+import multiprocessing
 import os
 import re
-from dataclasses import dataclass
-from collections import defaultdict
+import stat
+import sys
+import threading
+import time
+import zipfile
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from collections import OrderedDict, defaultdict
+from itertools import accumulate, count, repeat
+from operator import attrgetter, itemgetter
+from array import array
 from urllib.error import HTTPError, URLError
 from urllib.parse import quote_plus
 from urllib.request import Request, urlopen
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+# worktree references resolve exactly as extract_turn.py resolves them, including the
+# brokkbench-archive fallback for cleaned-up benchmark worktrees
+from extract_turn import resolve_worktree_reference
+
+try:
+    import numpy as np
+except ImportError:  # optional; cost aggregation falls back to a single pure-Python pass
+    np = None
 
 
 DIR_RE = re.compile(
@@ -34,6 +65,63 @@ FILE_RE = re.compile(
 
 BROKK_PROXY_URL = "https://proxy.brokk.ai"
 DEFAULT_HISTORY_PATH = str(Path.home() / "Projects" / "brokk" / ".brokk" / "llm-history")
+HISTORY_INDEX_FILENAME = ".gantt-index.jsonl"
+HISTORY_INDEX_VERSION = 1
+# the index is rewritten once it holds more superseded lines than this and than live ones
+HISTORY_INDEX_MIN_STALE_LINES = 256
+PRICING_CACHE_FILENAME = "model-info.json"
+DEFAULT_PRICING_TTL_HOURS = 24.0
+# Brokk writes the metadata section last, so it is almost always inside this tail window
+LOG_TAIL_WINDOW_BYTES = 64 * 1024
+FOLLOW_POLL_MS = 2000
+HIT_GRID_CELL_PX = 64
+ZOOM_STEP = 1.25
+MAX_PIXELS_PER_SECOND = 400.0
+QT_MAX_WIDGET_SIZE = 16_777_215
+# turns narrower than this are folded into per-column density buckets
+LOD_MIN_TURN_PX = 4
+LOD_BUCKET_PX = 6
+LOD_MIN_LABEL_PX = 24
+AXIS_TICK_MIN_SPACING_PX = 90
+AXIS_TICK_STEPS_SECONDS = (1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400)
+# chart geometry shared by the Qt canvas and the headless --render output
+CHART_LEFT_MARGIN = 130
+CHART_RIGHT_MARGIN = 30
+CHART_BOTTOM_MARGIN = 40
+CHART_ROW_HEIGHT = 44
+CHART_BAR_HEIGHT = 14
+DEFAULT_RENDER_PLOT_WIDTH = 1600
+# the renderer has no font metrics, so text widths are estimated from this per-character advance
+RENDER_CHAR_WIDTH_PX = 7
+# --follow stops listing a task directory once it has been quiet for this long
+FOLLOW_HOT_SECONDS = 15 * 60
+# quiet directories only get a single stat every this many polls, to catch agents that resume
+FOLLOW_COLD_CHECK_POLLS = 15
+TOOL_STATS_RELATIVE_ACCURACY = 0.01
+PERF_TREND_BUCKETS = 8
+# a turn whose cached share of the prompt falls by at least this much versus the previous turn
+# in the same directory is reported as a cache drop
+CACHE_DROP_THRESHOLD = 0.3
+LOG_METADATA_MARKER_RE = re.compile(rb"\n[ \t\r\f\v]*## metadata[ \t\r\f\v]*(?:\n|$)")
+# same headings extract_turn.py splits on; other "## " lines are markdown inside a section
+LOG_SECTION_HEADER_RE = re.compile(
+    rb"^## (reasoningContent|text|toolExecutionRequests|metadata)[ \t\r\f\v]*(?:\n|$)", re.MULTILINE
+)
+# error logs carry the failure between this line and the first section heading
+LOG_RESPONSE_HEADER_RE = re.compile(rb"^[ \t]*# Response[^\n]*(?:\n|$)", re.MULTILINE)
+LOG_VIEWER_PAGE_BYTES = 256 * 1024
+# opening another log past this many windows closes the least recently opened one
+LOG_VIEWER_MAX_DIALOGS = 8
+JSON_SCAN_CHUNK_CHARS = 64 * 1024
+# below this json.load is faster than the pure-Python scanner; above it decoding the whole
+# payload costs more memory than the scan costs time
+JSON_SCAN_MIN_BYTES = 8 * 1024 * 1024
+JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+JSON_STRING_BODY_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+JSON_STRUCTURE_RE = re.compile(r'[^"{}\[\]]*')
+JSON_SCALAR_RE = re.compile(r"[^\s,:\]}]*")
+
+
 @dataclass(frozen=True)
 class PriceBand:
     min_tokens_inclusive: int
@@ -47,6 +135,7 @@ class PriceBand:
 
 
 MAX_TIER_TOKENS = 10**18
+LONG_CONTEXT_THRESHOLD_TOKENS = 200_000
 
 
 @dataclass(frozen=True)
@@ -57,34 +146,227 @@ class ParsedEntry:
     suffix: str
 
 
-@dataclass
+@dataclass(frozen=True)
+class TurnFilter:
+    # Each predicate is checked as early as the data it needs is known: optype from the directory
+    # name before the directory is listed, duration from the file name timestamps before any
+    # file is opened, model from the log tail before request.json is read, and tools last.
+    optypes: Optional[frozenset] = None
+    models: Optional[Tuple[str, ...]] = None
+    min_duration_ms: int = 0
+    tools: Optional[frozenset] = None
+
+    @property
+    def per_turn(self) -> bool:
+        return bool(self.models or self.min_duration_ms > 0 or self.tools)
+
+    def accepts_optype(self, optype: str) -> bool:
+        return not self.optypes or optype.lower() in self.optypes
+
+    def accepts_directory(self, directory_name: str) -> bool:
+        if not self.optypes:
+            return True
+        match = DIR_RE.match(directory_name)
+        return match is not None and self.accepts_optype(match.group("optype"))
+
+    def accepts_duration(self, duration_ms: int) -> bool:
+        return duration_ms >= self.min_duration_ms
+
+    def accepts_model(self, model: Optional[str]) -> bool:
+        if not self.models:
+            return True
+        return model is not None and any(fnmatch.fnmatchcase(model, pattern) for pattern in self.models)
+
+    def accepts_tools(self, tools: Sequence[str]) -> bool:
+        return not self.tools or not self.tools.isdisjoint(tools)
+
+    def accepts(self, turn: Turn) -> bool:
+        return (
+            self.accepts_optype(turn.optype)
+            and self.accepts_duration(turn.response_ms - turn.request_ms)
+            and self.accepts_model(turn.model)
+            and self.accepts_tools(turn.tools)
+        )
+
+
+def turn_filter_from_args(args: argparse.Namespace) -> Optional[TurnFilter]:
+    turn_filter = TurnFilter(
+        optypes=frozenset(optype.lower() for optype in args.optype) if args.optype else None,
+        models=tuple(args.model) if args.model else None,
+        min_duration_ms=int(args.min_duration * 1000),
+        tools=frozenset(args.tool) if args.tool else None,
+    )
+    return turn_filter if turn_filter.optypes or turn_filter.per_turn else None
+
+
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+
+def epoch_ms(value: datetime) -> int:
+    # history timestamps are naive local times, so this is a naive offset rather than a Unix time
+    return (value - EPOCH) // MILLISECOND
+
+
+def datetime_from_epoch_ms(value: int) -> datetime:
+    return EPOCH + timedelta(milliseconds=value)
+
+
+def intern_optional(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else None
+
+
+@dataclass(slots=True)
 class Turn:
+    # Turns are kept compact for very large histories: naive epoch-ms timestamps instead of
+    # datetimes, interned strings, a tools tuple and one Path shared by the whole directory.
     directory_name: str
     optype: str
     row_label: str
     request_index: str
-    request_ts: datetime
-    response_ts: datetime
+    request_ms: int
+    response_ms: int
     model: Optional[str]
-    log_path: Optional[Path]
-    log_ts: Optional[datetime]
+    directory_path: Path
+    log_name: Optional[str]
+    log_ms: Optional[int]
     service_tier: Optional[str]
     input_tokens: int
     cached_input_tokens: int
     output_tokens: int
-    tools: List[str]
+    tools: Tuple[str, ...]
+    # set when a per-turn filter dropped the request just before this one in its directory, so
+    # the idle time in between is not reported as a gap
+    follows_filtered: bool = False
+
+    @property
+    def request_ts(self) -> datetime:
+        return datetime_from_epoch_ms(self.request_ms)
+
+    @property
+    def response_ts(self) -> datetime:
+        return datetime_from_epoch_ms(self.response_ms)
+
+    @property
+    def log_ts(self) -> Optional[datetime]:
+        return datetime_from_epoch_ms(self.log_ms) if self.log_ms is not None else None
+
+    @property
+    def log_path(self) -> Optional[Path]:
+        return self.directory_path / self.log_name if self.log_name is not None else None
+
+
+@dataclass
+class IngestStats:
+    jobs: int = 1
+    directory_count: int = 0
+    cached_directory_count: int = 0
+    wall_ms: float = 0.0
+    task_ms: float = 0.0
+
+    @property
+    def speedup(self) -> Optional[float]:
+        if self.wall_ms <= 0 or self.task_ms <= 0:
+            return None
+        return self.task_ms / self.wall_ms
 
 
 @dataclass
+class StageTotals:
+    wall_ms: float = 0.0
+    bytes_read: int = 0
+    items: int = 0
+    calls: int = 0
+
+
+class StageProfiler:
+    # Wall time, bytes read and item counts per ingestion stage for --profile. Worker processes
+    # fill their own profiler and the parent merges it, so parallel stage times add up CPU time
+    # across workers rather than elapsed time.
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageTotals] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageTotals]:
+        totals = self.stages.setdefault(name, StageTotals())
+        started = time.perf_counter()
+        try:
+            yield totals
+        finally:
+            totals.wall_ms += (time.perf_counter() - started) * 1000
+            totals.calls += 1
+
+    def merge(self, other: StageProfiler) -> None:
+        for name, other_totals in other.stages.items():
+            totals = self.stages.setdefault(name, StageTotals())
+            totals.wall_ms += other_totals.wall_ms
+            totals.bytes_read += other_totals.bytes_read
+            totals.items += other_totals.items
+            totals.calls += other_totals.calls
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "type": "profile",
+            "stages": {
+                name: {
+                    "wall_ms": round(totals.wall_ms, 3),
+                    "bytes_read": totals.bytes_read,
+                    "items": totals.items,
+                    "calls": totals.calls,
+                }
+                for name, totals in self.stages.items()
+            },
+        }
+
+
+@contextmanager
+def profile_stage(profile: Optional[StageProfiler], name: str) -> Iterator[Optional[StageTotals]]:
+    if profile is None:
+        yield None
+        return
+    with profile.stage(name) as totals:
+        yield totals
+
+
+def file_size(path: Path) -> int:
+    if isinstance(path, ArchivePath):
+        return path.size
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def print_profile(profile: StageProfiler) -> None:
+    print("Ingestion profile:")
+    print(f"  {'stage':<16} {'wall ms':>10} {'calls':>8} {'items':>8} {'MiB read':>10}")
+    for name, totals in profile.stages.items():
+        print(
+            f"  {name:<16} {totals.wall_ms:>10.1f} {totals.calls:>8} {totals.items:>8} "
+            f"{totals.bytes_read / (1024 * 1024):>10.2f}"
+        )
+
+
+@dataclass(slots=True)
 class GapAnnotation:
     from_request: str
     to_request: str
     directory_name: str
     optype: str
-    start: datetime
-    end: datetime
+    start_ms: int
+    end_ms: int
     turn_duration_ms: int
-    tools: List[str]
+    # shared with the turn that follows the gap, which is safe because it is immutable
+    tools: Tuple[str, ...]
+
+    @property
+    def start(self) -> datetime:
+        return datetime_from_epoch_ms(self.start_ms)
+
+    @property
+    def end(self) -> datetime:
+        return datetime_from_epoch_ms(self.end_ms)
 
 
 def parse_args() -> argparse.Namespace:
@@ -106,8 +388,40 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--history",
-        default=DEFAULT_HISTORY_PATH,
-        help="History directory path (default: ~/Projects/brokk/.brokk/llm-history)",
+        action="append",
+        help=(
+            "History directory, worktree directory or .zip archive, or worktree reference JSON; repeat it or use a "
+            "glob pattern to merge several roots into one timeline (default: ~/Projects/brokk/.brokk/llm-history)"
+        ),
+    )
+    parser.add_argument(
+        "--since",
+        help="Start of an explicit range that may span days, as YYYY-MM-DD or YYYY-MM-DD HH:MM[:SS]; replaces --day and start",
+    )
+    parser.add_argument(
+        "--until",
+        help="End of the --since range, as YYYY-MM-DD (inclusive) or YYYY-MM-DD HH:MM[:SS]; defaults to the last history directory",
+    )
+    parser.add_argument(
+        "--optype",
+        action="append",
+        help="Only load task directories of this optype, e.g. Code; repeat for several (skips other directories unread)",
+    )
+    parser.add_argument(
+        "--model",
+        action="append",
+        help="Only keep turns whose model matches this name or glob pattern; repeat for several",
+    )
+    parser.add_argument(
+        "--min-duration",
+        type=float,
+        default=0.0,
+        help="Only keep turns lasting at least this many seconds, judged from file timestamps before reading them",
+    )
+    parser.add_argument(
+        "--tool",
+        action="append",
+        help="Only keep turns whose request carries a call to this tool; repeat to accept any of several",
     )
     parser.add_argument(
         "--day",
@@ -124,6 +438,68 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Fetch model pricing from proxy and report estimated costs",
     )
+    parser.add_argument(
+        "--pricing-file",
+        help="Read model pricing for --show-costs from a saved /model/info response instead of the proxy",
+    )
+    parser.add_argument(
+        "--pricing-ttl",
+        type=float,
+        default=DEFAULT_PRICING_TTL_HOURS,
+        help=f"Hours before the cached model pricing is refreshed from the proxy (default: {DEFAULT_PRICING_TTL_HOURS:g})",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help=f"Do not read or update the {HISTORY_INDEX_FILENAME} index under the history root",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep the chart open and add new turns as they are written to the history",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes used to parse history directories (default: 1; 0 uses every CPU)",
+    )
+    parser.add_argument(
+        "--tool-stats",
+        action="store_true",
+        help="Report count, total and p50/p90/p99/max gap duration per tool name and do not launch gui",
+    )
+    parser.add_argument(
+        "--model-perf",
+        action="store_true",
+        help="Report output tokens/sec, latency by prompt size and throughput trend per model and tier and do not launch gui",
+    )
+    parser.add_argument(
+        "--cache-report",
+        action="store_true",
+        help="Report prompt-cache hit ratio per turn, directory and model, flag sharp drops and estimate their cost with --show-costs, and do not launch gui",
+    )
+    parser.add_argument(
+        "--export-trace",
+        metavar="PATH",
+        help="Write turns and gaps as Chrome trace events (JSON, or gzip with a .gz suffix) for Perfetto or chrome://tracing and do not launch gui",
+    )
+    parser.add_argument(
+        "--render",
+        metavar="PATH",
+        help="Render the chart without a display to an .svg file, or a standalone page for .html, and do not launch gui",
+    )
+    parser.add_argument(
+        "--render-width",
+        type=int,
+        default=DEFAULT_RENDER_PLOT_WIDTH,
+        help=f"Plot width in pixels for --render (default: {DEFAULT_RENDER_PLOT_WIDTH})",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report wall time, bytes read and item counts for each ingestion stage",
+    )
     return parser.parse_args()
 
 
@@ -145,6 +521,17 @@ def parse_time(raw: str) -> datetime.time:
     raise ValueError("start/end must be HH:MM:SS or HH-MM-SS")
 
 
+def parse_datetime_bound(raw: str, end_of_day: bool) -> datetime:
+    # a bare date means the start of that day, or its end when it bounds the range from above
+    try:
+        parsed = datetime.fromisoformat(raw.strip())
+    except ValueError as exc:
+        raise SystemExit(f"Expected YYYY-MM-DD or YYYY-MM-DD HH:MM[:SS], got {raw!r}") from exc
+    if end_of_day and len(raw.strip()) == len("YYYY-MM-DD"):
+        return datetime.combine(parsed.date(), datetime.max.time())
+    return parsed
+
+
 def parse_time_or_none(raw: Optional[str]) -> Optional[datetime.time]:
     if raw is None:
         return None
@@ -356,8 +743,8 @@ def pricing_bands_from_source(
     )
 
     return [
-        PriceBand(0, 199_999, input_cost, cached_cost, output_cost),
-        PriceBand(200_000, MAX_TIER_TOKENS, above_input, above_cached, above_output),
+        PriceBand(0, LONG_CONTEXT_THRESHOLD_TOKENS - 1, input_cost, cached_cost, output_cost),
+        PriceBand(LONG_CONTEXT_THRESHOLD_TOKENS, MAX_TIER_TOKENS, above_input, above_cached, above_output),
     ]
 
 
@@ -392,11 +779,11 @@ def pricing_bands_for_model(info: Dict[str, Any], service_tier: Optional[str] =
     return pricing_bands_from_source(info)
 
 
-def cost_for_turn(
+def price_band_for_turn(
     turn: Turn,
     model_info_map: Dict[str, Dict[str, Any]],
     cached_bands: Dict[Tuple[str, str], List[PriceBand]],
-) -> Optional[float]:
+) -> Optional[PriceBand]:
     model_name = turn.model
     if not model_name:
         return None
@@ -414,18 +801,13 @@ def cost_for_turn(
         return None
 
     prompt_tokens = turn.input_tokens + turn.cached_input_tokens
-    band_for_prompt = next(
+    return next(
         (band for band in bands if band.contains(prompt_tokens)),
         bands[-1],
     )
-    return (
-        (turn.input_tokens * band_for_prompt.input_cost_per_token)
-        + (turn.cached_input_tokens * band_for_prompt.cached_input_cost_per_token)
-        + (turn.output_tokens * band_for_prompt.output_cost_per_token)
-    )
 
 
-def fetch_model_info(proxy_url: str, proxy_setting: str, api_key: Optional[str]) -> Dict[str, Any]:
+def fetch_model_info_payload(proxy_url: str, proxy_setting: str, api_key: Optional[str]) -> Optional[Dict[str, Any]]:
     request_url = f"{proxy_url}/model/info"
     request_urls: List[str] = [request_url]
     headers: Dict[str, str] = {}
@@ -462,12 +844,12 @@ def fetch_model_info(proxy_url: str, proxy_setting: str, api_key: Optional[str])
                 ):
                     continue
                 print(f"Failed to fetch model info from {url}: HTTP {exc.code}")
-                return {}
+                return None
             except URLError as exc:
                 print(f"Failed to fetch model info from {url}: {exc}")
-                return {}
+                return None
             except json.JSONDecodeError:
-                return {}
+                return None
 
             if payload is not None and isinstance(payload, dict):
                 break
@@ -478,11 +860,17 @@ def fetch_model_info(proxy_url: str, proxy_setting: str, api_key: Optional[str])
     if payload is None:
         if last_code == 401:
             print(f"Failed to fetch model info from {request_urls[-1]}: HTTP 401")
-        return {}
+        return None
 
-    data = payload.get("data") if isinstance(payload, dict) else None
-    if not isinstance(data, list):
+    if not isinstance(payload, dict) or not isinstance(payload.get("data"), list):
         print("/model/info response did not include a data array")
+        return None
+    return payload
+
+
+def model_info_from_payload(payload: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    data = payload.get("data")
+    if not isinstance(data, list):
         return {}
 
     model_info_map: Dict[str, Dict[str, Any]] = {}
@@ -499,85 +887,418 @@ def fetch_model_info(proxy_url: str, proxy_setting: str, api_key: Optional[str])
     return model_info_map
 
 
-def parse_metadata_from_log(log_path: Path) -> Tuple[Optional[str], int, int, int, Optional[str]]:
+def fetch_model_info(proxy_url: str, proxy_setting: str, api_key: Optional[str]) -> Dict[str, Any]:
+    payload = fetch_model_info_payload(proxy_url, proxy_setting, api_key)
+    return model_info_from_payload(payload) if payload is not None else {}
+
+
+def pricing_cache_path() -> Path:
+    cache_root = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_root) / "brokk" / PRICING_CACHE_FILENAME
+
+
+def read_pricing_cache(path: Path) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+    try:
+        with path.open("r", encoding="utf-8") as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None, None
+    if not isinstance(cached, dict):
+        return None, None
+    payload = cached.get("payload")
+    fetched_at = cached.get("fetched_at")
+    if not isinstance(payload, dict) or not isinstance(fetched_at, (int, float)):
+        return None, None
+    return payload, float(fetched_at)
+
+
+def write_pricing_cache(path: Path, payload: Dict[str, Any], fetched_at: float) -> None:
+    temp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with temp_path.open("w", encoding="utf-8") as file:
+            json.dump({"fetched_at": fetched_at, "payload": payload}, file)
+        os.replace(temp_path, path)
+    except OSError as exc:
+        print(f"Failed to write pricing cache {path}: {exc}")
+
+
+def load_pricing_file(path: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        with path.open("r", encoding="utf-8") as file:
+            payload = json.load(file)
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Cannot read pricing file {path}: {exc}")
+    if not isinstance(payload, dict) or not isinstance(payload.get("data"), list):
+        raise SystemExit(f"Pricing file {path} is not a /model/info response with a data array")
+    return model_info_from_payload(payload)
+
+
+class ModelPricingSource:
+    # Resolves /model/info pricing for --show-costs from the local cache when it is fresh, and
+    # otherwise refreshes it on a background thread so the proxy round trips overlap history
+    # ingestion. A stale cache still beats no prices when the proxy is unreachable.
+
+    def __init__(self, cache_path: Path, ttl_seconds: float):
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.cached_payload: Optional[Dict[str, Any]] = None
+        self.cached_at: Optional[float] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.refresh: Optional[Future] = None
+
+    def start(self, proxy_url: str, proxy_setting: str, api_key: Optional[str]) -> None:
+        self.cached_payload, self.cached_at = read_pricing_cache(self.cache_path)
+        if self.cached_at is not None and time.time() - self.cached_at <= self.ttl_seconds:
+            return
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.refresh = self.executor.submit(fetch_model_info_payload, proxy_url, proxy_setting, api_key)
+
+    def result(self) -> Dict[str, Dict[str, Any]]:
+        if self.refresh is None:
+            return model_info_from_payload(self.cached_payload) if self.cached_payload is not None else {}
+        try:
+            payload = self.refresh.result()
+        finally:
+            self.executor.shutdown()
+            self.refresh = None
+            self.executor = None
+        if payload is not None:
+            self.cached_payload, self.cached_at = payload, time.time()
+            write_pricing_cache(self.cache_path, payload, self.cached_at)
+        elif self.cached_payload is not None:
+            fetched = datetime.fromtimestamp(self.cached_at).isoformat(timespec="seconds")
+            print(f"Using cached model pricing from {fetched} ({self.cache_path})")
+        return model_info_from_payload(self.cached_payload) if self.cached_payload is not None else {}
+
+
+def metadata_blob_from_tail(tail: bytes, at_file_start: bool) -> Optional[bytes]:
+    # the first line of a mid-file window may be partial, so only trust markers after a newline
+    haystack = (b"\n" + tail) if at_file_start else tail
+    last_match = None
+    for last_match in LOG_METADATA_MARKER_RE.finditer(haystack):
+        pass
+    if last_match is None:
+        return None
+    return haystack[last_match.end() :]
+
+
+def read_log_metadata_blob(log_path: Path, totals: Optional[StageTotals] = None) -> Optional[str]:
+    with log_path.open("rb") as file:
+        # seeking a compressed member to its end and back would inflate it twice, while its
+        # size is already known from the central directory and the seek below only goes forward
+        size = log_path.size if isinstance(log_path, ArchivePath) else file.seek(0, os.SEEK_END)
+        window = min(size, LOG_TAIL_WINDOW_BYTES)
+        file.seek(size - window)
+        blob = metadata_blob_from_tail(file.read(window), at_file_start=window == size)
+        bytes_read = window
+        if blob is None and window < size:
+            file.seek(0)
+            blob_offset = None
+            for line in file:
+                if line.strip() == b"## metadata":
+                    blob_offset = file.tell()
+            bytes_read += size
+            if blob_offset is not None:
+                file.seek(blob_offset)
+                blob = file.read()
+                bytes_read += len(blob)
+    if totals is not None:
+        totals.bytes_read += bytes_read
+    if blob is None:
+        return None
+    return blob.decode("utf-8", errors="replace")
+
+
+def parse_metadata_from_log(
+    log_path: Path,
+    totals: Optional[StageTotals] = None,
+) -> Tuple[Optional[str], int, int, int, Optional[str]]:
     try:
-        lines = log_path.read_text(encoding="utf-8", errors="replace").splitlines()
+        metadata_blob = read_log_metadata_blob(log_path, totals)
     except Exception:
         return None, 0, 0, 0, None
+    if metadata_blob is None:
+        return None, 0, 0, 0, None
 
-    for index, line in enumerate(lines):
-        if line.strip() == "## metadata":
-            metadata_blob = "\n".join(lines[index + 1 :])
-            start = metadata_blob.find("{")
-            if start < 0:
-                break
-            end = metadata_blob.rfind("}")
-            if end <= start:
-                break
-            try:
-                metadata = json.loads(metadata_blob[start : end + 1])
-            except (ValueError, json.JSONDecodeError):
-                break
-            if not isinstance(metadata, dict):
-                break
+    start = metadata_blob.find("{")
+    if start < 0:
+        return None, 0, 0, 0, None
+    end = metadata_blob.rfind("}")
+    if end <= start:
+        return None, 0, 0, 0, None
+    try:
+        metadata = json.loads(metadata_blob[start : end + 1])
+    except (ValueError, json.JSONDecodeError):
+        return None, 0, 0, 0, None
+    if not isinstance(metadata, dict):
+        return None, 0, 0, 0, None
 
-            model_name = metadata.get("modelName")
-            if not isinstance(model_name, str) or not model_name:
-                model_name = None
+    model_name = metadata.get("modelName")
+    if not isinstance(model_name, str) or not model_name:
+        model_name = None
 
-            service_tier = metadata.get("serviceTier")
-            if not isinstance(service_tier, str):
-                service_tier = metadata.get("service_tier")
+    service_tier = metadata.get("serviceTier")
+    if not isinstance(service_tier, str):
+        service_tier = metadata.get("service_tier")
 
-            return (
-                model_name,
-                parse_int_value(metadata.get("inputTokens")),
-                parse_int_value(metadata.get("cachedInputTokens")),
-                parse_int_value(metadata.get("outputTokens")),
-                service_tier if isinstance(service_tier, str) else None,
-            )
+    return (
+        model_name,
+        parse_int_value(metadata.get("inputTokens")),
+        parse_int_value(metadata.get("cachedInputTokens")),
+        parse_int_value(metadata.get("outputTokens")),
+        service_tier if isinstance(service_tier, str) else None,
+    )
 
-    return None, 0, 0, 0, None
 
+@dataclass
+class PriceTable:
+    # one row per (model, service tier) seen in the turns; the rate below/above the threshold
+    # comes from the first and last price band, which is all pricing_bands_from_source builds
+    priced: List[bool]
+    thresholds: List[int]
+    low_rates: List[Tuple[float, float, float]]
+    high_rates: List[Tuple[float, float, float]]
 
-def compute_model_usage(
+
+def build_price_table(
+    price_keys: Sequence[Tuple[Optional[str], Optional[str]]],
+    model_info_map: Dict[str, Dict[str, Any]],
+) -> PriceTable:
+    table = PriceTable([], [], [], [])
+    for model_name, service_tier in price_keys:
+        info = model_info_map.get(model_name) if model_name else None
+        bands = pricing_bands_for_model(info, service_tier) if isinstance(info, dict) else []
+        if not bands:
+            table.priced.append(False)
+            table.thresholds.append(MAX_TIER_TOKENS)
+            table.low_rates.append((0.0, 0.0, 0.0))
+            table.high_rates.append((0.0, 0.0, 0.0))
+            continue
+        low, high = bands[0], bands[-1]
+        table.priced.append(True)
+        table.thresholds.append(high.min_tokens_inclusive if len(bands) > 1 else MAX_TIER_TOKENS)
+        table.low_rates.append((low.input_cost_per_token, low.cached_input_cost_per_token, low.output_cost_per_token))
+        table.high_rates.append((high.input_cost_per_token, high.cached_input_cost_per_token, high.output_cost_per_token))
+    return table
+
+
+@dataclass
+class UsageAggregate:
+    model_tokens: Dict[str, Dict[str, int]]
+    model_costs: Dict[str, float]
+    model_cost_missing: Dict[str, bool]
+    directory_tokens: Dict[str, Dict[str, int]]
+    directory_costs: Dict[str, float]
+    directory_cost_missing: Dict[str, bool]
+    # aligned with the turns passed in; None where the turn has no model or no known price
+    turn_costs: List[Optional[float]]
+
+
+def aggregate_usage(
     turns: Sequence[Turn],
     model_info_map: Optional[Dict[str, Dict[str, Any]]] = None,
     show_costs: bool = False,
-) -> Tuple[Dict[str, Dict[str, int]], Dict[str, float], Dict[str, bool]]:
-    by_model: Dict[str, Dict[str, int]] = defaultdict(lambda: {"input": 0, "cached": 0, "output": 0})
-    by_model_cost: Dict[str, float] = defaultdict(float)
-    cost_cache: Dict[Tuple[str, str], List[PriceBand]] = {}
-    cost_missing: Dict[str, bool] = {}
+) -> UsageAggregate:
+    # Packs the token counts into int64 columns plus small integer codes for model, pricing key
+    # and directory, then prices and totals every turn in one pass: vectorised with NumPy when it
+    # is installed, otherwise a single loop over the packed columns.
+    models = list(map(attrgetter("model"), turns))
+    tiers = list(map(attrgetter("service_tier"), turns))
+    directories = list(map(attrgetter("directory_name"), turns))
+    # codes are assigned over the distinct values only, so the per-turn work stays in C
+    model_codes: Dict[str, int] = {}
+    model_code_by_raw = {raw: model_codes.setdefault(raw or "<missing>", len(model_codes)) for raw in dict.fromkeys(models)}
+    directory_codes = {name: code for code, name in enumerate(dict.fromkeys(directories))}
+    price_codes: Dict[Tuple[Optional[str], str], int] = {}
+    price_keys: List[Tuple[Optional[str], Optional[str]]] = []
+    price_code_by_raw: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+    for raw_model, raw_tier in dict.fromkeys(zip(models, tiers)):
+        price_key = (raw_model or None, raw_tier or "standard")
+        if price_key not in price_codes:
+            price_codes[price_key] = len(price_keys)
+            price_keys.append((raw_model or None, raw_tier))
+        price_code_by_raw[(raw_model, raw_tier)] = price_codes[price_key]
+
+    model_column = array("q", map(model_code_by_raw.__getitem__, models))
+    directory_column = array("q", map(directory_codes.__getitem__, directories))
+    price_column = array("q", map(price_code_by_raw.__getitem__, zip(models, tiers)))
+    input_column = array("q", map(attrgetter("input_tokens"), turns))
+    cached_column = array("q", map(attrgetter("cached_input_tokens"), turns))
+    output_column = array("q", map(attrgetter("output_tokens"), turns))
+
+    with_costs = show_costs and model_info_map is not None
+    table = build_price_table(price_keys if with_costs else [], model_info_map or {})
+    if np is not None:
+        totals = _aggregate_columns_numpy(
+            table,
+            len(model_codes),
+            len(directory_codes),
+            model_column,
+            directory_column,
+            price_column,
+            input_column,
+            cached_column,
+            output_column,
+            with_costs,
+        )
+    else:
+        totals = _aggregate_columns_python(
+            table,
+            len(model_codes),
+            len(directory_codes),
+            model_column,
+            directory_column,
+            price_column,
+            input_column,
+            cached_column,
+            output_column,
+            with_costs,
+        )
+    model_token_rows, model_cost_rows, directory_token_rows, directory_cost_rows, turn_costs = totals
+
+    model_tokens = {name: model_token_rows[code] for name, code in model_codes.items()}
+    directory_tokens = {name: directory_token_rows[code] for name, code in directory_codes.items()}
+    if not with_costs:
+        return UsageAggregate(model_tokens, {}, {}, directory_tokens, {}, {}, [None] * len(turns))
+
+    model_cost_missing: Dict[str, bool] = {}
+    unpriced_codes: set[int] = set()
+    for (model_name, _), price_code in price_codes.items():
+        if model_name and not table.priced[price_code]:
+            model_cost_missing[model_name] = True
+            unpriced_codes.add(price_code)
+    model_costs = {name: model_cost_rows[code] for name, code in model_codes.items() if name not in model_cost_missing}
+    # a directory with any unpriced turn has no complete cost, like the model it used
+    directory_cost_missing: Dict[str, bool] = {}
+    if unpriced_codes:
+        for directory_name, price_code in zip(directories, price_column):
+            if price_code in unpriced_codes:
+                directory_cost_missing[directory_name] = True
+    directory_costs = {
+        name: directory_cost_rows[code] for name, code in directory_codes.items() if name not in directory_cost_missing
+    }
+    return UsageAggregate(
+        model_tokens, model_costs, model_cost_missing, directory_tokens, directory_costs, directory_cost_missing, turn_costs
+    )
 
-    for turn in turns:
-        model_name = turn.model or "<missing>"
-        by_model[model_name]["input"] += turn.input_tokens
-        by_model[model_name]["cached"] += turn.cached_input_tokens
-        by_model[model_name]["output"] += turn.output_tokens
 
-        if show_costs and model_info_map is not None:
-            cost = cost_for_turn(turn, model_info_map, cost_cache)
-            if cost is None and turn.model not in {None, ""}:
-                cost_missing[model_name] = True
-            elif cost is not None:
-                by_model_cost[model_name] += cost
+def _token_rows(input_totals: Sequence[int], cached_totals: Sequence[int], output_totals: Sequence[int]) -> List[Dict[str, int]]:
+    return [
+        {"input": int(input_total), "cached": int(cached_total), "output": int(output_total)}
+        for input_total, cached_total, output_total in zip(input_totals, cached_totals, output_totals)
+    ]
 
-    if show_costs and model_info_map is not None:
-        return by_model, by_model_cost, cost_missing
-    return by_model, {}, {}
+
+def _aggregate_columns_numpy(
+    table: PriceTable,
+    model_count: int,
+    directory_count: int,
+    model_column: array,
+    directory_column: array,
+    price_column: array,
+    input_column: array,
+    cached_column: array,
+    output_column: array,
+    with_costs: bool,
+) -> Tuple[List[Dict[str, int]], List[float], List[Dict[str, int]], List[float], List[Optional[float]]]:
+    models = np.frombuffer(model_column, dtype=np.int64)
+    directories = np.frombuffer(directory_column, dtype=np.int64)
+    inputs = np.frombuffer(input_column, dtype=np.int64)
+    cached = np.frombuffer(cached_column, dtype=np.int64)
+    outputs = np.frombuffer(output_column, dtype=np.int64)
+
+    def token_totals(codes: Any, count: int) -> List[Dict[str, int]]:
+        sums = [np.bincount(codes, weights=column, minlength=count).round().astype(np.int64) for column in (inputs, cached, outputs)]
+        return _token_rows(*(column.tolist() for column in sums))
+
+    model_tokens = token_totals(models, model_count)
+    directory_tokens = token_totals(directories, directory_count)
+    if not with_costs:
+        return model_tokens, [], directory_tokens, [], []
+
+    prices = np.frombuffer(price_column, dtype=np.int64)
+    priced = np.array(table.priced, dtype=bool)[prices]
+    long_context = (inputs + cached) >= np.array(table.thresholds, dtype=np.int64)[prices]
+    rates = np.where(
+        long_context[:, None],
+        np.array(table.high_rates, dtype=np.float64).reshape(-1, 3)[prices],
+        np.array(table.low_rates, dtype=np.float64).reshape(-1, 3)[prices],
+    )
+    costs = (inputs * rates[:, 0]) + (cached * rates[:, 1]) + (outputs * rates[:, 2])
+    costs[~priced] = 0.0
+    model_costs = np.bincount(models, weights=costs, minlength=model_count).tolist()
+    directory_costs = np.bincount(directories, weights=costs, minlength=directory_count).tolist()
+    turn_costs: List[Optional[float]] = costs.tolist()
+    for position in np.flatnonzero(~priced).tolist():
+        turn_costs[position] = None
+    return model_tokens, model_costs, directory_tokens, directory_costs, turn_costs
+
+
+def _aggregate_columns_python(
+    table: PriceTable,
+    model_count: int,
+    directory_count: int,
+    model_column: array,
+    directory_column: array,
+    price_column: array,
+    input_column: array,
+    cached_column: array,
+    output_column: array,
+    with_costs: bool,
+) -> Tuple[List[Dict[str, int]], List[float], List[Dict[str, int]], List[float], List[Optional[float]]]:
+    model_totals = [[0, 0, 0] for _ in range(model_count)]
+    directory_totals = [[0, 0, 0] for _ in range(directory_count)]
+    model_costs = [0.0] * model_count
+    directory_costs = [0.0] * directory_count
+    turn_costs: List[Optional[float]] = []
+    for model, directory, price, input_tokens, cached_tokens, output_tokens in zip(
+        model_column, directory_column, price_column, input_column, cached_column, output_column
+    ):
+        for row in (model_totals[model], directory_totals[directory]):
+            row[0] += input_tokens
+            row[1] += cached_tokens
+            row[2] += output_tokens
+        if not with_costs:
+            continue
+        if not table.priced[price]:
+            turn_costs.append(None)
+            continue
+        if input_tokens + cached_tokens >= table.thresholds[price]:
+            input_rate, cached_rate, output_rate = table.high_rates[price]
+        else:
+            input_rate, cached_rate, output_rate = table.low_rates[price]
+        cost = (input_tokens * input_rate) + (cached_tokens * cached_rate) + (output_tokens * output_rate)
+        turn_costs.append(cost)
+        model_costs[model] += cost
+        directory_costs[directory] += cost
+
+    def rows(totals: List[List[int]]) -> List[Dict[str, int]]:
+        return _token_rows(*zip(*totals)) if totals else []
+
+    return rows(model_totals), model_costs, rows(directory_totals), directory_costs, turn_costs
+
+
+def compute_model_usage(
+    turns: Sequence[Turn],
+    model_info_map: Optional[Dict[str, Dict[str, Any]]] = None,
+    show_costs: bool = False,
+) -> Tuple[Dict[str, Dict[str, int]], Dict[str, float], Dict[str, bool]]:
+    usage = aggregate_usage(turns, model_info_map=model_info_map, show_costs=show_costs)
+    return usage.model_tokens, usage.model_costs, usage.model_cost_missing
 
 
 def print_model_usage_summary(
     turns: Sequence[Turn],
     model_info_map: Optional[Dict[str, Dict[str, Any]]] = None,
     show_costs: bool = False,
+    usage: Optional[UsageAggregate] = None,
 ) -> None:
-    by_model, by_model_cost, by_model_cost_missing = compute_model_usage(
-        turns,
-        model_info_map=model_info_map,
-        show_costs=show_costs,
-    )
+    if usage is None:
+        usage = aggregate_usage(turns, model_info_map=model_info_map, show_costs=show_costs)
+    by_model = usage.model_tokens
+    by_model_cost = usage.model_costs
+    by_model_cost_missing = usage.model_cost_missing
 
     print("Model token usage:")
     if not by_model:
@@ -659,17 +1380,186 @@ def add_tool_name(values: List[str], seen: set[str], value: Any) -> None:
     values.append(value)
 
 
-def parse_tool_names(payload_path: Path) -> List[str]:
-    try:
-        with payload_path.open("r", encoding="utf-8") as file:
-            payload = json.load(file)
-    except Exception:
-        return []
+class JsonScanner:
+    # Incremental reader for just enough JSON structure to walk the request payload. Values that
+    # are not needed are skipped chunk by chunk without being decoded or held in memory.
+
+    def __init__(self, file: TextIO, chunk_chars: int = JSON_SCAN_CHUNK_CHARS):
+        self.file = file
+        self.chunk_chars = chunk_chars
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self.file.read(self.chunk_chars)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = JSON_WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in JSON payload")
+        self.pos += 1
+
+    def read_string(self, keep: bool = True) -> Optional[str]:
+        self.expect('"')
+        parts: List[str] = []
+        while True:
+            end = JSON_STRING_BODY_RE.match(self.buffer, self.pos).end()
+            if keep:
+                parts.append(self.buffer[self.pos : end])
+            self.pos = end
+            if end < len(self.buffer) and self.buffer[end] == '"':
+                self.pos += 1
+                break
+            # either the buffer ran out or it ends in the middle of an escape sequence
+            if not self._fill():
+                raise ValueError("unterminated string in JSON payload")
+        if not keep:
+            return None
+        raw = "".join(parts)
+        if "\\" not in raw:
+            return raw
+        return json.loads(f'"{raw}"')
+
+    def read_string_or_skip(self) -> Optional[str]:
+        if self.peek() == '"':
+            return self.read_string()
+        self.skip_value()
+        return None
 
-    messages = payload.get("messages")
-    if not isinstance(messages, list):
-        return []
+    def skip_value(self) -> None:
+        char = self.peek()
+        if char == '"':
+            self.read_string(keep=False)
+            return
+        if char in ("{", "["):
+            self._skip_container()
+            return
+        while True:
+            end = JSON_SCALAR_RE.match(self.buffer, self.pos).end()
+            if end < len(self.buffer) or not self._fill():
+                break
+        if end == self.pos:
+            raise ValueError("invalid value in JSON payload")
+        self.pos = end
+
+    def _skip_container(self) -> None:
+        depth = 0
+        while True:
+            self.pos = JSON_STRUCTURE_RE.match(self.buffer, self.pos).end()
+            if self.pos >= len(self.buffer):
+                if not self._fill():
+                    raise ValueError("unterminated container in JSON payload")
+                continue
+            char = self.buffer[self.pos]
+            if char == '"':
+                self.read_string(keep=False)
+                continue
+            self.pos += 1
+            depth += 1 if char in ("{", "[") else -1
+            if depth == 0:
+                return
+
+    def iter_object(self) -> Iterator[str]:
+        # yields each key; the caller must consume the value before advancing
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError("expected ',' or '}' in JSON payload")
+
+    def iter_array(self) -> Iterator[None]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("expected ',' or ']' in JSON payload")
 
+
+def scan_tool_call(scanner: JsonScanner) -> Optional[Dict[str, Any]]:
+    if scanner.peek() != "{":
+        scanner.skip_value()
+        return None
+    tool_call: Dict[str, Any] = {}
+    for key in scanner.iter_object():
+        if key == "name":
+            tool_call["name"] = scanner.read_string_or_skip()
+        elif key == "function" and scanner.peek() == "{":
+            function: Dict[str, Any] = {}
+            for function_key in scanner.iter_object():
+                if function_key == "name":
+                    function["name"] = scanner.read_string_or_skip()
+                else:
+                    scanner.skip_value()
+            tool_call["function"] = function
+        else:
+            scanner.skip_value()
+    return tool_call
+
+
+def scan_request_message(scanner: JsonScanner) -> Optional[Dict[str, Any]]:
+    if scanner.peek() != "{":
+        scanner.skip_value()
+        return None
+    message: Dict[str, Any] = {}
+    for key in scanner.iter_object():
+        if key in ("role", "name"):
+            message[key] = scanner.read_string_or_skip()
+        elif key == "tool_calls" and scanner.peek() == "[":
+            tool_calls: List[Dict[str, Any]] = []
+            for _ in scanner.iter_array():
+                tool_call = scan_tool_call(scanner)
+                if tool_call is not None:
+                    tool_calls.append(tool_call)
+            message["tool_calls"] = tool_calls
+        else:
+            scanner.skip_value()
+    return message
+
+
+def iter_request_messages(file: TextIO) -> Iterator[Dict[str, Any]]:
+    # Yields each entry of the top-level "messages" array reduced to role, name and tool call names.
+    scanner = JsonScanner(file)
+    for key in scanner.iter_object():
+        if key == "messages" and scanner.peek() == "[":
+            for _ in scanner.iter_array():
+                message = scan_request_message(scanner)
+                if message is not None:
+                    yield message
+        else:
+            scanner.skip_value()
+    if scanner.peek():
+        raise ValueError("unexpected trailing data in JSON payload")
+
+
+def tool_names_from_messages(messages: Iterable[Any]) -> List[str]:
     tools: List[str] = []
     seen: set[str] = set()
 
@@ -701,6 +1591,21 @@ def parse_tool_names(payload_path: Path) -> List[str]:
     return tools
 
 
+def parse_tool_names(payload_path: Path) -> List[str]:
+    try:
+        if file_size(payload_path) >= JSON_SCAN_MIN_BYTES:
+            with payload_path.open("r", encoding="utf-8") as file:
+                return tool_names_from_messages(iter_request_messages(file))
+        with payload_path.open("r", encoding="utf-8") as file:
+            payload = json.load(file)
+    except Exception:
+        return []
+    messages = payload.get("messages") if isinstance(payload, dict) else None
+    if not isinstance(messages, list):
+        return []
+    return tool_names_from_messages(messages)
+
+
 def row_label(optype: str, noise: str) -> str:
     words = noise.split()
     second_word = ""
@@ -713,23 +1618,48 @@ def row_label(optype: str, noise: str) -> str:
     return optype
 
 
-def load_turns(directory: Path, _day_start: datetime, _day_end: datetime) -> List[Turn]:
+def load_turns(
+    directory: Path,
+    _day_start: datetime,
+    _day_end: datetime,
+    profile: Optional[StageProfiler] = None,
+    turn_filter: Optional[TurnFilter] = None,
+) -> List[Turn]:
     match = DIR_RE.match(directory.name)
     if not match:
         return []
 
     optype = match.group("optype")
+    if turn_filter is not None and not turn_filter.accepts_optype(optype):
+        return []
     row = row_label(optype, match.group("noise"))
     base_day = datetime.strptime(match.group("date"), "%Y-%m-%d").date()
 
     entries: List[ParsedEntry] = []
-    for file in directory.iterdir():
-        if not file.is_file():
-            continue
-        parsed = parse_file_entry(base_day, file.name, file)
-        if parsed is not None:
-            entries.append(parsed)
-
+    with profile_stage(profile, "directory_scan") as totals:
+        for file in directory.iterdir():
+            if not file.is_file():
+                continue
+            parsed = parse_file_entry(base_day, file.name, file)
+            if parsed is not None:
+                entries.append(parsed)
+        if totals is not None:
+            totals.items += len(entries)
+
+    return build_turns(directory, optype, row, entries, profile=profile, turn_filter=turn_filter)
+
+
+def build_turns(
+    directory: Path,
+    optype: str,
+    row: str,
+    entries: List[ParsedEntry],
+    request_indices: Optional[set[str]] = None,
+    profile: Optional[StageProfiler] = None,
+    turn_filter: Optional[TurnFilter] = None,
+    kept_indices: Optional[set[str]] = None,
+) -> List[Turn]:
+    # kept_indices lists the turns an earlier call kept, for requests outside request_indices
     if not entries:
         return []
 
@@ -741,8 +1671,17 @@ def load_turns(directory: Path, _day_start: datetime, _day_end: datetime) -> Lis
         if entry.suffix == "request.json":
             request_entries.append(entry)
 
+    directory_name = sys.intern(directory.name)
+    optype = sys.intern(optype)
+    row = sys.intern(row)
     turns: List[Turn] = []
+    previous_dropped = False
     for request in sorted(request_entries, key=lambda item: item.ts):
+        if request_indices is not None and request.index not in request_indices:
+            previous_dropped = kept_indices is not None and request.index not in kept_indices
+            continue
+        # a filter below that rejects this request leaves this set for the next one
+        previous_dropped, follows_filtered = True, previous_dropped
         response_ts = request.ts
         log_ts = None
         for entry in entries_by_index.get(request.index, []):
@@ -752,6 +1691,8 @@ def load_turns(directory: Path, _day_start: datetime, _day_end: datetime) -> Lis
                 continue
             response_ts = entry.ts
             break
+        if turn_filter is not None and not turn_filter.accepts_duration(epoch_ms(response_ts) - epoch_ms(request.ts)):
+            continue
 
         log_path = None
         for entry in entries_by_index.get(request.index, []):
@@ -766,116 +1707,873 @@ def load_turns(directory: Path, _day_start: datetime, _day_end: datetime) -> Lis
         cached_input_tokens = 0
         output_tokens = 0
         if log_path is not None:
-            model, input_tokens, cached_input_tokens, output_tokens, service_tier = parse_metadata_from_log(log_path)
+            with profile_stage(profile, "log_metadata") as totals:
+                model, input_tokens, cached_input_tokens, output_tokens, service_tier = parse_metadata_from_log(
+                    log_path, totals
+                )
+                if totals is not None:
+                    totals.items += 1
+        if turn_filter is not None and not turn_filter.accepts_model(model):
+            continue
+
+        with profile_stage(profile, "request_json") as totals:
+            tools = parse_tool_names(request.path)
+            if totals is not None:
+                totals.items += 1
+                totals.bytes_read += file_size(request.path)
+        if turn_filter is not None and not turn_filter.accepts_tools(tools):
+            continue
 
         turns.append(
             Turn(
-                directory_name=directory.name,
+                directory_name=directory_name,
                 optype=optype,
                 row_label=row,
-                request_index=request.index,
-                request_ts=request.ts,
-                response_ts=response_ts,
-                log_path=log_path,
-                log_ts=log_ts,
-                model=model,
-                service_tier=service_tier,
+                request_index=sys.intern(request.index),
+                request_ms=epoch_ms(request.ts),
+                response_ms=epoch_ms(response_ts),
+                model=intern_optional(model),
+                directory_path=directory,
+                log_name=log_path.name if log_path is not None else None,
+                log_ms=epoch_ms(log_ts) if log_ts is not None else None,
+                service_tier=intern_optional(service_tier),
                 input_tokens=input_tokens,
                 cached_input_tokens=cached_input_tokens,
                 output_tokens=output_tokens,
-                tools=parse_tool_names(request.path),
+                tools=tuple(map(sys.intern, tools)),
+                follows_filtered=follows_filtered,
             )
         )
+        previous_dropped = False
 
     return turns
 
 
-def ms_between(start: datetime, end: datetime) -> int:
-    return int((end - start).total_seconds() * 1000)
-
-
-def seconds_from_ms(ms: int) -> int:
-    return int(ms / 1000)
+def filter_directory_turns(turns: Sequence[Turn], turn_filter: TurnFilter) -> List[Turn]:
+    # the index-served counterpart of the checks in build_turns; turns are in request order
+    kept: List[Turn] = []
+    previous_dropped = False
+    for turn in turns:
+        if not turn_filter.accepts(turn):
+            previous_dropped = True
+            continue
+        turn.follows_filtered = previous_dropped
+        previous_dropped = False
+        kept.append(turn)
+    return kept
+
+
+def directory_signature(directory: Path) -> Optional[str]:
+    entries: List[Tuple[str, int, int]] = []
+    if isinstance(directory, ArchivePath):
+        entries = directory.signature_entries()
+        entries.sort()
+        return hashlib.sha1(json.dumps(entries).encode("utf-8")).hexdigest()
+    try:
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                if not FILE_RE.match(entry.name):
+                    continue
+                try:
+                    entry_stat = entry.stat()
+                except OSError:
+                    continue
+                if not stat.S_ISREG(entry_stat.st_mode):
+                    continue
+                entries.append((entry.name, entry_stat.st_size, entry_stat.st_mtime_ns))
+    except OSError:
+        return None
+    entries.sort()
+    return hashlib.sha1(json.dumps(entries).encode("utf-8")).hexdigest()
 
 
-def seconds_between(start: datetime, end: datetime) -> int:
-    return int((end - start).total_seconds())
+def turn_to_record(turn: Turn) -> Dict[str, Any]:
+    return {
+        "request_index": turn.request_index,
+        "request_ts": turn.request_ts.isoformat(),
+        "response_ts": turn.response_ts.isoformat(),
+        "model": turn.model,
+        "log_name": turn.log_name,
+        "log_ts": turn.log_ts.isoformat() if turn.log_ts is not None else None,
+        "service_tier": turn.service_tier,
+        "input_tokens": turn.input_tokens,
+        "cached_input_tokens": turn.cached_input_tokens,
+        "output_tokens": turn.output_tokens,
+        "tools": list(turn.tools),
+    }
+
+
+def turn_from_record(directory: Path, optype: str, row: str, record: Dict[str, Any]) -> Turn:
+    log_name = record.get("log_name")
+    log_ts = record.get("log_ts")
+    return Turn(
+        directory_name=sys.intern(directory.name),
+        optype=sys.intern(optype),
+        row_label=sys.intern(row),
+        request_index=sys.intern(record["request_index"]),
+        request_ms=epoch_ms(datetime.fromisoformat(record["request_ts"])),
+        response_ms=epoch_ms(datetime.fromisoformat(record["response_ts"])),
+        model=intern_optional(record.get("model")),
+        directory_path=directory,
+        log_name=log_name or None,
+        log_ms=epoch_ms(datetime.fromisoformat(log_ts)) if log_ts else None,
+        service_tier=intern_optional(record.get("service_tier")),
+        input_tokens=record.get("input_tokens", 0),
+        cached_input_tokens=record.get("cached_input_tokens", 0),
+        output_tokens=record.get("output_tokens", 0),
+        tools=tuple(map(sys.intern, record.get("tools") or ())),
+    )
 
 
-def last_history_directory_timestamp(history_root: Path) -> Optional[datetime]:
-    latest: Optional[datetime] = None
-    for directory in history_root.iterdir():
-        if not directory.is_dir():
-            continue
-        directory_timestamp = parse_directory_timestamp(directory.name)
-        if directory_timestamp is None:
-            continue
-        if latest is None or directory_timestamp > latest:
-            latest = directory_timestamp
-    return latest
+class HistoryIndex:
+    # A version header, then one JSON line per directory. Lines are only ever appended: a changed
+    # directory gets a new line that supersedes its old one, and a removed directory gets a line
+    # with a null signature. Loading decodes just the directory and signature each line starts
+    # with and keeps the rest as text, so only the directories a window looks up have their turns
+    # decoded. Once superseded lines outnumber live ones, save rewrites the live lines as they are.
+    _decoder = json.JSONDecoder()
+    _directory_prefix = '{"directory": '
+    _signature_separator = ', "signature": '
+
+    def __init__(self, path: Path):
+        self.path = path
+        # directory -> (signature, the line its turns are decoded from)
+        self.entries: Dict[str, Tuple[str, str]] = {}
+        # lines to append on save, in the order they were made
+        self.pending: Dict[str, str] = {}
+        self.line_count = 0
+        self.appendable = False
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> HistoryIndex:
+        index = cls(path)
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                header = json.loads(file.readline() or "{}")
+                if not isinstance(header, dict) or header.get("version") != HISTORY_INDEX_VERSION:
+                    return index
+                index.appendable = True
+                for line in file:
+                    index.line_count += 1
+                    key = cls._line_key(line)
+                    if key is None:
+                        # a line torn by an interrupted append is superseded like any other, but
+                        # the next line must not be appended onto it, so the file gets rewritten
+                        index.appendable = index.appendable and line.endswith("\n")
+                        continue
+                    directory_name, signature = key
+                    if signature is None:
+                        index.entries.pop(directory_name, None)
+                    else:
+                        index.entries[directory_name] = (signature, line)
+        except (OSError, ValueError, AttributeError):
+            index.entries = {}
+            index.line_count = 0
+            index.appendable = False
+        return index
+
+    @classmethod
+    def _line_key(cls, line: str) -> Optional[Tuple[str, Optional[str]]]:
+        if not line.endswith("\n"):
+            return None
+        try:
+            if line.startswith(cls._directory_prefix):
+                directory_name, end = cls._decoder.raw_decode(line, len(cls._directory_prefix))
+                if line.startswith(cls._signature_separator, end):
+                    signature, _ = cls._decoder.raw_decode(line, end + len(cls._signature_separator))
+                else:
+                    signature = json.loads(line).get("signature")
+            else:
+                record = json.loads(line)
+                directory_name, signature = record.get("directory"), record.get("signature")
+        except (ValueError, AttributeError):
+            return None
+        if not isinstance(directory_name, str) or not (signature is None or isinstance(signature, str)):
+            return None
+        return directory_name, signature
+
+    def lookup(self, directory_name: str, signature: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self.entries.get(directory_name)
+        if entry is None or entry[0] != signature:
+            return None
+        try:
+            turns = json.loads(entry[1]).get("turns")
+        except (ValueError, AttributeError):
+            turns = None
+        return turns if isinstance(turns, list) else None
+
+    def store(self, directory_name: str, signature: str, records: List[Dict[str, Any]]) -> None:
+        line = json.dumps({"directory": directory_name, "signature": signature, "turns": records}) + "\n"
+        self.entries[directory_name] = (signature, line)
+        self.pending[directory_name] = line
+        self.dirty = True
+
+    def retain(self, directory_names: set[str]) -> None:
+        for directory_name in list(self.entries):
+            if directory_name not in directory_names:
+                del self.entries[directory_name]
+                self.pending[directory_name] = json.dumps({"directory": directory_name, "signature": None}) + "\n"
+                self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        stale = self.line_count + len(self.pending) - len(self.entries)
+        try:
+            if self.appendable and stale <= max(HISTORY_INDEX_MIN_STALE_LINES, len(self.entries)):
+                with self.path.open("a", encoding="utf-8") as file:
+                    file.writelines(self.pending.values())
+                self.line_count += len(self.pending)
+            else:
+                self._compact()
+        except OSError as exc:
+            # a read-only history root still works, it just stays cold
+            print(f"Failed to write history index {self.path}: {exc}")
+            return
+        self.pending = {}
+        self.dirty = False
+
+    def _compact(self) -> None:
+        temp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            file.write(json.dumps({"version": HISTORY_INDEX_VERSION}) + "\n")
+            for directory_name in sorted(self.entries):
+                file.write(self.entries[directory_name][1])
+        os.replace(temp_path, self.path)
+        self.line_count = len(self.entries)
+        self.appendable = True
+
+
+def indexed_records(directory: Path, index: HistoryIndex) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    if not DIR_RE.match(directory.name):
+        return [], None
+
+    signature = directory_signature(directory)
+    if signature is None:
+        return None, None
+    return index.lookup(directory.name, signature), signature
+
+
+def turns_from_records(directory: Path, records: Sequence[Dict[str, Any]]) -> List[Turn]:
+    match = DIR_RE.match(directory.name)
+    if not match or not records:
+        return []
+    optype = match.group("optype")
+    row = row_label(optype, match.group("noise"))
+    return [turn_from_record(directory, optype, row, record) for record in records]
 
 
-def first_history_directory_timestamp(history_root: Path) -> Optional[datetime]:
-    earliest: Optional[datetime] = None
-    for directory in history_root.iterdir():
-        if not directory.is_dir():
-            continue
-        directory_timestamp = parse_directory_timestamp(directory.name)
-        if directory_timestamp is None:
-            continue
-        if earliest is None or directory_timestamp < earliest:
-            earliest = directory_timestamp
-    return earliest
+def load_turns_timed(
+    directory: Path,
+    day_start: datetime,
+    day_end: datetime,
+    profiled: bool = False,
+    turn_filter: Optional[TurnFilter] = None,
+) -> Tuple[List[Turn], float, Optional[StageProfiler]]:
+    # the profiler travels back with the result so worker processes can report their stages
+    profile = StageProfiler() if profiled else None
+    started = time.perf_counter()
+    turns = load_turns(directory, day_start, day_end, profile, turn_filter)
+    return turns, time.perf_counter() - started, profile
+
+
+def map_load_turns(
+    directories: Sequence[Path],
+    day_start: datetime,
+    day_end: datetime,
+    jobs: int,
+    profiled: bool = False,
+    turn_filter: Optional[TurnFilter] = None,
+) -> Iterator[Tuple[List[Turn], float, Optional[StageProfiler]]]:
+    if jobs <= 1 or len(directories) <= 1:
+        for directory in directories:
+            yield load_turns_timed(directory, day_start, day_end, profiled, turn_filter)
+        return
+
+    workers = min(jobs, len(directories))
+    chunksize = max(1, len(directories) // (workers * 4))
+    # forking while the pricing refresh thread runs can copy locks it holds into the workers,
+    # so they come from a clean forkserver instead whenever another thread is alive
+    context = None
+    if threading.active_count() > 1 and "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+    # Executor.map yields in submission order, so results stay deterministic
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        yield from executor.map(
+            load_turns_timed,
+            directories,
+            repeat(day_start),
+            repeat(day_end),
+            repeat(profiled),
+            repeat(turn_filter),
+            chunksize=chunksize,
+        )
+
+
+def ms_between(start: datetime, end: datetime) -> int:
+    return int((end - start).total_seconds() * 1000)
+
+
+def seconds_from_ms(ms: int) -> int:
+    return int(ms / 1000)
+
+
+def seconds_between(start: datetime, end: datetime) -> int:
+    return int((end - start).total_seconds())
+
+
+class HistoryArchive:
+    # A zip archive of a worktree, opened once per process. Members are listed from the central
+    # directory up front, so listing a task directory never scans the whole archive again.
+    _opened: Dict[str, HistoryArchive] = {}
+
+    def __init__(self, archive_path: Path):
+        self.archive_path = archive_path
+        self.pid = os.getpid()
+        self.zip_file = zipfile.ZipFile(archive_path)
+        self.infos: Dict[str, zipfile.ZipInfo] = {}
+        self.children: Dict[str, Dict[str, None]] = defaultdict(dict)
+        for info in self.zip_file.infolist():
+            member = info.filename.rstrip("/")
+            if not info.is_dir():
+                self.infos[member] = info
+            parent, _, name = member.rpartition("/")
+            self.children[parent][name] = None
+            while parent and parent not in self.children[parent.rpartition("/")[0]]:
+                grandparent, _, parent_name = parent.rpartition("/")
+                self.children[grandparent][parent_name] = None
+                parent = grandparent
+
+    @classmethod
+    def open(cls, archive_path: Path) -> HistoryArchive:
+        # forked workers inherit the parent's file offset, so each process opens its own handle
+        key = str(archive_path)
+        archive = cls._opened.get(key)
+        if archive is None or archive.pid != os.getpid():
+            archive = cls._opened[key] = cls(archive_path)
+        return archive
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return HistoryArchive.open, (self.archive_path,)
+
+
+class ArchivePath:
+    # Stands in for a Path under a HistoryArchive wherever history files are listed and read,
+    # so turns can be loaded straight from the compressed members without extracting them.
+    __slots__ = ("archive", "member")
+
+    def __init__(self, archive: HistoryArchive, member: str):
+        self.archive = archive
+        self.member = member
+
+    def __truediv__(self, name: str) -> ArchivePath:
+        return ArchivePath(self.archive, f"{self.member}/{name}" if self.member else name)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, ArchivePath)
+            and self.archive.archive_path == other.archive.archive_path
+            and self.member == other.member
+        )
+
+    def __hash__(self) -> int:
+        return hash((str(self.archive.archive_path), self.member))
+
+    def __str__(self) -> str:
+        return f"{self.archive.archive_path}/{self.member}"
+
+    def __repr__(self) -> str:
+        return f"ArchivePath({str(self)!r})"
+
+    @property
+    def name(self) -> str:
+        return self.member.rpartition("/")[2]
+
+    @property
+    def size(self) -> int:
+        return self.archive.infos[self.member].file_size
+
+    def exists(self) -> bool:
+        return self.is_file() or self.is_dir()
+
+    def is_file(self) -> bool:
+        return self.member in self.archive.infos
+
+    def is_dir(self) -> bool:
+        return self.member in self.archive.children
+
+    def iterdir(self) -> Iterator[ArchivePath]:
+        for name in self.archive.children.get(self.member, ()):
+            yield self / name
+
+    def open(self, mode: str = "r", encoding: Optional[str] = None, errors: Optional[str] = None) -> Any:
+        member = self.archive.zip_file.open(self.archive.infos[self.member])
+        if "b" in mode:
+            return member
+        return io.TextIOWrapper(member, encoding=encoding or "utf-8", errors=errors)
+
+    def read_text(self, encoding: str = "utf-8", errors: Optional[str] = None) -> str:
+        with self.open("r", encoding=encoding, errors=errors) as file:
+            return file.read()
+
+    def signature_entries(self) -> List[Tuple[str, int, int]]:
+        # size and CRC from the central directory play the part of size and mtime on disk
+        entries = []
+        for name in self.archive.children.get(self.member, ()):
+            info = self.archive.infos.get(f"{self.member}/{name}" if self.member else name)
+            if info is not None and FILE_RE.match(name):
+                entries.append((name, info.file_size, info.CRC))
+        return entries
+
+
+def open_history_root(path: Path) -> Any:
+    # Accepts an llm-history directory, a worktree directory or .zip archive containing
+    # .brokk/llm-history, or a worktree reference JSON ({"worktree": ...}) naming either.
+    path = path.expanduser()
+    if path.suffix == ".json" and path.is_file():
+        try:
+            path = resolve_worktree_reference(path)
+        except (OSError, ValueError) as exc:
+            raise SystemExit(f"Cannot resolve worktree reference {path}: {exc}")
+
+    if path.suffix == ".zip" and path.is_file():
+        try:
+            archive = HistoryArchive.open(path)
+        except (OSError, zipfile.BadZipFile) as exc:
+            raise SystemExit(f"Cannot open history archive {path}: {exc}")
+        candidates = [member for member in archive.children if member == ".brokk/llm-history" or member.endswith("/.brokk/llm-history")]
+        if candidates:
+            return ArchivePath(archive, min(candidates, key=len))
+        raise SystemExit(f"No .brokk/llm-history found in {path}")
+
+    if not path.is_dir():
+        raise SystemExit(f"History path is not a directory, .zip archive or worktree reference: {path}")
+    worktree_history = path / ".brokk" / "llm-history"
+    if worktree_history.is_dir():
+        return worktree_history
+    return path
+
+
+def expand_history_patterns(patterns: Sequence[str]) -> List[Path]:
+    paths: List[Path] = []
+    for pattern in patterns:
+        expanded = os.path.expanduser(pattern)
+        if glob.has_magic(expanded):
+            matches = sorted(glob.glob(expanded))
+            if not matches:
+                raise SystemExit(f"No history paths match {pattern}")
+            paths.extend(Path(match) for match in matches)
+        else:
+            paths.append(Path(expanded))
+    return list(dict.fromkeys(paths))
+
+
+def history_root_label(history_root: Any) -> str:
+    # the worktree or archive name, which is what tells runs apart in a fleet of worktrees
+    if isinstance(history_root, ArchivePath):
+        return history_root.archive.archive_path.stem
+    if history_root.name == "llm-history" and history_root.parent.name == ".brokk":
+        return history_root.parent.parent.name
+    return history_root.name
+
+
+def history_root_labels(history_roots: Sequence[Any]) -> List[str]:
+    labels: List[str] = []
+    seen: Dict[str, int] = {}
+    for history_root in history_roots:
+        label = history_root_label(history_root)
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(label if seen[label] == 1 else f"{label}#{seen[label]}")
+    return labels
+
+
+def qualify_turns(turns: Sequence[Turn], label: str) -> None:
+    # directory names only need to be unique within a root, so merged timelines prefix them
+    names: Dict[str, Tuple[str, str]] = {}
+    for turn in turns:
+        qualified = names.get(turn.directory_name)
+        if qualified is None:
+            qualified = names[turn.directory_name] = (
+                sys.intern(f"{label}/{turn.directory_name}"),
+                sys.intern(f"{label} {turn.row_label}"),
+            )
+        turn.directory_name, turn.row_label = qualified
+
+
+def history_index_path(history_root: Any) -> Path:
+    # archives are read-only, so their index sits next to the .zip
+    if isinstance(history_root, ArchivePath):
+        archive_path = history_root.archive.archive_path
+        return archive_path.with_name(f"{archive_path.name}{HISTORY_INDEX_FILENAME}")
+    return history_root / HISTORY_INDEX_FILENAME
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    ts: datetime
+    name: str
+    path: Path
+
+
+class HistoryCatalog:
+    # Task directories of one history root, scanned once and kept sorted by timestamp so that
+    # window queries only touch the directories they return.
+
+    def __init__(self, entries: Sequence[CatalogEntry]):
+        self.entries = sorted(entries, key=lambda item: (item.ts, item.name))
+        self.timestamps = [entry.ts for entry in self.entries]
+
+    @classmethod
+    def scan(cls, history_root: Path) -> HistoryCatalog:
+        entries: List[CatalogEntry] = []
+        if isinstance(history_root, ArchivePath):
+            for directory in history_root.iterdir():
+                directory_timestamp = parse_directory_timestamp(directory.name)
+                if directory_timestamp is not None and directory.is_dir():
+                    entries.append(CatalogEntry(directory_timestamp, directory.name, directory))
+            return cls(entries)
+        with os.scandir(history_root) as iterator:
+            for entry in iterator:
+                if not entry.is_dir():
+                    continue
+                directory_timestamp = parse_directory_timestamp(entry.name)
+                if directory_timestamp is None:
+                    continue
+                entries.append(CatalogEntry(directory_timestamp, entry.name, history_root / entry.name))
+        return cls(entries)
+
+    def first_timestamp(self) -> Optional[datetime]:
+        return self.timestamps[0] if self.timestamps else None
+
+    def last_timestamp(self) -> Optional[datetime]:
+        return self.timestamps[-1] if self.timestamps else None
+
+    def window(self, start: datetime, end: datetime) -> List[CatalogEntry]:
+        lower = bisect_left(self.timestamps, start)
+        upper = bisect_right(self.timestamps, end)
+        return self.entries[lower:upper]
+
+    def names(self) -> set[str]:
+        return {entry.name for entry in self.entries}
 
 
 def calculate_inference_ms(turns: Sequence[Turn]) -> int:
-    return sum(ms_between(turn.request_ts, turn.response_ts) for turn in turns)
+    return sum(turn.response_ms - turn.request_ms for turn in turns)
 
 
 def calculate_wall_ms(turns: Sequence[Turn]) -> Optional[int]:
     if not turns:
         return None
-    first_json = min(turn.request_ts for turn in turns)
-    log_timestamps = [turn.log_ts for turn in turns if turn.log_ts is not None]
-    if not log_timestamps:
+    first_json = min(turn.request_ms for turn in turns)
+    last_log = max((turn.log_ms for turn in turns if turn.log_ms is not None), default=None)
+    if last_log is None:
         return None
-    return ms_between(first_json, max(log_timestamps))
+    return last_log - first_json
 
 
-def print_timing_summary(turns: Sequence[Turn]) -> None:
-    inference_ms = calculate_inference_ms(turns)
-    wall_ms = calculate_wall_ms(turns)
+@dataclass
+class DirectoryUtilization:
+    wall_ms: int
+    busy_ms: int
+    inference_ms: int
+
+    @property
+    def gap_ms(self) -> int:
+        return self.wall_ms - self.busy_ms
+
+    @property
+    def utilization(self) -> Optional[float]:
+        return self.busy_ms / self.wall_ms if self.wall_ms > 0 else None
+
+
+@dataclass
+class ConcurrencyProfile:
+    # series is a step function: (epoch ms, calls in flight from that instant on), one point per
+    # instant where the count changes; busy_ms is the time with at least one call in flight
+    series: List[Tuple[int, int]]
+    peak: int
+    peak_ms: Optional[int]
+    busy_ms: int
+    inference_ms: int
+    start_ms: int
+    end_ms: int
+    directories: Dict[str, DirectoryUtilization]
+
+    @property
+    def wall_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+    @property
+    def mean_concurrency(self) -> Optional[float]:
+        return self.inference_ms / self.wall_ms if self.wall_ms > 0 else None
+
+
+def merged_interval_ms(intervals: Iterable[Tuple[int, int]]) -> int:
+    # intervals must be sorted by start
+    total = 0
+    current_start: Optional[int] = None
+    current_end = 0
+    for start, end in intervals:
+        if current_start is None or start > current_end:
+            if current_start is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        elif end > current_end:
+            current_end = end
+    if current_start is not None:
+        total += current_end - current_start
+    return total
+
+
+def directory_utilization(turns: Sequence[Turn]) -> Optional[DirectoryUtilization]:
+    intervals = sorted((turn.request_ms, max(turn.request_ms, turn.response_ms)) for turn in turns)
+    if not intervals:
+        return None
+    return DirectoryUtilization(
+        wall_ms=max(end for _, end in intervals) - intervals[0][0],
+        busy_ms=merged_interval_ms(intervals),
+        inference_ms=sum(end - start for start, end in intervals),
+    )
+
+
+class ConcurrencySweep:
+    # The sweep behind compute_concurrency, kept alive so --follow can replace one directory's
+    # turns at a time: only the series points between the first and last instant the change
+    # touched are swept again. Outside that range the in-flight count is unchanged, because every
+    # call adds and removes exactly one.
+
+    def __init__(self, turns: Sequence[Turn] = ()):
+        # deltas at the same instant are netted, so back-to-back calls never count as overlapping
+        self.deltas: Dict[int, int] = defaultdict(int)
+        self.instants: List[int] = []
+        self.series: List[Tuple[int, int]] = []
+        self.series_times: List[int] = []
+        self.peak = 0
+        self.peak_ms: Optional[int] = None
+        self.busy_ms = 0
+        self.directories: Dict[str, DirectoryUtilization] = {}
+        by_directory: Dict[str, List[Turn]] = defaultdict(list)
+        for turn in turns:
+            by_directory[turn.directory_name].append(turn)
+        for directory_name, directory_turns in by_directory.items():
+            self.replace_directory(directory_name, (), directory_turns, sweep=False)
+        if self.deltas:
+            self.instants = sorted(self.deltas)
+            self._sweep(self.instants[0], self.instants[-1])
+
+    def replace_directory(
+        self,
+        directory_name: str,
+        previous_turns: Sequence[Turn],
+        turns: Sequence[Turn],
+        sweep: bool = True,
+    ) -> None:
+        touched: List[int] = []
+        new_instants: List[int] = []
+        for sign, changed_turns in ((-1, previous_turns), (1, turns)):
+            for turn in changed_turns:
+                start, end = turn.request_ms, max(turn.request_ms, turn.response_ms)
+                for instant, delta in ((start, sign), (end, -sign)):
+                    if instant not in self.deltas:
+                        new_instants.append(instant)
+                    self.deltas[instant] += delta
+                touched.extend((start, end))
+        utilization = directory_utilization(turns)
+        if utilization is not None:
+            self.directories[directory_name] = utilization
+        else:
+            self.directories.pop(directory_name, None)
+        if not sweep or not touched:
+            return
+        new_instants.sort()
+        if new_instants and self.instants and new_instants[0] < self.instants[-1]:
+            self.instants = list(heapq.merge(self.instants, new_instants))
+        else:
+            # --follow mostly appends calls after everything already loaded
+            self.instants.extend(new_instants)
+        self._sweep(min(touched), max(touched))
+
+    def _busy_between(self, first: int, stop: int) -> int:
+        # time with calls in flight over the series segments starting at points first..stop-1
+        total = 0
+        for position in range(first, min(stop, len(self.series) - 1)):
+            if self.series[position][1] > 0:
+                total += self.series[position + 1][0] - self.series[position][0]
+        return total
+
+    def _sweep(self, lo: int, hi: int) -> None:
+        first = bisect_left(self.series_times, lo)
+        stop = bisect_right(self.series_times, hi)
+        first_segment = max(first - 1, 0)
+        self.busy_ms -= self._busy_between(first_segment, stop)
+        in_flight = self.series[first - 1][1] if first > 0 else 0
+        points: List[Tuple[int, int]] = []
+        for instant in self.instants[bisect_left(self.instants, lo) : bisect_right(self.instants, hi)]:
+            delta = self.deltas[instant]
+            if delta == 0:
+                continue
+            in_flight += delta
+            points.append((instant, in_flight))
+        self.series[first:stop] = points
+        self.series_times[first:stop] = [instant for instant, _ in points]
+        self.busy_ms += self._busy_between(first_segment, first + len(points))
+
+        # the peak is the earliest instant with the most calls in flight
+        if self.peak_ms is not None and lo <= self.peak_ms <= hi:
+            self.peak, self.peak_ms = 0, None
+            points = self.series
+        for instant, count in points:
+            if count > self.peak or (count == self.peak and self.peak_ms is not None and instant < self.peak_ms):
+                self.peak, self.peak_ms = count, instant
+
+    def profile(self) -> ConcurrencyProfile:
+        # shares the live series and directories, which the next replace_directory updates
+        return ConcurrencyProfile(
+            series=self.series,
+            peak=self.peak,
+            peak_ms=self.peak_ms,
+            busy_ms=self.busy_ms,
+            inference_ms=sum(usage.inference_ms for usage in self.directories.values()),
+            start_ms=self.series[0][0] if self.series else 0,
+            end_ms=self.series[-1][0] if self.series else 0,
+            directories=self.directories,
+        )
+
+
+def compute_concurrency(turns: Sequence[Turn]) -> ConcurrencyProfile:
+    return ConcurrencySweep(turns).profile()
+
+
+class RequestOrderSweep:
+    # The same sweep for calls that arrive in request order, as --debug streams them: a call's
+    # end waits in a heap until a later request passes it, so only calls still in flight are
+    # held. The series itself is not kept, only what print_timing_report needs.
+
+    def __init__(self) -> None:
+        self.ends: List[int] = []
+        self.instant: Optional[int] = None
+        self.delta = 0
+        self.in_flight = 0
+        self.previous_ms: Optional[int] = None
+        self.peak = 0
+        self.peak_ms: Optional[int] = None
+        self.busy_ms = 0
+        self.start_ms: Optional[int] = None
+        self.end_ms = 0
+        self.inference_ms = 0
+        self.directories: Dict[str, DirectoryUtilization] = {}
+
+    def add(self, turn: Turn) -> None:
+        start, end = turn.request_ms, max(turn.request_ms, turn.response_ms)
+        while self.ends and self.ends[0] <= start:
+            self._event(heapq.heappop(self.ends), -1)
+        self._event(start, 1)
+        heapq.heappush(self.ends, end)
+        self.inference_ms += end - start
+
+    def _event(self, instant: int, delta: int) -> None:
+        # deltas at the same instant are netted, so back-to-back calls never count as overlapping
+        if self.instant is not None and instant != self.instant:
+            self._settle()
+        self.instant = instant
+        self.delta += delta
+
+    def _settle(self) -> None:
+        instant, delta = self.instant, self.delta
+        self.instant, self.delta = None, 0
+        if instant is None or delta == 0:
+            return
+        if self.previous_ms is not None and self.in_flight > 0:
+            self.busy_ms += instant - self.previous_ms
+        self.previous_ms = instant
+        self.in_flight += delta
+        if self.start_ms is None:
+            self.start_ms = instant
+        self.end_ms = instant
+        if self.in_flight > self.peak:
+            self.peak, self.peak_ms = self.in_flight, instant
+
+    def profile(self) -> ConcurrencyProfile:
+        while self.ends:
+            self._event(heapq.heappop(self.ends), -1)
+        self._settle()
+        return ConcurrencyProfile(
+            series=[],
+            peak=self.peak,
+            peak_ms=self.peak_ms,
+            busy_ms=self.busy_ms,
+            inference_ms=self.inference_ms,
+            start_ms=self.start_ms if self.start_ms is not None else 0,
+            end_ms=self.end_ms,
+            directories=self.directories,
+        )
+
+
+def print_timing_summary(turns: Sequence[Turn], concurrency: Optional[ConcurrencyProfile] = None) -> None:
+    if turns and concurrency is None:
+        concurrency = compute_concurrency(turns)
+    print_timing_report(calculate_inference_ms(turns), calculate_wall_ms(turns), concurrency if turns else None)
+
+
+def print_timing_report(inference_ms: int, wall_ms: Optional[int], concurrency: Optional[ConcurrencyProfile]) -> None:
     print(f"Inference time: {inference_ms}ms ({seconds_from_ms(inference_ms)}s)")
     if wall_ms is None:
         print("Wall time: unavailable (no .log timestamps found)")
     else:
         print(f"Wall time: {wall_ms}ms ({seconds_from_ms(wall_ms)}s)")
 
+    if concurrency is None:
+        return
+    if concurrency.peak_ms is not None:
+        peak_at = datetime_from_epoch_ms(concurrency.peak_ms).strftime("%H:%M:%S")
+        print(f"Peak concurrency: {concurrency.peak} calls in flight at {peak_at}")
+    if concurrency.wall_ms > 0:
+        busy_percent = 100 * concurrency.busy_ms / concurrency.wall_ms
+        print(
+            f"LLM busy: {concurrency.busy_ms}ms ({busy_percent:.1f}% of {seconds_from_ms(concurrency.wall_ms)}s),"
+            f" mean in flight {concurrency.mean_concurrency:.2f}"
+        )
+    print("Directory utilization (inference vs gaps):")
+    for directory_name in sorted(concurrency.directories):
+        usage = concurrency.directories[directory_name]
+        utilization = usage.utilization
+        share = f"{100 * utilization:.1f}%" if utilization is not None else "n/a"
+        print(
+            f"  {directory_name}: inference={seconds_from_ms(usage.busy_ms)}s"
+            f" gaps={seconds_from_ms(usage.gap_ms)}s utilization={share}"
+        )
+
 
 def gather_gaps(turns: Sequence[Turn]) -> List[GapAnnotation]:
+    return list(iter_gaps(turns))
+
+
+def iter_gaps(turns: Sequence[Turn]) -> Iterator[GapAnnotation]:
     turns_by_dir: Dict[str, List[Turn]] = defaultdict(list)
     for turn in turns:
         turns_by_dir[turn.directory_name].append(turn)
 
-    gaps: List[GapAnnotation] = []
     for directory_name, directory_turns in turns_by_dir.items():
-        directory_turns = sorted(directory_turns, key=lambda item: item.request_ts)
+        directory_turns = sorted(directory_turns, key=attrgetter("request_ms"))
         for i in range(len(directory_turns) - 1):
             previous_turn = directory_turns[i]
             next_turn = directory_turns[i + 1]
-            gaps.append(
+            if next_turn.follows_filtered:
+                # the two turns were not adjacent; the dropped turn ran in between
+                continue
+            yield (
                 GapAnnotation(
                     from_request=previous_turn.request_index,
                     to_request=next_turn.request_index,
                     directory_name=directory_name,
                     optype=next_turn.optype,
-                    start=previous_turn.response_ts,
-                    end=next_turn.request_ts,
-                    turn_duration_ms=ms_between(next_turn.request_ts, next_turn.response_ts),
+                    start_ms=previous_turn.response_ms,
+                    end_ms=next_turn.request_ms,
+                    turn_duration_ms=next_turn.response_ms - next_turn.request_ms,
                     tools=next_turn.tools,
                 )
             )
-    return gaps
 
 
 def label_for_gap(gap: GapAnnotation) -> str:
@@ -889,6 +2587,401 @@ def split_gap_lines(gap: GapAnnotation) -> List[str]:
     return [f"{seconds_between(gap.start, gap.end)}s", *tools]
 
 
+class QuantileSketch:
+    # Log-bucketed quantile sketch in the style of DDSketch: every value lands in the bucket
+    # ceil(log_gamma(value)), so quantiles carry at most relative_accuracy error, memory grows
+    # with the log of the value range rather than the sample count, and sketches merge by
+    # adding bucket counts. Values below 1 (sub-millisecond gaps) share a single zero bucket.
+
+    def __init__(self, relative_accuracy: float = TOOL_STATS_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+        if value < 1:
+            self.zero_count += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += 1
+
+    def merge(self, other: QuantileSketch) -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] += count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if rank < seen:
+                # the midpoint of the bucket in relative terms, capped by the exact maximum
+                return min(2 * self.gamma**bucket / (self.gamma + 1), self.max)
+        return self.max
+
+
+def compute_tool_stats(gaps: Iterable[GapAnnotation]) -> Dict[str, QuantileSketch]:
+    # a gap counts toward every tool that ran in it, so multi-tool gaps appear under each tool
+    sketches: Dict[str, QuantileSketch] = {}
+    for gap in gaps:
+        gap_ms = gap.end_ms - gap.start_ms
+        for tool in gap.tools or ("no-tools",):
+            sketch = sketches.get(tool)
+            if sketch is None:
+                sketch = sketches[tool] = QuantileSketch()
+            sketch.add(gap_ms)
+    return sketches
+
+
+def tool_stats_records(sketches: Dict[str, QuantileSketch]) -> List[Dict[str, Any]]:
+    records = []
+    for tool, sketch in sketches.items():
+        records.append(
+            {
+                "type": "tool_stats",
+                "tool": tool,
+                "count": sketch.count,
+                "total_ms": int(sketch.total),
+                "p50_ms": round(sketch.quantile(0.5)),
+                "p90_ms": round(sketch.quantile(0.9)),
+                "p99_ms": round(sketch.quantile(0.99)),
+                "max_ms": int(sketch.max),
+            }
+        )
+    records.sort(key=lambda record: (-record["total_ms"], record["tool"]))
+    return records
+
+
+def print_tool_stats(sketches: Dict[str, QuantileSketch]) -> None:
+    print("Tool gap durations (a gap counts toward every tool that ran in it):")
+    if not sketches:
+        print("  no gaps found")
+        return
+    print(f"  {'tool':<28} {'count':>7} {'total s':>9} {'p50 s':>8} {'p90 s':>8} {'p99 s':>8} {'max s':>8}")
+    for record in tool_stats_records(sketches):
+        print(
+            f"  {record['tool']:<28} {record['count']:>7} {record['total_ms'] / 1000:>9.1f}"
+            f" {record['p50_ms'] / 1000:>8.1f} {record['p90_ms'] / 1000:>8.1f}"
+            f" {record['p99_ms'] / 1000:>8.1f} {record['max_ms'] / 1000:>8.1f}"
+        )
+
+
+def prompt_band_label(prompt_tokens: int) -> str:
+    # the same split pricing_bands_from_source uses for long-context pricing
+    if prompt_tokens >= LONG_CONTEXT_THRESHOLD_TOKENS:
+        return f">={LONG_CONTEXT_THRESHOLD_TOKENS // 1000}k"
+    return f"<{LONG_CONTEXT_THRESHOLD_TOKENS // 1000}k"
+
+
+@dataclass
+class ModelPerformance:
+    trend_buckets: int
+    turns: int = 0
+    output_tokens: int = 0
+    latency_ms: int = 0
+    latency_by_band: Dict[str, QuantileSketch] = field(default_factory=dict)
+    trend_output_tokens: List[int] = field(default_factory=list)
+    trend_latency_ms: List[int] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.trend_output_tokens = [0] * self.trend_buckets
+        self.trend_latency_ms = [0] * self.trend_buckets
+
+    @staticmethod
+    def tokens_per_second(output_tokens: int, latency_ms: int) -> Optional[float]:
+        return output_tokens * 1000 / latency_ms if latency_ms > 0 else None
+
+    @property
+    def output_tokens_per_second(self) -> Optional[float]:
+        return self.tokens_per_second(self.output_tokens, self.latency_ms)
+
+    def trend_tokens_per_second(self) -> List[Optional[float]]:
+        return [
+            self.tokens_per_second(output_tokens, latency_ms)
+            for output_tokens, latency_ms in zip(self.trend_output_tokens, self.trend_latency_ms)
+        ]
+
+
+def compute_model_performance(
+    turns: Sequence[Turn],
+    trend_buckets: int = PERF_TREND_BUCKETS,
+) -> Tuple[Dict[Tuple[str, str], ModelPerformance], int, int]:
+    # Keyed by (model, normalised service tier). Throughput is total output tokens over total
+    # request-to-response time, which weights long turns more than a mean of per-turn rates
+    # would. The trend splits the span of the turns into equal time buckets by request time.
+    if not turns:
+        return {}, 0, 0
+    window_start = min(turn.request_ms for turn in turns)
+    window_end = max(turn.response_ms for turn in turns)
+    span = max(1, window_end - window_start)
+
+    performance: Dict[Tuple[str, str], ModelPerformance] = {}
+    for turn in turns:
+        key = (turn.model or "<missing>", service_tier_normalized(turn.service_tier))
+        model_performance = performance.get(key)
+        if model_performance is None:
+            model_performance = performance[key] = ModelPerformance(trend_buckets)
+        latency_ms = max(0, turn.response_ms - turn.request_ms)
+        model_performance.turns += 1
+        model_performance.output_tokens += turn.output_tokens
+        model_performance.latency_ms += latency_ms
+
+        band = prompt_band_label(turn.input_tokens + turn.cached_input_tokens)
+        sketch = model_performance.latency_by_band.get(band)
+        if sketch is None:
+            sketch = model_performance.latency_by_band[band] = QuantileSketch()
+        sketch.add(latency_ms)
+
+        bucket = min(trend_buckets - 1, (turn.request_ms - window_start) * trend_buckets // span)
+        model_performance.trend_output_tokens[bucket] += turn.output_tokens
+        model_performance.trend_latency_ms[bucket] += latency_ms
+    return performance, window_start, window_end
+
+
+def model_performance_records(performance: Dict[Tuple[str, str], ModelPerformance]) -> List[Dict[str, Any]]:
+    records = []
+    for (model_name, tier), model_performance in sorted(performance.items()):
+        tokens_per_second = model_performance.output_tokens_per_second
+        records.append(
+            {
+                "type": "model_performance",
+                "model": model_name,
+                "service_tier": tier,
+                "turn_count": model_performance.turns,
+                "output_tokens": model_performance.output_tokens,
+                "latency_ms": model_performance.latency_ms,
+                "output_tokens_per_second": round(tokens_per_second, 3) if tokens_per_second is not None else None,
+                "latency_by_prompt_band": {
+                    band: {
+                        "count": sketch.count,
+                        "p50_ms": round(sketch.quantile(0.5)),
+                        "p90_ms": round(sketch.quantile(0.9)),
+                        "p99_ms": round(sketch.quantile(0.99)),
+                        "max_ms": int(sketch.max),
+                    }
+                    for band, sketch in sorted(model_performance.latency_by_band.items())
+                },
+                "trend_output_tokens_per_second": [
+                    round(value, 3) if value is not None else None
+                    for value in model_performance.trend_tokens_per_second()
+                ],
+            }
+        )
+    return records
+
+
+def print_model_performance(performance: Dict[Tuple[str, str], ModelPerformance], window_start: int, window_end: int) -> None:
+    print("Model performance:")
+    if not performance:
+        print("  no turns found")
+        return
+    start_label = datetime_from_epoch_ms(window_start).strftime("%H:%M:%S")
+    end_label = datetime_from_epoch_ms(window_end).strftime("%H:%M:%S")
+    for record in model_performance_records(performance):
+        tokens_per_second = record["output_tokens_per_second"]
+        rate = f"{tokens_per_second:.1f}" if tokens_per_second is not None else "n/a"
+        print(
+            f"  {record['model']} [{record['service_tier']}]: turns={record['turn_count']}"
+            f" output={record['output_tokens']} output_tok/s={rate}"
+        )
+        for band, latency in record["latency_by_prompt_band"].items():
+            print(
+                f"    latency {band:>6}: n={latency['count']} p50={latency['p50_ms'] / 1000:.1f}s"
+                f" p90={latency['p90_ms'] / 1000:.1f}s p99={latency['p99_ms'] / 1000:.1f}s"
+                f" max={latency['max_ms'] / 1000:.1f}s"
+            )
+        trend = " ".join(f"{value:.1f}" if value is not None else "-" for value in record["trend_output_tokens_per_second"])
+        print(f"    output_tok/s {start_label}..{end_label}: {trend}")
+
+
+@dataclass
+class CacheTurn:
+    turn: Turn
+    hit_ratio: Optional[float]
+    previous_hit_ratio: Optional[float]
+    # prompt tokens that the previous turn already sent but were billed uncached this time
+    missed_tokens: int
+    miss_cost: Optional[float]
+
+    @property
+    def dropped(self) -> bool:
+        return (
+            self.hit_ratio is not None
+            and self.previous_hit_ratio is not None
+            and self.previous_hit_ratio - self.hit_ratio >= CACHE_DROP_THRESHOLD
+        )
+
+
+@dataclass
+class CacheTotals:
+    turns: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    drops: int = 0
+    missed_tokens: int = 0
+    miss_cost: float = 0.0
+    miss_cost_missing: bool = False
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        prompt_tokens = self.input_tokens + self.cached_input_tokens
+        return self.cached_input_tokens / prompt_tokens if prompt_tokens else None
+
+    def add(self, cache_turn: CacheTurn) -> None:
+        self.turns += 1
+        self.input_tokens += cache_turn.turn.input_tokens
+        self.cached_input_tokens += cache_turn.turn.cached_input_tokens
+        self.drops += cache_turn.dropped
+        self.missed_tokens += cache_turn.missed_tokens
+        if cache_turn.miss_cost is None:
+            self.miss_cost_missing = self.miss_cost_missing or cache_turn.missed_tokens > 0
+        else:
+            self.miss_cost += cache_turn.miss_cost
+
+
+@dataclass
+class CacheReport:
+    # per-directory turns in request order
+    turns: Dict[str, List[CacheTurn]]
+    directories: Dict[str, CacheTotals]
+    models: Dict[str, CacheTotals]
+
+
+def compute_cache_report(
+    turns: Sequence[Turn],
+    model_info_map: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> CacheReport:
+    # Each turn of a task resends the previous prompt plus new messages, so the previous turn's
+    # prompt is the prefix a warm cache should have served. Tokens of that prefix billed as fresh
+    # input are the miss, priced at the input rate minus the cache-read rate of the turn's band.
+    cached_bands: Dict[Tuple[str, str], List[PriceBand]] = {}
+    by_directory: Dict[str, List[Turn]] = {}
+    for turn in turns:
+        by_directory.setdefault(turn.directory_name, []).append(turn)
+
+    report = CacheReport({}, {}, {})
+    for directory_name, directory_turns in by_directory.items():
+        directory_turns.sort(key=lambda turn: (turn.request_ms, turn.request_index))
+        cache_turns = report.turns[directory_name] = []
+        directory_totals = report.directories[directory_name] = CacheTotals()
+        previous: Optional[Turn] = None
+        previous_hit_ratio: Optional[float] = None
+        for turn in directory_turns:
+            prompt_tokens = turn.input_tokens + turn.cached_input_tokens
+            hit_ratio = turn.cached_input_tokens / prompt_tokens if prompt_tokens else None
+            missed_tokens = 0
+            if previous is not None:
+                reusable = min(prompt_tokens, previous.input_tokens + previous.cached_input_tokens)
+                missed_tokens = max(0, reusable - turn.cached_input_tokens)
+            miss_cost = None
+            if model_info_map is not None:
+                band = price_band_for_turn(turn, model_info_map, cached_bands)
+                if band is not None:
+                    rate = max(0.0, band.input_cost_per_token - band.cached_input_cost_per_token)
+                    miss_cost = missed_tokens * rate
+            cache_turn = CacheTurn(turn, hit_ratio, previous_hit_ratio, missed_tokens, miss_cost)
+            cache_turns.append(cache_turn)
+            directory_totals.add(cache_turn)
+            model_totals = report.models.get(turn.model or "<missing>")
+            if model_totals is None:
+                model_totals = report.models[turn.model or "<missing>"] = CacheTotals()
+            model_totals.add(cache_turn)
+            previous = turn
+            if hit_ratio is not None:
+                previous_hit_ratio = hit_ratio
+    return report
+
+
+def cache_totals_record(record_type: str, key: str, name: str, totals: CacheTotals) -> Dict[str, Any]:
+    hit_ratio = totals.hit_ratio
+    return {
+        "type": record_type,
+        key: name,
+        "turn_count": totals.turns,
+        "input_tokens": totals.input_tokens,
+        "cached_input_tokens": totals.cached_input_tokens,
+        "hit_ratio": round(hit_ratio, 4) if hit_ratio is not None else None,
+        "drop_count": totals.drops,
+        "missed_tokens": totals.missed_tokens,
+        "estimated_miss_cost": None if totals.miss_cost_missing else round(totals.miss_cost, 6),
+    }
+
+
+def cache_turn_record(directory_name: str, cache_turn: CacheTurn) -> Dict[str, Any]:
+    turn = cache_turn.turn
+    return {
+        "type": "cache_turn",
+        "directory": directory_name,
+        "request_index": turn.request_index,
+        "model": turn.model,
+        "input_tokens": turn.input_tokens,
+        "cached_input_tokens": turn.cached_input_tokens,
+        "hit_ratio": round(cache_turn.hit_ratio, 4) if cache_turn.hit_ratio is not None else None,
+        "dropped": cache_turn.dropped,
+        "missed_tokens": cache_turn.missed_tokens,
+        "estimated_miss_cost": round(cache_turn.miss_cost, 6) if cache_turn.miss_cost is not None else None,
+    }
+
+
+def cache_report_records(report: CacheReport) -> List[Dict[str, Any]]:
+    records = []
+    for directory_name, cache_turns in report.turns.items():
+        records.extend(cache_turn_record(directory_name, cache_turn) for cache_turn in cache_turns)
+        records.append(cache_totals_record("cache_directory", "directory", directory_name, report.directories[directory_name]))
+    for model_name, totals in sorted(report.models.items()):
+        records.append(cache_totals_record("cache_model", "model", model_name, totals))
+    return records
+
+
+def print_cache_report(report: CacheReport) -> None:
+    def summary(totals: CacheTotals) -> str:
+        hit_ratio = totals.hit_ratio
+        hit_label = f"{hit_ratio * 100:.1f}%" if hit_ratio is not None else "n/a"
+        cost_label = "n/a" if totals.miss_cost_missing else f"${totals.miss_cost:.4f}"
+        return (
+            f"turns={totals.turns} hit={hit_label} drops={totals.drops}"
+            f" missed_tokens={totals.missed_tokens} miss_cost={cost_label}"
+        )
+
+    print("Prompt cache efficiency:")
+    if not report.turns:
+        print("  no turns found")
+        return
+    for model_name, totals in sorted(report.models.items()):
+        print(f"  {model_name}: {summary(totals)}")
+    print("  Directories:")
+    for directory_name, totals in sorted(report.directories.items(), key=lambda item: -item[1].missed_tokens):
+        print(f"    {directory_name}: {summary(totals)}")
+        for cache_turn in report.turns[directory_name]:
+            if not cache_turn.dropped:
+                continue
+            cost_label = f" ~${cache_turn.miss_cost:.4f}" if cache_turn.miss_cost is not None else ""
+            print(
+                f"      drop at {cache_turn.turn.request_index}:"
+                f" {cache_turn.previous_hit_ratio * 100:.1f}% -> {cache_turn.hit_ratio * 100:.1f}%"
+                f" missed={cache_turn.missed_tokens}{cost_label}"
+            )
+
+
 def clamp(value: int, lower: int, upper: int) -> int:
     if value < lower:
         return lower
@@ -897,34 +2990,830 @@ def clamp(value: int, lower: int, upper: int) -> int:
     return value
 
 
+def clamp_float(value: float, lower: float, upper: float) -> float:
+    return min(max(value, lower), upper)
+
+
 def load_data(
     history_root: Path,
     day_start: datetime,
     day_end: datetime,
+    use_index: bool = True,
+    jobs: int = 1,
+    stats: Optional[IngestStats] = None,
+    catalog: Optional[HistoryCatalog] = None,
+    profile: Optional[StageProfiler] = None,
+    turn_filter: Optional[TurnFilter] = None,
+) -> Tuple[List[Turn], List[GapAnnotation]]:
+    all_turns = load_root_turns(history_root, day_start, day_end, use_index, jobs, stats, catalog, profile, turn_filter)
+    with profile_stage(profile, "gaps") as totals:
+        gaps = gather_gaps(all_turns)
+        if totals is not None:
+            totals.items += len(gaps)
+    return all_turns, gaps
+
+
+def load_history_roots(
+    history_roots: Sequence[Path],
+    day_start: datetime,
+    day_end: datetime,
+    use_index: bool = True,
+    jobs: int = 1,
+    stats: Optional[IngestStats] = None,
+    catalogs: Optional[Sequence[HistoryCatalog]] = None,
+    profile: Optional[StageProfiler] = None,
+    turn_filter: Optional[TurnFilter] = None,
 ) -> Tuple[List[Turn], List[GapAnnotation]]:
-    all_turns: List[Turn] = []
-    for directory in sorted(history_root.iterdir()):
-        if not directory.is_dir():
+    if len(history_roots) == 1:
+        catalog = catalogs[0] if catalogs else None
+        return load_data(history_roots[0], day_start, day_end, use_index, jobs, stats, catalog, profile, turn_filter)
+
+    stats = stats if stats is not None else IngestStats()
+    streams: List[List[Turn]] = []
+    for position, label in enumerate(history_root_labels(history_roots)):
+        catalog = catalogs[position] if catalogs else None
+        turns = load_root_turns(
+            history_roots[position], day_start, day_end, use_index, jobs, stats, catalog, profile, turn_filter
+        )
+        qualify_turns(turns, label)
+        streams.append(turns)
+    # every root's turns are already sorted by request time, so a k-way merge orders the timeline
+    all_turns = list(heapq.merge(*streams, key=attrgetter("request_ms")))
+    with profile_stage(profile, "gaps") as totals:
+        gaps = gather_gaps(all_turns)
+        if totals is not None:
+            totals.items += len(gaps)
+    return all_turns, gaps
+
+
+def load_root_turns(
+    history_root: Path,
+    day_start: datetime,
+    day_end: datetime,
+    use_index: bool = True,
+    jobs: int = 1,
+    stats: Optional[IngestStats] = None,
+    catalog: Optional[HistoryCatalog] = None,
+    profile: Optional[StageProfiler] = None,
+    turn_filter: Optional[TurnFilter] = None,
+) -> List[Turn]:
+    all_turns = [
+        turn
+        for _, turns in iter_root_directories(
+            history_root, day_start, day_end, use_index, jobs, stats, catalog, profile, turn_filter
+        )
+        for turn in turns
+    ]
+    all_turns.sort(key=attrgetter("request_ms"))
+    return all_turns
+
+
+def iter_root_directories(
+    history_root: Path,
+    day_start: datetime,
+    day_end: datetime,
+    use_index: bool = True,
+    jobs: int = 1,
+    stats: Optional[IngestStats] = None,
+    catalog: Optional[HistoryCatalog] = None,
+    profile: Optional[StageProfiler] = None,
+    turn_filter: Optional[TurnFilter] = None,
+) -> Iterator[Tuple[datetime, List[Turn]]]:
+    # Yields (directory timestamp, turns) for every directory in the window, in catalog order, as
+    # soon as it is loaded. An optype filter drops directories before they are listed. Per-turn
+    # filters still serve unchanged directories from the index, but the partial results they
+    # parse are not stored. The index is saved once the last directory has been yielded.
+    stats = stats if stats is not None else IngestStats()
+    stats.jobs = max(1, jobs)
+    if catalog is None:
+        with profile_stage(profile, "catalog") as totals:
+            catalog = HistoryCatalog.scan(history_root)
+            if totals is not None:
+                totals.items += len(catalog.entries)
+    index = None
+    if use_index:
+        index_path = history_index_path(history_root)
+        with profile_stage(profile, "index_load") as totals:
+            index = HistoryIndex.load(index_path)
+            if totals is not None:
+                totals.items += len(index.entries)
+                totals.bytes_read += file_size(index_path)
+    # cached directories keep their index records until their turn comes, so turns are only
+    # built for the directory being handed out
+    planned: List[Tuple[CatalogEntry, Optional[List[Dict[str, Any]]], Optional[str]]] = []
+    pending: List[Path] = []
+    per_turn_filter = turn_filter is not None and turn_filter.per_turn
+    for entry in catalog.window(day_start, day_end):
+        if turn_filter is not None and not turn_filter.accepts_directory(entry.name):
+            continue
+        stats.directory_count += 1
+        records, signature = None, None
+        if index is not None:
+            with profile_stage(profile, "index_lookup") as totals:
+                records, signature = indexed_records(entry.path, index)
+                if totals is not None and records is not None:
+                    totals.items += 1
+        if records is not None:
+            stats.cached_directory_count += 1
+        else:
+            pending.append(entry.path)
+        planned.append((entry, records, signature))
+
+    started = time.perf_counter()
+    results = map_load_turns(
+        pending,
+        day_start,
+        day_end,
+        stats.jobs,
+        profiled=profile is not None,
+        turn_filter=turn_filter,
+    )
+    for entry, records, signature in planned:
+        if records is not None:
+            turns = turns_from_records(entry.path, records)
+            yield entry.ts, filter_directory_turns(turns, turn_filter) if per_turn_filter else turns
+            continue
+        turns, elapsed, worker_profile = next(results)
+        stats.task_ms += elapsed * 1000
+        if profile is not None and worker_profile is not None:
+            profile.merge(worker_profile)
+        if index is not None and signature is not None and not per_turn_filter:
+            index.store(entry.name, signature, [turn_to_record(turn) for turn in turns])
+        yield entry.ts, turns
+    # resuming map_load_turns past its last result is what shuts its worker pool down
+    for _ in results:
+        pass
+    stats.wall_ms += (time.perf_counter() - started) * 1000
+
+    if index is not None:
+        with profile_stage(profile, "index_save") as totals:
+            index.retain(catalog.names())
+            if totals is not None and index.dirty:
+                totals.items += len(index.entries)
+            index.save()
+
+
+def iter_history_directories(
+    history_roots: Sequence[Path],
+    day_start: datetime,
+    day_end: datetime,
+    use_index: bool = True,
+    jobs: int = 1,
+    stats: Optional[IngestStats] = None,
+    catalogs: Optional[Sequence[HistoryCatalog]] = None,
+    profile: Optional[StageProfiler] = None,
+    turn_filter: Optional[TurnFilter] = None,
+) -> Iterator[Tuple[datetime, List[Turn]]]:
+    # the per-directory stream behind --debug: every root yields in timestamp order, so
+    # several roots are merged on the directory timestamp
+    stats = stats if stats is not None else IngestStats()
+    streams = []
+    for position, label in enumerate(history_root_labels(history_roots)):
+        catalog = catalogs[position] if catalogs else None
+        stream = iter_root_directories(
+            history_roots[position], day_start, day_end, use_index, jobs, stats, catalog, profile, turn_filter
+        )
+        streams.append(stream if len(history_roots) == 1 else qualified_directories(stream, label))
+    yield from heapq.merge(*streams, key=itemgetter(0))
+
+
+def qualified_directories(
+    directories: Iterable[Tuple[datetime, List[Turn]]], label: str
+) -> Iterator[Tuple[datetime, List[Turn]]]:
+    for directory_ts, turns in directories:
+        qualify_turns(turns, label)
+        yield directory_ts, turns
+
+
+class HistoryFollower:
+    # Polls a history root for new task directories and new files in recently active ones. Only
+    # directories that changed within the last FOLLOW_HOT_SECONDS are listed on each poll, and
+    # only requests whose files changed are re-parsed. Quieter directories in the window are
+    # cold: every FOLLOW_COLD_CHECK_POLLS polls their mtime is compared, and a change makes them
+    # hot again, since new files inside them do not touch the root's mtime. The snapshot is taken
+    # before ingestion and its catalog is the one to load from, so whatever is written while the
+    # turns load shows up on the first poll; the loaded turns are handed over with seed_turns.
+
+    def __init__(
+        self,
+        history_root: Path,
+        window_start: datetime,
+        window_end: Optional[datetime],
+        turns: Sequence[Turn] = (),
+        hot_seconds: float = FOLLOW_HOT_SECONDS,
+        turn_filter: Optional[TurnFilter] = None,
+        cold_check_polls: int = FOLLOW_COLD_CHECK_POLLS,
+    ):
+        self.history_root = history_root
+        self.turn_filter = turn_filter
+        self.window_start = window_start
+        self.window_end = window_end
+        self.hot_seconds = hot_seconds
+        self.cold_check_polls = max(1, cold_check_polls)
+        self.poll_count = 0
+        self.root_mtime_ns = self._mtime_ns(history_root)
+        self.known_directories: set[str] = set()
+        self.hot_directories: Dict[str, float] = {}
+        self.cold_directories: Dict[str, Optional[int]] = {}
+        self.directory_files: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self.turns_by_directory: Dict[str, Dict[str, Turn]] = defaultdict(dict)
+        self.seed_turns(turns)
+
+        now = time.monotonic()
+        wall_now = time.time()
+        self.catalog = HistoryCatalog.scan(history_root)
+        for entry in self.catalog.entries:
+            self.known_directories.add(entry.name)
+            if not self._in_window(entry.ts) or (turn_filter is not None and not turn_filter.accepts_directory(entry.name)):
+                continue
+            mtime_ns = self._mtime_ns(entry.path)
+            if mtime_ns is not None and wall_now - mtime_ns / 1e9 <= hot_seconds:
+                self.hot_directories[entry.name] = now
+                self.directory_files[entry.name] = self._list_files(entry.path)
+            elif mtime_ns is not None:
+                # never listed, so a revival re-parses the whole directory once
+                self.cold_directories[entry.name] = mtime_ns
+
+    def seed_turns(self, turns: Iterable[Turn]) -> None:
+        for turn in turns:
+            self.turns_by_directory[turn.directory_name][turn.request_index] = turn
+
+    @staticmethod
+    def _mtime_ns(path: Path) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _list_files(directory: Path) -> Dict[str, Tuple[int, int]]:
+        files: Dict[str, Tuple[int, int]] = {}
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                if not FILE_RE.match(entry.name):
+                    continue
+                try:
+                    entry_stat = entry.stat()
+                except OSError:
+                    continue
+                if stat.S_ISREG(entry_stat.st_mode):
+                    files[entry.name] = (entry_stat.st_size, entry_stat.st_mtime_ns)
+        return files
+
+    def _in_window(self, directory_timestamp: datetime) -> bool:
+        if directory_timestamp < self.window_start:
+            return False
+        return self.window_end is None or directory_timestamp <= self.window_end
+
+    def _discover_directories(self, now: float) -> None:
+        root_mtime_ns = self._mtime_ns(self.history_root)
+        if root_mtime_ns == self.root_mtime_ns:
+            return
+        self.root_mtime_ns = root_mtime_ns
+        with os.scandir(self.history_root) as iterator:
+            for entry in iterator:
+                if entry.name in self.known_directories:
+                    continue
+                self.known_directories.add(entry.name)
+                directory_timestamp = parse_directory_timestamp(entry.name)
+                if directory_timestamp is None or not self._in_window(directory_timestamp):
+                    continue
+                if self.turn_filter is not None and not self.turn_filter.accepts_directory(entry.name):
+                    continue
+                if entry.is_dir():
+                    self.hot_directories[entry.name] = now
+
+    def _revive_cold_directories(self, now: float) -> None:
+        for directory_name, mtime_ns in list(self.cold_directories.items()):
+            current_mtime_ns = self._mtime_ns(self.history_root / directory_name)
+            if current_mtime_ns == mtime_ns:
+                continue
+            del self.cold_directories[directory_name]
+            if current_mtime_ns is not None:
+                self.hot_directories[directory_name] = now
+
+    def _refresh_directory(self, directory: Path) -> Optional[List[Turn]]:
+        files = self._list_files(directory)
+        previous = self.directory_files.get(directory.name, {})
+        changed = [name for name, signature in files.items() if previous.get(name) != signature]
+        if not changed:
+            return None
+        self.directory_files[directory.name] = files
+
+        match = DIR_RE.match(directory.name)
+        if not match:
+            return None
+        optype = match.group("optype")
+        row = row_label(optype, match.group("noise"))
+        base_day = datetime.strptime(match.group("date"), "%Y-%m-%d").date()
+        entries = [
+            parsed
+            for parsed in (parse_file_entry(base_day, name, directory / name) for name in files)
+            if parsed is not None
+        ]
+        changed_indices = {parsed.index for parsed in entries if parsed.path.name in changed}
+
+        known = self.turns_by_directory[directory.name]
+        if self.turn_filter is not None and self.turn_filter.per_turn:
+            # whether a request passes can change as its files arrive, which also changes
+            # whether the request after it follows a filtered one
+            request_order = sorted(
+                (parsed for parsed in entries if parsed.suffix == "request.json"), key=attrgetter("ts")
+            )
+            changed_requests = set(changed_indices)
+            for previous, following in zip(request_order, request_order[1:]):
+                if previous.index in changed_requests:
+                    changed_indices.add(following.index)
+            for index in changed_indices:
+                known.pop(index, None)
+        for turn in build_turns(
+            directory, optype, row, entries, changed_indices, turn_filter=self.turn_filter, kept_indices=set(known)
+        ):
+            known[turn.request_index] = turn
+        return sorted(known.values(), key=attrgetter("request_ms"))
+
+    def poll(self) -> Dict[str, List[Turn]]:
+        # returns the complete, sorted turn list of every directory that changed since the last poll
+        now = time.monotonic()
+        self._discover_directories(now)
+        self.poll_count += 1
+        if self.poll_count % self.cold_check_polls == 0:
+            self._revive_cold_directories(now)
+
+        changed: Dict[str, List[Turn]] = {}
+        for directory_name, last_change in list(self.hot_directories.items()):
+            try:
+                turns = self._refresh_directory(self.history_root / directory_name)
+            except OSError:
+                del self.hot_directories[directory_name]
+                continue
+            if turns is None:
+                if now - last_change > self.hot_seconds:
+                    del self.hot_directories[directory_name]
+                    self.cold_directories[directory_name] = self._mtime_ns(self.history_root / directory_name)
+                continue
+            self.hot_directories[directory_name] = now
+            changed[directory_name] = turns
+        return changed
+
+
+def compute_row_groups(
+    row_labels: Sequence[str],
+    row_start: Dict[str, int],
+    row_end: Dict[str, int],
+) -> Tuple[Dict[str, Optional[str]], Dict[str, int], Dict[str, str]]:
+    # row_labels must be ordered by start time. A row's parent is the latest earlier row whose
+    # span contains it; rows on the stack have non-increasing ends, so any row popped here is
+    # shadowed by a later row that ends after it and can never be the nearest container again.
+    parent: Dict[str, Optional[str]] = {}
+    depth: Dict[str, int] = {}
+    root: Dict[str, str] = {}
+    open_rows: List[Tuple[int, str]] = []
+    for row_name in row_labels:
+        start = row_start.get(row_name)
+        end = row_end.get(row_name)
+        if start is None or end is None:
+            parent[row_name] = None
+            depth[row_name] = 0
+            root[row_name] = row_name
             continue
-        dir_start = parse_directory_timestamp(directory.name)
-        if dir_start is None:
+        while open_rows and open_rows[-1][0] < end:
+            open_rows.pop()
+        container = open_rows[-1][1] if open_rows else None
+        parent[row_name] = container
+        depth[row_name] = depth[container] + 1 if container is not None else 0
+        root[row_name] = root[container] if container is not None else row_name
+        open_rows.append((end, row_name))
+    return parent, depth, root
+
+
+def iter_trace_events(turns: Sequence[Turn], gaps: Iterable[GapAnnotation]) -> Iterator[Dict[str, Any]]:
+    # Chrome trace-event records: one process per root row group and one thread per task
+    # directory inside it, so nested tasks sit under the task that spawned them like the
+    # canvas rows. Turns are complete ("X") slices; each gap is an async slice on the
+    # directory's track plus a flow arrow from the turn it follows to the turn it precedes.
+    row_first_ms: Dict[str, int] = {}
+    row_last_ms: Dict[str, int] = {}
+    row_label: Dict[str, str] = {}
+    for turn in turns:
+        directory_name = turn.directory_name
+        if directory_name not in row_first_ms or turn.request_ms < row_first_ms[directory_name]:
+            row_first_ms[directory_name] = turn.request_ms
+            row_label[directory_name] = turn.row_label
+        row_last_ms[directory_name] = max(row_last_ms.get(directory_name, turn.response_ms), turn.response_ms)
+    row_labels = sorted(row_first_ms, key=lambda row: (row_first_ms[row], row))
+    _, depth, root = compute_row_groups(row_labels, row_first_ms, row_last_ms)
+
+    pids: Dict[str, int] = {}
+    tids: Dict[str, int] = {}
+    for position, row_name in enumerate(row_labels):
+        root_name = root[row_name]
+        if root_name not in pids:
+            pids[root_name] = len(pids) + 1
+            yield {"ph": "M", "name": "process_name", "pid": pids[root_name], "args": {"name": row_label[root_name]}}
+            yield {"ph": "M", "name": "process_sort_index", "pid": pids[root_name], "args": {"sort_index": pids[root_name]}}
+        tids[row_name] = position + 1
+        pid = pids[root_name]
+        yield {"ph": "M", "name": "thread_name", "pid": pid, "tid": tids[row_name], "args": {"name": "  " * depth[row_name] + row_name}}
+        yield {"ph": "M", "name": "thread_sort_index", "pid": pid, "tid": tids[row_name], "args": {"sort_index": tids[row_name]}}
+
+    for turn in turns:
+        yield {
+            "ph": "X",
+            "name": f"{turn.request_index} {turn.model or '<missing>'}",
+            "cat": turn.optype,
+            "pid": pids[root[turn.directory_name]],
+            "tid": tids[turn.directory_name],
+            "ts": turn.request_ms * 1000,
+            "dur": max(0, turn.response_ms - turn.request_ms) * 1000,
+            "args": {
+                "directory": turn.directory_name,
+                "service_tier": service_tier_normalized(turn.service_tier),
+                "input_tokens": turn.input_tokens,
+                "cached_input_tokens": turn.cached_input_tokens,
+                "output_tokens": turn.output_tokens,
+                "tools": list(turn.tools),
+                "log": turn.log_name,
+            },
+        }
+
+    for gap_id, gap in enumerate(gaps, start=1):
+        pid = pids[root[gap.directory_name]]
+        tid = tids[gap.directory_name]
+        name = ", ".join(gap.tools) if gap.tools else "no-tools"
+        common = {"cat": "gap", "pid": pid, "tid": tid, "id": gap_id}
+        yield {**common, "ph": "b", "name": name, "ts": gap.start_ms * 1000, "args": {"from": gap.from_request, "to": gap.to_request}}
+        yield {**common, "ph": "e", "name": name, "ts": gap.end_ms * 1000}
+        yield {**common, "ph": "s", "name": "gap", "ts": gap.start_ms * 1000}
+        yield {**common, "ph": "f", "bp": "e", "name": "gap", "ts": gap.end_ms * 1000}
+
+
+def write_trace(path: Path, turns: Sequence[Turn], gaps: Iterable[GapAnnotation], totals: Optional[StageTotals] = None) -> int:
+    # events are serialised one at a time so the document never exists in memory as a whole;
+    # a .gz suffix writes it compressed, which trace viewers open directly
+    opener = gzip.open if path.suffix == ".gz" else open
+    event_count = 0
+    with opener(path, "wt", encoding="utf-8") as file:
+        file.write('{"displayTimeUnit":"ms","traceEvents":[\n')
+        for event in iter_trace_events(turns, gaps):
+            if event_count:
+                file.write(",\n")
+            file.write(json.dumps(event, separators=(",", ":")))
+            event_count += 1
+        file.write("\n]}\n")
+    if totals is not None:
+        totals.items += event_count
+    return event_count
+
+
+@dataclass
+class DensityBucket:
+    left: int
+    right: int
+    count: int
+    busy_px: int
+
+    @property
+    def utilization(self) -> float:
+        return min(1.0, self.busy_px / max(1, self.right - self.left))
+
+
+def aggregate_spans(
+    spans: Sequence[Tuple[int, int]],
+    min_span_px: int = LOD_MIN_TURN_PX,
+    bucket_px: int = LOD_BUCKET_PX,
+) -> Tuple[List[int], List[DensityBucket]]:
+    # Splits x spans into the ones wide enough to draw on their own and density buckets that
+    # stand in for runs of narrow spans sharing the same pixel columns.
+    individual: List[int] = []
+    members: Dict[int, List[int]] = defaultdict(list)
+    for position, (x1, x2) in enumerate(spans):
+        if x2 - x1 >= min_span_px:
+            individual.append(position)
+        else:
+            members[x1 // bucket_px].append(position)
+
+    buckets: List[DensityBucket] = []
+    for column in sorted(members):
+        positions = members[column]
+        if len(positions) == 1:
+            individual.append(positions[0])
             continue
-        if dir_start < day_start or dir_start > day_end:
+        left = column * bucket_px
+        right = left + bucket_px
+        busy_px = sum(spans[position][1] - spans[position][0] for position in positions)
+        buckets.append(DensityBucket(left, max(right, max(spans[position][1] for position in positions)), len(positions), busy_px))
+    individual.sort()
+    return individual, buckets
+
+
+def row_color_hex(row_name: str) -> str:
+    # same saturation and value as the canvas row colours, with a hue that is stable across runs
+    hue = int.from_bytes(hashlib.blake2b(row_name.encode("utf-8"), digest_size=2).digest(), "big") % 360
+    red, green, blue = colorsys.hsv_to_rgb(hue / 360, 170 / 255, 220 / 255)
+    return f"#{round(red * 255):02x}{round(green * 255):02x}{round(blue * 255):02x}"
+
+
+def format_clock_seconds(seconds: float) -> str:
+    total_seconds = max(0, int(seconds))
+    return f"{total_seconds // 3600:02}:{(total_seconds % 3600) // 60:02}:{total_seconds % 60:02}"
+
+
+def iter_svg_chart(
+    turns: Sequence[Turn],
+    gaps: Iterable[GapAnnotation],
+    plot_width: int = DEFAULT_RENDER_PLOT_WIDTH,
+) -> Iterator[str]:
+    # Static counterpart of GanttCanvas.paintEvent with every row group expanded: rows nested
+    # by compute_row_groups and timed from their group's start, turns folded into density
+    # buckets by aggregate_spans, collapsed gap boxes that skip overlaps, and the "+Ns" arrows
+    # between consecutive root rows. Details the canvas shows on click become <title> tooltips.
+    top_margin = 50
+    rows: Dict[str, List[Turn]] = defaultdict(list)
+    for turn in turns:
+        rows[turn.directory_name].append(turn)
+    for row_turns in rows.values():
+        row_turns.sort(key=attrgetter("request_ms"))
+    row_labels = sorted(rows, key=lambda row: (rows[row][0].request_ms, row))
+    row_start = {row: rows[row][0].request_ms for row in row_labels}
+    row_end = {row: max(turn.response_ms for turn in rows[row]) for row in row_labels}
+    _, depth, root = compute_row_groups(row_labels, row_start, row_end)
+    group_start_ms = {row: rows[root[row]][0].request_ms for row in row_labels}
+    gaps_by_row: Dict[str, List[GapAnnotation]] = defaultdict(list)
+    for gap in gaps:
+        gaps_by_row[gap.directory_name].append(gap)
+
+    total_ms = max([1000] + [row_end[row] - group_start_ms[row] for row in row_labels])
+    width = CHART_LEFT_MARGIN + plot_width + CHART_RIGHT_MARGIN
+    height = top_margin + max(1, len(row_labels)) * CHART_ROW_HEIGHT + CHART_BOTTOM_MARGIN
+    chart_right = CHART_LEFT_MARGIN + plot_width
+
+    def row_x(row_name: str, when_ms: int) -> int:
+        return CHART_LEFT_MARGIN + clamp(int((when_ms - group_start_ms[row_name]) / total_ms * plot_width), 0, plot_width)
+
+    def span_x(row_name: str, turn: Turn) -> Tuple[int, int]:
+        x1, x2 = sorted((row_x(row_name, turn.request_ms), row_x(row_name, turn.response_ms)))
+        return (x1, x1 + 3) if x1 == x2 else (x1, x2)
+
+    def text(x: int, y: int, value: str, extra: str = "") -> str:
+        return f'<text x="{x}" y="{y}"{extra}>{html.escape(value)}</text>\n'
+
+    yield (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}"'
+        ' font-family="sans-serif" font-size="11">\n'
+        f'<rect width="{width}" height="{height}" fill="white"/>\n'
+    )
+    if not row_labels:
+        yield text(20, 40, "No data in selected time window")
+        yield "</svg>\n"
+        return
+
+    row_area_bottom = top_margin + len(row_labels) * CHART_ROW_HEIGHT
+    yield f'<path d="M{CHART_LEFT_MARGIN} {top_margin}H{chart_right}M{CHART_LEFT_MARGIN} {row_area_bottom}H{chart_right}" stroke="black"/>\n'
+    pixels_per_second = plot_width / (total_ms / 1000)
+    step = next(
+        (step for step in AXIS_TICK_STEPS_SECONDS if step * pixels_per_second >= AXIS_TICK_MIN_SPACING_PX),
+        AXIS_TICK_STEPS_SECONDS[-1],
+    )
+    for tick in range(0, int(total_ms / 1000) + 1, step):
+        x = CHART_LEFT_MARGIN + int(tick * pixels_per_second)
+        yield f'<path d="M{x} {top_margin - 6}V{top_margin + 4}" stroke="black"/>\n'
+        yield text(x - 26, top_margin - 28, format_clock_seconds(tick))
+
+    for position, row_name in enumerate(row_labels):
+        row_turns = rows[row_name]
+        y = top_margin + position * CHART_ROW_HEIGHT
+        linked = " [linked]" if depth[row_name] > 0 else ""
+        label = f"{' ' * (depth[row_name] * 2)}{row_turns[0].row_label}{linked}"
+        yield text(8, y + 16, label, ' xml:space="preserve"')
+
+        color = row_color_hex(row_name)
+        y_bar = y + CHART_ROW_HEIGHT // 2 - CHART_BAR_HEIGHT // 2
+        spans = [span_x(row_name, turn) for turn in row_turns]
+        individual, buckets = aggregate_spans(spans)
+        yield f'<g fill="{color}">\n'
+        for bucket in buckets:
+            bucket_left = clamp(bucket.left, CHART_LEFT_MARGIN, chart_right)
+            bucket_right = clamp(bucket.right, bucket_left, chart_right)
+            opacity = (60 + 195 * bucket.utilization) / 255
+            yield (
+                f'<rect x="{bucket_left}" y="{y_bar}" width="{max(1, bucket_right - bucket_left)}" height="{CHART_BAR_HEIGHT}"'
+                f' fill-opacity="{opacity:.2f}"><title>{bucket.count} turns</title></rect>\n'
+            )
+        yield "</g>\n"
+        yield f'<g fill="{color}" stroke="black">\n'
+        labels: List[str] = []
+        for offset in individual:
+            turn = row_turns[offset]
+            x1, x2 = spans[offset]
+            rect_width = max(3, x2 - x1)
+            turn_s = seconds_from_ms(turn.response_ms - turn.request_ms)
+            tooltip = f"{turn.request_index} {turn.model or '<missing>'} {turn_s}s in={turn.input_tokens} cached={turn.cached_input_tokens} out={turn.output_tokens}"
+            yield (
+                f'<rect x="{x1}" y="{y_bar}" width="{rect_width}" height="{CHART_BAR_HEIGHT}">'
+                f"<title>{html.escape(tooltip)}</title></rect>\n"
+            )
+            label = f"{turn.request_index} ({turn_s}s)"
+            if rect_width >= max(LOD_MIN_LABEL_PX, len(label) * RENDER_CHAR_WIDTH_PX + 6):
+                labels.append(text(x1 + 3, y_bar + CHART_BAR_HEIGHT - 3, label))
+        yield "</g>\n"
+        yield from labels
+
+        # the boxes sit under the bars inside the row, since every row is expanded here
+        last_box_right: Optional[int] = None
+        box_top = y_bar + CHART_BAR_HEIGHT + 2
+        box_h = CHART_ROW_HEIGHT - (box_top - y) - 1
+        for gap in sorted(gaps_by_row.get(row_name, []), key=attrgetter("start_ms")):
+            mid = (row_x(row_name, gap.start_ms) + row_x(row_name, gap.end_ms)) // 2
+            label = f"{seconds_from_ms(gap.end_ms - gap.start_ms)}s"
+            box_w = len(label) * RENDER_CHAR_WIDTH_PX + 8
+            box_left = clamp(mid - box_w // 2, CHART_LEFT_MARGIN, chart_right - box_w)
+            if last_box_right is not None and box_left <= last_box_right:
+                continue
+            last_box_right = box_left + box_w
+            tools = "\n".join(gap.tools) if gap.tools else "no-tools"
+            yield (
+                f'<g><title>{html.escape(tools)}</title>'
+                f'<rect x="{box_left}" y="{box_top}" width="{box_w}" height="{box_h}" fill="white" stroke="black"/>'
+                f'<text x="{box_left + 4}" y="{box_top + box_h - 3}" font-size="10">{label}</text></g>\n'
+            )
+
+    row_positions = {row_name: position for position, row_name in enumerate(row_labels)}
+    roots = [row for row in row_labels if depth[row] == 0]
+    for row_name, next_row_name in zip(roots, roots[1:]):
+        elapsed_seconds = int((rows[next_row_name][0].request_ms - row_end[row_name]) / 1000)
+        if elapsed_seconds <= 0:
             continue
-        all_turns.extend(load_turns(directory, day_start, day_end))
+        start_x = span_x(row_name, rows[row_name][-1])[1]
+        end_x = span_x(next_row_name, rows[next_row_name][0])[0]
+        start_y = top_margin + row_positions[row_name] * CHART_ROW_HEIGHT + CHART_ROW_HEIGHT // 2
+        end_y = top_margin + row_positions[next_row_name] * CHART_ROW_HEIGHT + CHART_ROW_HEIGHT // 2
+        head = -6 if end_x >= start_x else 6
+        yield (
+            f'<path d="M{start_x} {start_y}L{end_x} {end_y}M{end_x} {end_y}l{head} -4M{end_x} {end_y}l{head} 4"'
+            ' stroke="black" fill="none"/>\n'
+        )
+        label = f"+{elapsed_seconds}s"
+        label_x = clamp((start_x + end_x) // 2 - len(label) * RENDER_CHAR_WIDTH_PX // 2, CHART_LEFT_MARGIN, width - 1)
+        yield text(label_x, (start_y + end_y) // 2 - 6, label)
+    yield "</svg>\n"
 
-    all_turns.sort(key=lambda item: item.request_ts)
-    return all_turns, gather_gaps(all_turns)
+
+def write_static_chart(
+    path: Path,
+    turns: Sequence[Turn],
+    gaps: Iterable[GapAnnotation],
+    plot_width: int = DEFAULT_RENDER_PLOT_WIDTH,
+) -> None:
+    # .html wraps the same SVG in a standalone page so it scrolls in a browser
+    as_html = path.suffix.lower() in (".html", ".htm")
+    with path.open("w", encoding="utf-8") as file:
+        if as_html:
+            file.write(
+                '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>llm history</title>'
+                "<style>body{margin:0;overflow:auto}</style></head><body>\n"
+            )
+        for fragment in iter_svg_chart(turns, gaps, plot_width):
+            file.write(fragment)
+        if as_html:
+            file.write("</body></html>\n")
+
+
+def format_bytes(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / (1024 * 1024):.1f} MiB"
 
 
-def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start: datetime, day_end: datetime) -> int:
+@dataclass(frozen=True)
+class LogSection:
+    name: str
+    start: int
+    end: int
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+def index_log_sections(data: Any) -> List[LogSection]:
+    # byte offsets of each section body; data may be bytes or an mmap, so nothing is decoded here
+    headers = list(LOG_SECTION_HEADER_RE.finditer(data))
+    if not headers:
+        return [LogSection("log", 0, len(data))] if len(data) else []
+    sections = []
+    response_header = LOG_RESPONSE_HEADER_RE.search(data, 0, headers[0].start())
+    if response_header is not None and data[response_header.end() : headers[0].start()].strip():
+        sections.append(LogSection("response", response_header.end(), headers[0].start()))
+    for header, following in zip(headers, headers[1:] + [None]):
+        end = following.start() if following is not None else len(data)
+        sections.append(LogSection(header.group(1).decode("ascii"), header.end(), end))
+    return sections
+
+
+class LogDocument:
+    # A response log mapped into memory; the viewer decodes one page of one section at a time.
+
+    def __init__(self, log_path: Path):
+        self.log_path = log_path
+        self._file: Optional[Any] = None
+        self.data: Any = b""
+        if isinstance(log_path, ArchivePath):
+            # compressed members cannot be mapped, so they are inflated once
+            with log_path.open("rb") as file:
+                self.data = file.read()
+        else:
+            self._file = log_path.open("rb")
+            if os.fstat(self._file.fileno()).st_size > 0:
+                self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.sections = index_log_sections(self.data)
+
+    def page(self, section: LogSection, offset: int, limit: int = LOG_VIEWER_PAGE_BYTES) -> Tuple[str, int]:
+        # returns the decoded page and the offset of the next one; pages never split a UTF-8 sequence
+        end = min(section.end, offset + max(1, limit))
+        while end < section.end and (self.data[end] & 0xC0) == 0x80:
+            end += 1
+        return self.data[offset:end].decode("utf-8", errors="replace"), end
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = b""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SpatialHitIndex:
+    # Uniform grid of hit rectangles; a click only inspects the rectangles registered in its cell.
+
+    def __init__(self, cell_size: int = HIT_GRID_CELL_PX):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Any]] = defaultdict(list)
+        self.rects: Dict[Any, Tuple[int, int, int, int]] = {}
+        self.payloads: Dict[Any, Any] = {}
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.rects.clear()
+        self.payloads.clear()
+
+    def _cells_for(self, left: int, top: int, width: int, height: int) -> Iterator[Tuple[int, int]]:
+        for cell_x in range(left // self.cell_size, (left + max(0, width - 1)) // self.cell_size + 1):
+            for cell_y in range(top // self.cell_size, (top + max(0, height - 1)) // self.cell_size + 1):
+                yield cell_x, cell_y
+
+    def add(self, key: Any, left: int, top: int, width: int, height: int, payload: Any = None) -> None:
+        if key in self.rects:
+            self.remove(key)
+        self.rects[key] = (left, top, width, height)
+        self.payloads[key] = payload
+        for cell in self._cells_for(left, top, width, height):
+            self.cells[cell].append(key)
+
+    def remove(self, key: Any) -> None:
+        rect = self.rects.pop(key, None)
+        self.payloads.pop(key, None)
+        if rect is None:
+            return
+        for cell in self._cells_for(*rect):
+            keys = self.cells.get(cell)
+            if keys is not None:
+                keys.remove(key)
+                if not keys:
+                    del self.cells[cell]
+
+    def query(self, x: int, y: int) -> List[Any]:
+        # most recently added first, matching paint order where later items are drawn on top
+        hits: List[Any] = []
+        for key in reversed(self.cells.get((x // self.cell_size, y // self.cell_size), [])):
+            left, top, width, height = self.rects[key]
+            if left <= x <= left + width and top <= y <= top + height:
+                hits.append(key)
+        return hits
+
+
+def launch_gui(
+    turns: Sequence[Turn],
+    gaps: Sequence[GapAnnotation],
+    day_start: datetime,
+    day_end: datetime,
+    follower: Optional[HistoryFollower] = None,
+    profile: Optional[StageProfiler] = None,
+) -> int:
     try:
-            from PyQt6.QtGui import QColor, QPainter
-            from PyQt6.QtCore import QRect
+            from PyQt6.QtGui import QColor, QPainter, QTextCursor
+            from PyQt6.QtCore import QRect, Qt, QTimer
             from PyQt6.QtWidgets import (
                 QApplication,
+                QComboBox,
                 QDialog,
+                QHBoxLayout,
+                QLabel,
                 QPlainTextEdit,
+                QPushButton,
                 QVBoxLayout,
                 QMainWindow,
                 QScrollArea,
@@ -936,14 +3825,16 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
         )
 
     class GanttCanvas(QWidget):
-        left_margin = 130
-        right_margin = 30
-        top_margin = 50
-        bottom_margin = 40
-        row_height = 44
-        bar_height = 14
-        tick_count = 6
+        left_margin = CHART_LEFT_MARGIN
+        right_margin = CHART_RIGHT_MARGIN
+        concurrency_strip_height = 36
+        top_margin = 50 + concurrency_strip_height
+        bottom_margin = CHART_BOTTOM_MARGIN
+        row_height = CHART_ROW_HEIGHT
+        bar_height = CHART_BAR_HEIGHT
         seconds_per_pixel_cap = 10.0
+        cull_padding = 400
+        scroll_area: Optional[QScrollArea] = None
 
         def __init__(self, turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start: datetime, day_end: datetime):
             super().__init__()
@@ -951,19 +3842,21 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
             self.gaps = list(gaps)
             self.day_start = day_start
             self.day_end = day_end
+            self.day_start_ms = epoch_ms(day_start)
             self.total_seconds = max(1.0, (day_end - day_start).total_seconds())
+            self.pixels_per_second = self.seconds_per_pixel_cap
 
             self.rows: Dict[str, List[Turn]] = defaultdict(list)
             for turn in self.turns:
                 self.rows[turn.directory_name].append(turn)
             self.rows = {
-                directory: sorted(turns, key=lambda item: item.request_ts)
+                directory: sorted(turns, key=attrgetter("request_ms"))
                 for directory, turns in self.rows.items()
                 if turns
             }
             self.row_labels = sorted(
                 self.rows.keys(),
-                key=lambda row: (self.rows[row][0].request_ts, row),
+                key=lambda row: (self.rows[row][0].request_ms, row),
             )
             self.row_display_labels: Dict[str, str] = {}
             for row in self.row_labels:
@@ -984,81 +3877,96 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
             self.display_row_offsets: Dict[str, float] = {}
             self.display_rows: List[str] = []
             self.max_possible_plot_seconds = max(1.0, self.total_seconds)
-            self.row_start_cache: Dict[str, datetime] = {}
-            self.row_end_cache: Dict[str, datetime] = {}
-            self.row_label_hitboxes: Dict[str, QRect] = {}
+            # epoch ms, like the bisect arrays below: datetimes are only built for labels and tooltips
+            self.row_start_cache: Dict[str, int] = {}
+            self.row_end_cache: Dict[str, int] = {}
             self.gaps_by_row: Dict[str, List[GapAnnotation]] = defaultdict(list)
-            self.gap_indices: Dict[int, int] = {}
+            self.gap_ids: Dict[Tuple[str, str, str], int] = {}
+            self.gap_rows: Dict[int, str] = {}
             self.expanded_gaps: set[int] = set()
-            self.gap_hitboxes: Dict[int, QRect] = {}
-            self.turn_hitboxes: Dict[int, QRect] = {}
-            self.turns_by_hitbox: Dict[int, Turn] = {}
-            self.turn_log_viewers: Dict[int, QDialog] = {}
+            self.hit_index = SpatialHitIndex()
+            # keyed by (directory, request index), least recently opened first
+            self.turn_log_viewers: "OrderedDict[Tuple[str, str], QDialog]" = OrderedDict()
+            self.display_row_set: set[str] = set()
+            self.row_positions: Dict[str, int] = {}
+            self.row_request_times: Dict[str, List[int]] = {}
+            self.row_response_reach: Dict[str, List[int]] = {}
+            self.row_gap_starts: Dict[str, List[int]] = {}
+            self.row_gap_reach: Dict[str, List[int]] = {}
+            self.transitions: List[Tuple[str, str]] = []
+            self.transition_bottoms: List[int] = []
             for gap in self.gaps:
-                self.gap_indices[id(gap)] = len(self.gap_indices)
                 if gap.directory_name in self.rows:
                     self.gaps_by_row[gap.directory_name].append(gap)
             for values in self.gaps_by_row.values():
-                values.sort(key=lambda item: item.start)
+                values.sort(key=attrgetter("start_ms"))
             for row_name, row_turns in self.rows.items():
                 if row_turns:
-                    self.row_start_cache[row_name] = row_turns[0].request_ts
-                    self.row_end_cache[row_name] = row_turns[-1].response_ts
+                    self.row_start_cache[row_name] = row_turns[0].request_ms
+                    self.row_end_cache[row_name] = row_turns[-1].response_ms
+                self._index_row(row_name)
+            self.concurrency_sweep = ConcurrencySweep([turn for row_turns in self.rows.values() for turn in row_turns])
+            self._refresh_concurrency()
             self._recompute_row_groups()
             self.max_possible_plot_seconds = self._compute_max_plot_seconds(self.row_labels)
 
             self._recompute_layout()
 
+        def _gap_id(self, gap: GapAnnotation) -> int:
+            # keyed by identity within the row so expanded boxes survive --follow refreshes
+            key = (gap.directory_name, gap.from_request, gap.to_request)
+            gap_id = self.gap_ids.get(key)
+            if gap_id is None:
+                gap_id = len(self.gap_ids)
+                self.gap_ids[key] = gap_id
+                self.gap_rows[gap_id] = gap.directory_name
+            return gap_id
+
+        def _index_row(self, row_name: str) -> None:
+            # running maxima of end times let paintEvent bisect for the first item still visible
+            turns = self.rows.get(row_name, [])
+            self.row_request_times[row_name] = list(map(attrgetter("request_ms"), turns))
+            self.row_response_reach[row_name] = list(accumulate(map(attrgetter("response_ms"), turns), max))
+            gaps = self.gaps_by_row.get(row_name, [])
+            self.row_gap_starts[row_name] = list(map(attrgetter("start_ms"), gaps))
+            self.row_gap_reach[row_name] = list(accumulate(map(attrgetter("end_ms"), gaps), max))
+
+        def merge_directory_turns(self, changed: Dict[str, List[Turn]]) -> None:
+            for row_name, row_turns in changed.items():
+                if not row_turns:
+                    continue
+                self.concurrency_sweep.replace_directory(row_name, self.rows.get(row_name, ()), row_turns)
+                if row_name not in self.rows:
+                    self.row_display_labels[row_name] = row_turns[0].row_label
+                    self.row_to_color[row_name] = QColor.fromHsv(abs(hash(row_name)) % 360, 170, 220)
+                self.rows[row_name] = row_turns
+                self.row_start_cache[row_name] = row_turns[0].request_ms
+                self.row_end_cache[row_name] = row_turns[-1].response_ms
+                self.gaps_by_row[row_name] = sorted(gather_gaps(row_turns), key=attrgetter("start_ms"))
+                self._index_row(row_name)
+
+            self.row_labels = sorted(
+                self.rows.keys(),
+                key=lambda row: (self.rows[row][0].request_ms, row),
+            )
+            self._refresh_concurrency()
+            self._recompute_row_groups()
+            self._recompute_layout()
+            self.update()
+
+        def _refresh_concurrency(self) -> None:
+            self.concurrency = self.concurrency_sweep.profile()
+            self.concurrency_times = self.concurrency_sweep.series_times
+
         def _recompute_row_groups(self) -> None:
-            self.row_parent = {}
-            self.row_depth = {}
-
-            for index, row_name in enumerate(self.row_labels):
-                row_start = self.row_start_cache.get(row_name)
-                row_end = self.row_end_cache.get(row_name)
-                parent = None
-                if row_start is not None and row_end is not None:
-                    for candidate in reversed(self.row_labels[:index]):
-                        candidate_start = self.row_start_cache.get(candidate)
-                        candidate_end = self.row_end_cache.get(candidate)
-                        if candidate_start is None or candidate_end is None:
-                            continue
-                        if candidate_start <= row_start and row_end <= candidate_end:
-                            parent = candidate
-                            break
-                self.row_parent[row_name] = parent
-                self.row_depth[row_name] = self._group_depth(row_name)
-
-            self.row_root = {row_name: self._group_root(row_name) for row_name in self.row_labels}
-
-        def _group_root(self, row_name: str) -> str:
-            root = row_name
-            visited: set[str] = set()
-            while True:
-                parent = self.row_parent.get(root)
-                if not parent or parent in visited:
-                    break
-                visited.add(root)
-                root = parent
-            return root
-
-        def _group_depth(self, row_name: str) -> int:
-            parent = self.row_parent.get(row_name)
-            if not parent:
-                return 0
-            depth = 1
-            seen: set[str] = {row_name}
-            while parent is not None and parent not in seen:
-                seen.add(parent)
-                grandparent = self.row_parent.get(parent)
-                if not grandparent:
-                    break
-                depth += 1
-                parent = grandparent
-            return depth
+            self.row_parent, self.row_depth, self.row_root = compute_row_groups(
+                self.row_labels,
+                self.row_start_cache,
+                self.row_end_cache,
+            )
 
         def _is_row_expanded(self, row_name: str) -> bool:
-            return self._group_root(row_name) in self.group_state
+            return self.row_root.get(row_name, row_name) in self.group_state
 
         def _compute_max_plot_seconds(self, row_names: Sequence[str]) -> float:
             offsets = self._compute_display_row_offsets()
@@ -1072,34 +3980,28 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
                     max_row_end = row_end
             return max(1.0, max_row_end)
 
-        def _elapsed_seconds(self, value: datetime, base: datetime) -> float:
-            elapsed = (value - base).total_seconds()
-            return float(elapsed) if elapsed > 0 else 0.0
+        def _elapsed_seconds(self, value_ms: int, base_ms: int) -> float:
+            elapsed = (value_ms - base_ms) / 1000
+            return elapsed if elapsed > 0 else 0.0
 
         def _row_duration_seconds(self, row_name: str) -> float:
             turns = self.rows.get(row_name, [])
             if not turns:
                 return 0.0
-            return self._elapsed_seconds(turns[-1].response_ts, turns[0].request_ts)
-
-        def _row_first_turn(self, row_name: str) -> Optional[Turn]:
-            turns = self.rows.get(row_name, [])
-            if not turns:
-                return None
-            return turns[0]
+            return self._elapsed_seconds(turns[-1].response_ms, turns[0].request_ms)
 
-        def _group_start_time(self, row_name: str) -> datetime:
+        def _group_start_ms(self, row_name: str) -> int:
             root = self.row_root.get(row_name, row_name)
             return self.row_start_cache.get(
                 root,
-                self.row_start_cache.get(row_name, self.day_start),
+                self.row_start_cache.get(row_name, self.day_start_ms),
             )
 
         def _row_plot_end_seconds(self, row_name: str) -> float:
             last_turn = self._row_last_turn(row_name)
             if last_turn is None:
                 return 0.0
-            return self._elapsed_seconds(last_turn.response_ts, self._group_start_time(row_name))
+            return self._elapsed_seconds(last_turn.response_ms, self._group_start_ms(row_name))
 
         def _row_last_turn(self, row_name: str) -> Optional[Turn]:
             turns = self.rows.get(row_name, [])
@@ -1118,50 +4020,168 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
             return offsets
 
         def _recompute_layout(self) -> None:
+            # only called when rows, grouping or size change; paintEvent reuses the result
             self.display_rows = []
             self.display_row_offsets = self._compute_display_row_offsets()
             for row_name in self.row_labels:
                 if self._is_row_expanded(row_name) and self.rows.get(row_name):
                     self.display_rows.append(row_name)
+            self.display_row_set = set(self.display_rows)
+            self.row_positions = {row_name: index for index, row_name in enumerate(self.row_labels)}
+
+            visible_roots = [row for row in self.display_rows if self.row_parent.get(row) is None]
+            self.transitions = list(zip(visible_roots, visible_roots[1:]))
+            self.transition_bottoms = [self._row_center_y(next_row) for _, next_row in self.transitions]
+            self.hit_index.clear()
 
             self.max_possible_plot_seconds = self._compute_max_plot_seconds(self.row_labels)
             self.total_plot_seconds = self.max_possible_plot_seconds
-            width = self.left_margin + self.right_margin + int(self.total_plot_seconds * self.seconds_per_pixel_cap)
+            self.pixels_per_second = clamp_float(
+                self.pixels_per_second,
+                self._min_pixels_per_second(),
+                self._max_pixels_per_second(),
+            )
+            width = self.left_margin + self.right_margin + int(self.total_plot_seconds * self.pixels_per_second)
             width = max(width, 1000)
             row_count = max(1, len(self.row_labels))
             height = self.top_margin + row_count * self.row_height + self.bottom_margin
             self.setMinimumSize(width, height)
             self.setMinimumWidth(width)
             self.setMinimumHeight(height)
+            # zooming out has to shrink the widget, which a minimum size alone never does
+            self.resize(width, height)
+
+        def _min_pixels_per_second(self) -> float:
+            viewport_width = 1000
+            if self.scroll_area is not None:
+                viewport_width = max(1, self.scroll_area.viewport().width())
+            plot_width = max(1, viewport_width - self.left_margin - self.right_margin)
+            return min(self.seconds_per_pixel_cap, plot_width / self.total_plot_seconds)
+
+        def _max_pixels_per_second(self) -> float:
+            widest = (QT_MAX_WIDGET_SIZE - self.left_margin - self.right_margin) / self.total_plot_seconds
+            return max(self._min_pixels_per_second(), min(MAX_PIXELS_PER_SECOND, widest))
+
+        def zoom(self, factor: float, anchor_x: int) -> None:
+            # keeps the time under anchor_x at the same place in the viewport
+            plot_width = max(1, self.width() - self.left_margin - self.right_margin)
+            anchor_seconds = ((anchor_x - self.left_margin) / plot_width) * self.total_plot_seconds
+            scroll_bar = self.scroll_area.horizontalScrollBar() if self.scroll_area is not None else None
+            viewport_offset = anchor_x - (scroll_bar.value() if scroll_bar is not None else 0)
+
+            previous = self.pixels_per_second
+            self.pixels_per_second = clamp_float(
+                previous * factor,
+                self._min_pixels_per_second(),
+                self._max_pixels_per_second(),
+            )
+            if self.pixels_per_second == previous:
+                return
+            self._recompute_layout()
+            if scroll_bar is not None:
+                scroll_bar.setValue(self._seconds_to_x(anchor_seconds) - viewport_offset)
+            self.update()
+
+        def wheelEvent(self, event: object) -> None:
+            modifiers = event.modifiers()
+            delta = event.angleDelta()
+            if modifiers & Qt.KeyboardModifier.ControlModifier:
+                self.zoom(ZOOM_STEP ** (delta.y() / 120), int(event.position().x()))
+                event.accept()
+                return
+            if modifiers & Qt.KeyboardModifier.ShiftModifier and self.scroll_area is not None:
+                scroll_bar = self.scroll_area.horizontalScrollBar()
+                scroll_bar.setValue(scroll_bar.value() - (delta.y() or delta.x()))
+                event.accept()
+                return
+            super().wheelEvent(event)
 
-        def _response_text_from_log(self, log_path: Path) -> str:
-            try:
-                lines = log_path.read_text(encoding="utf-8", errors="replace").splitlines(keepends=True)
-            except Exception as exc:
-                return f"Failed to read log file: {log_path}\n{exc}"
-
-            for index, line in enumerate(lines):
-                if line.lstrip().startswith("# Response"):
-                    return "".join(lines[index + 1 :]).strip()
-            return "".join(lines).strip()
-
-        def _open_turn_log(self, turn: Turn) -> None:
-            content = "No .log file was found for this turn."
-            if turn.log_path is not None:
-                content = self._response_text_from_log(turn.log_path)
-
+        def _build_log_viewer(self, turn: Turn) -> QDialog:
             viewer = QDialog(self)
+            viewer.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
             viewer.setWindowTitle(f"Turn {turn.request_index} response")
             layout = QVBoxLayout(viewer)
             text_view = QPlainTextEdit()
             text_view.setReadOnly(True)
-            text_view.setPlainText(content)
-            layout.addWidget(text_view)
             viewer.resize(900, 600)
 
-            viewer_id = id(viewer)
-            self.turn_log_viewers[viewer_id] = viewer
-            viewer.destroyed.connect(lambda _obj: self.turn_log_viewers.pop(viewer_id, None))
+            document: Optional[LogDocument] = None
+            if turn.log_path is None:
+                text_view.setPlainText("No .log file was found for this turn.")
+            else:
+                try:
+                    document = LogDocument(turn.log_path)
+                except Exception as exc:
+                    text_view.setPlainText(f"Failed to read log file: {turn.log_path}\n{exc}")
+            if document is None or not document.sections:
+                layout.addWidget(text_view)
+                return viewer
+            viewer.destroyed.connect(lambda _obj: document.close())
+
+            controls = QHBoxLayout()
+            section_picker = QComboBox()
+            for section in document.sections:
+                section_picker.addItem(f"{section.name} ({format_bytes(section.size)})")
+            status = QLabel()
+            more_button = QPushButton("Load more")
+            controls.addWidget(section_picker)
+            controls.addWidget(status, 1)
+            controls.addWidget(more_button)
+            layout.addLayout(controls)
+            layout.addWidget(text_view)
+
+            state = {"section": document.sections[0], "offset": document.sections[0].start}
+
+            def load_page() -> None:
+                section = state["section"]
+                if state["offset"] >= section.end:
+                    return
+                chunk, state["offset"] = document.page(section, state["offset"])
+                # a separate cursor appends without moving the reader's selection or scroll position
+                cursor = QTextCursor(text_view.document())
+                cursor.movePosition(QTextCursor.MoveOperation.End)
+                cursor.insertText(chunk)
+                loaded = state["offset"] - section.start
+                status.setText(f"Showing {format_bytes(loaded)} of {format_bytes(section.size)}")
+                more_button.setEnabled(state["offset"] < section.end)
+
+            def show_section(position: int) -> None:
+                section = document.sections[position]
+                state["section"] = section
+                state["offset"] = section.start
+                text_view.clear()
+                load_page()
+
+            def load_at_bottom(value: int) -> None:
+                if value >= text_view.verticalScrollBar().maximum():
+                    load_page()
+
+            section_picker.currentIndexChanged.connect(show_section)
+            more_button.clicked.connect(load_page)
+            text_view.verticalScrollBar().valueChanged.connect(load_at_bottom)
+            names = [section.name for section in document.sections]
+            initial = names.index("text") if "text" in names and names[0] != "response" else 0
+            section_picker.setCurrentIndex(initial)
+            if initial == 0:
+                show_section(0)
+            return viewer
+
+        def _open_turn_log(self, turn: Turn) -> None:
+            key = (turn.directory_name, turn.request_index)
+            viewer = self.turn_log_viewers.get(key)
+            if viewer is None:
+                viewer = self._build_log_viewer(turn)
+                self.turn_log_viewers[key] = viewer
+                viewer.destroyed.connect(
+                    lambda _obj, closed=viewer: self.turn_log_viewers.pop(key, None)
+                    if self.turn_log_viewers.get(key) is closed
+                    else None
+                )
+                while len(self.turn_log_viewers) > LOG_VIEWER_MAX_DIALOGS:
+                    _, evicted = self.turn_log_viewers.popitem(last=False)
+                    evicted.close()
+            else:
+                self.turn_log_viewers.move_to_end(key)
 
             viewer.show()
             viewer.raise_()
@@ -1176,20 +4196,36 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
             )
             return self.left_margin + ratio
 
-        def _time_to_row_x(self, row_name: str, when: datetime) -> int:
-            row_start = self._group_start_time(row_name)
+        def _ms_to_row_x(self, row_name: str, when_ms: int) -> int:
             row_offset = self.display_row_offsets.get(row_name, 0.0)
-            row_seconds = row_offset + self._elapsed_seconds(when, row_start)
+            row_seconds = row_offset + self._elapsed_seconds(when_ms, self._group_start_ms(row_name))
             return self._seconds_to_x(row_seconds)
 
+        def _x_to_row_ms(self, row_name: str, x: int) -> int:
+            plot_width = max(1, self.width() - self.left_margin - self.right_margin)
+            row_seconds = ((x - self.left_margin) / plot_width) * self.total_plot_seconds
+            row_offset = self.display_row_offsets.get(row_name, 0.0)
+            return self._group_start_ms(row_name) + int((row_seconds - row_offset) * 1000)
+
+        def _turn_span_x(self, row_name: str, turn: Turn) -> Tuple[int, int]:
+            x1 = self._ms_to_row_x(row_name, turn.request_ms)
+            x2 = self._ms_to_row_x(row_name, turn.response_ms)
+            if x2 < x1:
+                x1, x2 = x2, x1
+            if x2 == x1:
+                x2 = x1 + 3
+            return x1, x2
+
+        def _row_y(self, row_name: str) -> int:
+            return self.top_margin + self.row_positions[row_name] * self.row_height
+
+        def _row_center_y(self, row_name: str) -> int:
+            return self._row_y(row_name) + self.row_height // 2
+
         def _format_seconds(self, seconds: float) -> str:
-            total_seconds = max(0, int(seconds))
-            h = total_seconds // 3600
-            m = (total_seconds % 3600) // 60
-            s = total_seconds % 60
-            return f"{h:02}:{m:02}:{s:02}"
+            return format_clock_seconds(seconds)
 
-        def _draw_axis(self, painter: QPainter, plot_width: int, row_area_bottom: int) -> None:
+        def _draw_axis(self, painter: QPainter, plot_width: int, row_area_bottom: int, exposed: QRect) -> None:
             chart_top = self.top_margin
             chart_left = self.left_margin
             chart_right = chart_left + plot_width
@@ -1198,39 +4234,105 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
             painter.drawLine(chart_left, chart_top, chart_right, chart_top)
             painter.drawLine(chart_left, row_area_bottom, chart_right, row_area_bottom)
 
-            for i in range(self.tick_count):
-                x = chart_left + int((plot_width * i) / (self.tick_count - 1))
+            pixels_per_second = plot_width / self.total_plot_seconds
+            step = next(
+                (step for step in AXIS_TICK_STEPS_SECONDS if step * pixels_per_second >= AXIS_TICK_MIN_SPACING_PX),
+                AXIS_TICK_STEPS_SECONDS[-1],
+            )
+            first_seconds = max(0.0, (exposed.left() - chart_left - 60) / pixels_per_second)
+            last_seconds = min(self.total_plot_seconds, (exposed.right() - chart_left + 60) / pixels_per_second)
+            tick = int(first_seconds // step) * step
+            while tick <= last_seconds:
+                x = self._seconds_to_x(tick)
                 painter.drawLine(x, self.top_margin - 6, x, self.top_margin + 4)
-                label_seconds = self.total_plot_seconds * i / (self.tick_count - 1)
-                text = self._format_seconds(label_seconds)
-                painter.drawText(x - 26, 22, text)
+                painter.drawText(x - 26, self.top_margin - 28, self._format_seconds(tick))
+                tick += step
 
-        def _draw_row(self, painter: QPainter, row_name: str, y: int) -> None:
+        def _draw_concurrency_strip(self, painter: QPainter, plot_width: int, exposed: QRect) -> None:
+            # absolute wall-clock time on its own scale, since rows are shifted per group
+            profile = self.concurrency
+            if profile.peak == 0:
+                return
+            strip_top = 6
+            strip_bottom = self.concurrency_strip_height - 4
+            strip_height = strip_bottom - strip_top
+            painter.setPen(QColor("dimgray"))
+            painter.drawText(8, strip_bottom, f"in flight (max {profile.peak})")
+
+            ms_per_px = max(1, profile.wall_ms) / plot_width
+            x_lo = max(self.left_margin, exposed.left())
+            x_hi = min(self.left_margin + plot_width, exposed.right())
+            if x_hi < x_lo:
+                return
+            # the highest count reached in each pixel column, so narrow spikes survive zooming out
+            column_peaks = [0] * (x_hi - x_lo + 1)
+            times = self.concurrency_times
+            first = max(0, bisect_right(times, profile.start_ms + (x_lo - self.left_margin) * ms_per_px) - 1)
+            for position in range(first, len(profile.series)):
+                instant, in_flight = profile.series[position]
+                x1 = self.left_margin + int((instant - profile.start_ms) / ms_per_px)
+                if x1 > x_hi:
+                    break
+                if in_flight == 0:
+                    continue
+                next_instant = times[position + 1] if position + 1 < len(times) else profile.end_ms
+                x2 = self.left_margin + int((next_instant - profile.start_ms) / ms_per_px)
+                for x in range(max(x1, x_lo), min(max(x1 + 1, x2), x_hi + 1)):
+                    if in_flight > column_peaks[x - x_lo]:
+                        column_peaks[x - x_lo] = in_flight
+
+            color = QColor("steelblue")
+            run_start = 0
+            for offset in range(1, len(column_peaks) + 1):
+                if offset < len(column_peaks) and column_peaks[offset] == column_peaks[run_start]:
+                    continue
+                if column_peaks[run_start]:
+                    bar_height = max(1, round(strip_height * column_peaks[run_start] / profile.peak))
+                    painter.fillRect(
+                        QRect(x_lo + run_start, strip_bottom - bar_height, offset - run_start, bar_height),
+                        color,
+                    )
+                run_start = offset
+
+        def _draw_row(self, painter: QPainter, row_name: str, y: int, x_lo: int, x_hi: int) -> None:
             turns = self.rows.get(row_name, [])
             painter.setPen(QColor("black"))
-            if not turns or not self._is_row_expanded(row_name):
+            if not turns or row_name not in self.display_row_set:
                 return None
 
             color = self.row_to_color[row_name]
             baseline = y + self.row_height // 2
-
-            row_first_turn_x: Optional[int] = None
-            row_last_turn_x: Optional[int] = None
-            for turn in turns:
-                x1 = self._time_to_row_x(row_name, turn.request_ts)
-                x2 = self._time_to_row_x(row_name, turn.response_ts)
-                if x2 < x1:
-                    x1, x2 = x2, x1
-                if x2 == x1:
-                    x2 = x1 + 3
-                if row_first_turn_x is None:
-                    row_first_turn_x = x1
-                row_last_turn_x = x2
+            visible_start = self._x_to_row_ms(row_name, x_lo - self.cull_padding)
+            visible_end = self._x_to_row_ms(row_name, x_hi + self.cull_padding)
+
+            first = bisect_left(self.row_response_reach[row_name], visible_start)
+            last = bisect_right(self.row_request_times[row_name], visible_end)
+            spans = [self._turn_span_x(row_name, turn) for turn in turns[first:last]]
+            individual, buckets = aggregate_spans(spans)
+            y_bar = baseline - self.bar_height // 2
+            for bucket in buckets:
+                density_color = QColor(color)
+                density_color.setAlpha(int(60 + 195 * bucket.utilization))
+                bucket_left = clamp(bucket.left, self.left_margin, self.width() - self.right_margin)
+                bucket_right = clamp(bucket.right, bucket_left, self.width() - self.right_margin)
+                rect = QRect(bucket_left, y_bar, max(1, bucket_right - bucket_left), self.bar_height)
+                painter.fillRect(rect, density_color)
+                self.hit_index.add(
+                    ("density", row_name, bucket.left),
+                    rect.x(),
+                    rect.y(),
+                    rect.width(),
+                    rect.height(),
+                    bucket,
+                )
+            for offset in individual:
+                position = first + offset
+                turn = turns[position]
+                x1, x2 = spans[offset]
                 rect_left = clamp(x1, self.left_margin, self.width() - self.right_margin)
                 rect_right = clamp(x2, self.left_margin, self.width() - self.right_margin)
                 rect_left = min(rect_left, rect_right)
 
-                y_bar = baseline - self.bar_height // 2
                 rect = QRect(
                     rect_left,
                     y_bar,
@@ -1240,28 +4342,42 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
                 painter.fillRect(rect, color)
                 painter.setPen(QColor("black"))
                 painter.drawRect(rect)
-                self.turn_hitboxes[id(turn)] = rect
-                self.turns_by_hitbox[id(turn)] = turn
+                self.hit_index.add(
+                    ("turn", row_name, position),
+                    rect.x(),
+                    rect.y(),
+                    rect.width(),
+                    rect.height(),
+                    turn,
+                )
+                if rect.width() < LOD_MIN_LABEL_PX:
+                    continue
                 font_metrics = painter.fontMetrics()
                 text_y = y_bar + (self.bar_height + font_metrics.ascent() - font_metrics.descent()) // 2
-                turn_s = seconds_from_ms(ms_between(turn.request_ts, turn.response_ts))
+                turn_s = seconds_from_ms(turn.response_ms - turn.request_ms)
                 painter.drawText(
                     rect_left + 3,
                     text_y,
                     f"{turn.request_index} ({turn_s}s)",
                 )
 
-            for gap in self.gaps_by_row.get(row_name, []):
-                if gap.directory_name not in self.display_rows:
-                    continue
-                if gap.end < self.day_start or gap.start < self.day_start:
+            row_gaps = self.gaps_by_row.get(row_name, [])
+            first_gap = bisect_left(self.row_gap_reach.get(row_name, []), visible_start)
+            last_gap = bisect_right(self.row_gap_starts.get(row_name, []), visible_end)
+            last_box_right: Optional[int] = None
+            for gap in row_gaps[first_gap:last_gap]:
+                if gap.end_ms < self.day_start_ms or gap.start_ms < self.day_start_ms:
                     continue
-                x1 = self._time_to_row_x(row_name, gap.start)
-                x2 = self._time_to_row_x(row_name, gap.end)
+                x1 = self._ms_to_row_x(row_name, gap.start_ms)
+                x2 = self._ms_to_row_x(row_name, gap.end_ms)
                 mid = int((x1 + x2) / 2)
                 metrics = painter.fontMetrics()
-                gap_id = self.gap_indices[id(gap)]
-                lines = self._gap_box_lines(gap, gap_id in self.expanded_gaps)
+                gap_id = self._gap_id(gap)
+                expanded = gap_id in self.expanded_gaps
+                # when zoomed out, skip collapsed boxes that would land on top of the previous one
+                if not expanded and last_box_right is not None and mid <= last_box_right:
+                    continue
+                lines = self._gap_box_lines(gap, expanded)
                 line_height = metrics.height()
                 padding_x = 6
                 padding_y = 4
@@ -1278,7 +4394,8 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
                 )
                 box_top = y + self.row_height + 4
                 box = QRect(box_left, box_top, box_w, box_h)
-                self.gap_hitboxes[gap_id] = box
+                last_box_right = box_left + box_w
+                self.hit_index.add(("gap", gap_id), box_left, box_top, box_w, box_h, gap_id)
                 painter.fillRect(box, QColor("white"))
                 painter.setPen(QColor("black"))
                 painter.drawRect(box)
@@ -1288,7 +4405,6 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
                         box_top + padding_y + (index * line_height) + metrics.ascent(),
                         line,
                     )
-            return row_first_turn_x, row_last_turn_x
 
         def _gap_box_lines(self, gap: GapAnnotation, expanded: bool) -> List[str]:
             gap_s = seconds_between(gap.start, gap.end)
@@ -1319,107 +4435,110 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
             cy = (start_y + end_y) // 2 - 6
             painter.drawText(clamp(cx - text_w // 2, self.left_margin, self.width() - text_w - 1), cy, label)
 
+        def _row_label_text(self, row_name: str) -> str:
+            row_expanded = self._is_row_expanded(row_name)
+            row_depth = self.row_depth.get(row_name, 0)
+            base_label = self.row_display_labels.get(row_name, row_name)
+            linked = " [linked]" if row_depth > 0 else ""
+            indent = " " * (row_depth * 2)
+            if row_expanded:
+                return f"[-] {indent}{base_label}{linked}"
+            elapsed_seconds = int(self._row_duration_seconds(row_name))
+            if elapsed_seconds > 0:
+                return f"[+] {indent}{base_label}{linked} ({self._format_seconds(elapsed_seconds)})"
+            return f"[+] {indent}{base_label}{linked}"
+
+        def _rows_to_paint(self, exposed: QRect) -> List[int]:
+            # one extra row above the viewport because gap boxes hang below their row
+            first_row = max(0, (exposed.top() - self.top_margin) // self.row_height - 1)
+            last_row = min(len(self.row_labels) - 1, (exposed.bottom() - self.top_margin) // self.row_height)
+            positions = set(range(first_row, last_row + 1))
+            for gap_id in self.expanded_gaps:
+                position = self.row_positions.get(self.gap_rows.get(gap_id, ""))
+                if position is not None and position < first_row:
+                    positions.add(position)
+            return sorted(positions)
+
         def paintEvent(self, event: object) -> None:
             painter = QPainter(self)
-            self.gap_hitboxes = {}
-            self.turn_hitboxes = {}
-            self.turns_by_hitbox = {}
-            self.row_label_hitboxes = {}
-            painter.fillRect(self.rect(), QColor("white"))
+            exposed = event.rect()
+            painter.fillRect(exposed, QColor("white"))
 
             if not self.row_labels:
                 painter.setPen(QColor("black"))
                 painter.drawText(20, 40, "No data in selected time window")
                 return
 
-            self._recompute_layout()
             row_area_bottom = self.top_margin + len(self.row_labels) * self.row_height
             plot_width = max(1, self.width() - self.left_margin - self.right_margin)
-            self._draw_axis(painter, plot_width, row_area_bottom)
+            if exposed.top() < self.concurrency_strip_height:
+                self._draw_concurrency_strip(painter, plot_width, exposed)
+            self._draw_axis(painter, plot_width, row_area_bottom, exposed)
 
-            row_turn_points: Dict[str, Tuple[int, int]] = {}
-            row_first_times: Dict[str, datetime] = {}
-            row_last_times: Dict[str, datetime] = {}
-
-            for index, row_name in enumerate(self.row_labels):
-                y = self.top_margin + index * self.row_height
+            for position in self._rows_to_paint(exposed):
+                row_name = self.row_labels[position]
+                y = self.top_margin + position * self.row_height
                 painter.setPen(QColor("black"))
-                row_expanded = self._is_row_expanded(row_name)
-                row_depth = self.row_depth.get(row_name, 0)
-                base_label = self.row_display_labels.get(row_name, row_name)
-                linked = " [linked]" if row_depth > 0 else ""
-                indent = " " * (row_depth * 2)
-                if row_expanded:
-                    label_text = f"[-] {indent}{base_label}{linked}"
-                else:
-                    elapsed_seconds = int(self._row_duration_seconds(row_name))
-                    if elapsed_seconds > 0:
-                        label_text = f"[+] {indent}{base_label}{linked} ({self._format_seconds(elapsed_seconds)})"
-                    else:
-                        label_text = f"[+] {indent}{base_label}{linked}"
-                painter.drawText(8, y + 16, label_text)
-                self.row_label_hitboxes[row_name] = QRect(2, y + 2, self.left_margin - 4, self.row_height - 4)
-                if row_name not in self.display_rows:
-                    continue
-                row_points = self._draw_row(painter, row_name, y)
-                if not row_points:
-                    continue
-                first_turn_x, last_turn_x = row_points
-                if first_turn_x is not None and last_turn_x is not None:
-                    first_turn = self._row_first_turn(row_name)
-                    last_turn = self._row_last_turn(row_name)
-                    if first_turn is not None and last_turn is not None and first_turn_x is not None and last_turn_x is not None:
-                        row_first_times[row_name] = first_turn.request_ts
-                        row_last_times[row_name] = last_turn.response_ts
-                        row_turn_points[row_name] = (first_turn_x, last_turn_x)
-
-            visible_rows = [
-                row for row in self.row_labels
-                if row in self.display_rows and self.row_parent.get(row) is None
-            ]
-            for index, row_name in enumerate(visible_rows[:-1]):
-                next_row_name = visible_rows[index + 1]
-                previous_row_last = row_last_times.get(row_name)
-                next_row_first = row_first_times.get(next_row_name)
-                previous_points = row_turn_points.get(row_name)
-                next_points = row_turn_points.get(next_row_name)
-                if previous_row_last is None or next_row_first is None or previous_points is None or next_points is None:
-                    continue
-                elapsed_seconds = int((next_row_first - previous_row_last).total_seconds())
+                painter.drawText(8, y + 16, self._row_label_text(row_name))
+                if row_name in self.display_row_set:
+                    self._draw_row(painter, row_name, y, exposed.left(), exposed.right())
+
+            first_transition = bisect_left(self.transition_bottoms, exposed.top())
+            for row_name, next_row_name in self.transitions[first_transition:]:
+                start_y = self._row_center_y(row_name)
+                if start_y > exposed.bottom():
+                    break
+                previous_row_last = self.row_end_cache[row_name]
+                next_row_first = self.row_start_cache[next_row_name]
+                elapsed_seconds = int((next_row_first - previous_row_last) / 1000)
                 if elapsed_seconds <= 0:
                     continue
-                start_x = previous_points[1]
-                end_x = next_points[0]
-                start_y = (self.top_margin + self.row_labels.index(row_name) * self.row_height) + self.row_height // 2
-                end_y = (self.top_margin + self.row_labels.index(next_row_name) * self.row_height) + self.row_height // 2
+                start_x = self._turn_span_x(row_name, self.rows[row_name][-1])[1]
+                end_x = self._turn_span_x(next_row_name, self.rows[next_row_name][0])[0]
+                end_y = self._row_center_y(next_row_name)
                 self._draw_transition_arrow(painter, start_x, start_y, end_x, end_y, elapsed_seconds)
 
+        def resizeEvent(self, event: object) -> None:
+            # x positions depend on the widget width, so recorded hit rectangles are stale
+            self.hit_index.clear()
+            super().resizeEvent(event)
+
+        def _toggle_row_group(self, row_name: str) -> None:
+            row_root = self.row_root.get(row_name, row_name)
+            if row_root in self.group_state:
+                self.group_state.remove(row_root)
+            else:
+                self.group_state.add(row_root)
+            self._recompute_layout()
+            self.update()
+
         def mousePressEvent(self, event: object) -> None:
             click_pos = event.pos()
-            for row_name, hitbox in list(self.row_label_hitboxes.items()):
-                if hitbox.contains(click_pos):
-                    row_root = self._group_root(row_name)
-                    if row_root in self.group_state:
-                        self.group_state.remove(row_root)
-                    else:
-                        self.group_state.add(row_root)
-                    self._recompute_layout()
-                    self.update()
+            x, y = click_pos.x(), click_pos.y()
+            if 2 <= x <= self.left_margin - 2 and y >= self.top_margin:
+                position, offset = divmod(y - self.top_margin, self.row_height)
+                if position < len(self.row_labels) and 2 <= offset <= self.row_height - 2:
+                    self._toggle_row_group(self.row_labels[position])
                     return
-            for gap_id, hitbox in list(self.gap_hitboxes.items()):
-                if hitbox.contains(click_pos):
+
+            hits = self.hit_index.query(x, y)
+            for key in hits:
+                if key[0] == "gap":
+                    gap_id = self.hit_index.payloads[key]
                     if gap_id in self.expanded_gaps:
                         self.expanded_gaps.remove(gap_id)
                     else:
                         self.expanded_gaps.add(gap_id)
                     self.update()
                     return
-            for hitbox_id, hitbox in list(self.turn_hitboxes.items()):
-                if hitbox.contains(click_pos):
-                    turn = self.turns_by_hitbox.get(hitbox_id)
-                    if turn is not None:
-                        self._open_turn_log(turn)
-                        return
+            for key in hits:
+                if key[0] == "turn":
+                    self._open_turn_log(self.hit_index.payloads[key])
+                    return
+            for key in hits:
+                if key[0] == "density":
+                    self.zoom(ZOOM_STEP ** 4, x)
+                    return
             super().mousePressEvent(event)
 
     class GanttWindow(QMainWindow):
@@ -1430,52 +4549,207 @@ def launch_gui(turns: Sequence[Turn], gaps: Sequence[GapAnnotation], day_start:
 
             canvas = GanttCanvas(turns, gaps, day_start, day_end)
             scroll = QScrollArea()
+            canvas.scroll_area = scroll
             scroll.setWidget(canvas)
             scroll.setWidgetResizable(False)
             self.setCentralWidget(scroll)
 
+            self.follow_timer: Optional[QTimer] = None
+            if follower is not None:
+                self.setWindowTitle("LLM History Gantt (following)")
+                self.follow_timer = QTimer(self)
+                self.follow_timer.timeout.connect(lambda: self._poll_history(canvas))
+                self.follow_timer.start(FOLLOW_POLL_MS)
+
+        def _poll_history(self, canvas: GanttCanvas) -> None:
+            try:
+                changed = follower.poll()
+            except OSError as exc:
+                print(f"Failed to poll history: {exc}")
+                return
+            if changed:
+                canvas.merge_directory_turns(changed)
+
     app = QApplication([])
-    window = GanttWindow(turns, gaps, day_start, day_end)
+    with profile_stage(profile, "qt_layout") as totals:
+        window = GanttWindow(turns, gaps, day_start, day_end)
+        if totals is not None:
+            totals.items += len(turns)
+    if profile is not None:
+        print_profile(profile)
     window.show()
     return app.exec()
 
 
-def print_debug(
-    turns: Sequence[Turn],
-    gaps: Sequence[GapAnnotation],
-    model_info_map: Optional[Dict[str, Dict[str, Any]]] = None,
-    show_costs: bool = False,
-) -> None:
-    by_directory: Dict[str, List[Turn]] = defaultdict(list)
-    by_optype: Dict[str, int] = defaultdict(int)
+def debug_gap_key(gap: GapAnnotation) -> Tuple[int, str, str]:
+    return gap.start_ms, gap.directory_name, gap.from_request
+
+
+class DebugTotals:
+    # What --debug accumulates while its records stream out: the summary record and the text
+    # reports that follow it are built from these instead of from the whole list of turns.
+
+    def __init__(self) -> None:
+        self.turn_count = 0
+        self.gap_count = 0
+        self.directory_count = 0
+        self.turns_by_optype: Dict[str, int] = defaultdict(int)
+        self.inference_ms = 0
+        self.first_request_ms: Optional[int] = None
+        self.last_log_ms: Optional[int] = None
+        self.model_tokens: Dict[str, Dict[str, int]] = {}
+        self.model_costs: Dict[str, float] = defaultdict(float)
+        self.model_cost_missing: Dict[str, bool] = {}
+        self.concurrency = RequestOrderSweep()
+
+    @property
+    def wall_ms(self) -> Optional[int]:
+        if self.first_request_ms is None or self.last_log_ms is None:
+            return None
+        return self.last_log_ms - self.first_request_ms
+
+    def add_usage(self, usage: UsageAggregate) -> None:
+        for model_name, tokens in usage.model_tokens.items():
+            totals = self.model_tokens.setdefault(model_name, {"input": 0, "cached": 0, "output": 0})
+            for key, value in tokens.items():
+                totals[key] += value
+        for model_name, missing in usage.model_cost_missing.items():
+            self.model_cost_missing[model_name] = self.model_cost_missing.get(model_name, False) or missing
+
+    def usage(self) -> UsageAggregate:
+        # only the per-model totals; per-directory and per-turn usage went out with their records
+        model_costs = {name: cost for name, cost in self.model_costs.items() if not self.model_cost_missing.get(name)}
+        return UsageAggregate(self.model_tokens, model_costs, dict(self.model_cost_missing), {}, {}, {}, [])
+
+
+def directory_turn_groups(turns: Sequence[Turn]) -> Iterator[Tuple[datetime, List[Turn]]]:
+    # Feeds turns already in memory to iter_debug_records: one group per directory, stamped with
+    # its earliest request so the groups come out in the order ingestion would yield them.
+    by_directory: Dict[str, List[Turn]] = {}
     for turn in turns:
-        by_directory[turn.directory_name].append(turn)
-        by_optype[turn.optype] += 1
+        by_directory.setdefault(turn.directory_name, []).append(turn)
+    groups = [sorted(directory_turns, key=attrgetter("request_ms")) for directory_turns in by_directory.values()]
+    groups.sort(key=lambda directory_turns: directory_turns[0].request_ms)
+    for directory_turns in groups:
+        yield directory_turns[0].request_ts, directory_turns
 
-    print(
-        json.dumps(
-            {
-                "type": "debug_summary",
-                "turn_count": len(turns),
-                "gap_count": len(gaps),
-                "directory_count": len(by_directory),
-                "turns_by_optype": dict(sorted(by_optype.items())),
-                "inference_ms": calculate_inference_ms(turns),
-                "wall_ms": calculate_wall_ms(turns),
-                "show_costs": show_costs,
-            },
-            sort_keys=True,
-        )
-    )
 
-    cost_bands_cache: Dict[Tuple[str, str], List[PriceBand]] = {}
-    model_totals, model_costs, model_cost_missing = compute_model_usage(
-        turns,
-        model_info_map=model_info_map,
-        show_costs=show_costs,
-    )
-    for model_name in sorted(model_totals):
-        model_usage = model_totals[model_name]
+def iter_debug_records(
+    directories: Iterable[Tuple[datetime, Sequence[Turn]]],
+    model_info_map: Optional[Dict[str, Dict[str, Any]]] = None,
+    show_costs: bool = False,
+    ingest_stats: Optional[IngestStats] = None,
+    totals: Optional[DebugTotals] = None,
+) -> Iterator[Dict[str, Any]]:
+    # Consumes (directory timestamp, turns) in timestamp order, as iter_history_directories
+    # yields them. Each directory's record goes out as soon as it arrives; its turns and gaps wait
+    # in heaps until the next directory's timestamp passes them, since a later directory can
+    # only add requests from its own start on. A turn whose file time wrapped past midnight can
+    # predate its directory and is then written late. Model usage and the summary come last.
+    totals = totals if totals is not None else DebugTotals()
+    with_costs = show_costs and model_info_map is not None
+    sequence = count()
+    pending_turns: List[Tuple[int, int, Turn, Optional[float]]] = []
+    pending_gaps: List[Tuple[Tuple[int, str, str], int, GapAnnotation]] = []
+
+    def release(watermark_ms: Optional[int]) -> Iterator[Dict[str, Any]]:
+        while pending_turns and (watermark_ms is None or pending_turns[0][0] <= watermark_ms):
+            _, _, turn, cost = heapq.heappop(pending_turns)
+            totals.turn_count += 1
+            totals.concurrency.add(turn)
+            if cost is not None:
+                # summed in timeline order, as aggregate_usage sums a whole window
+                totals.model_costs[turn.model or "<missing>"] += cost
+            payload = {
+                "type": "turn",
+                "turn_number": totals.turn_count,
+                "directory": turn.directory_name,
+                "optype": turn.optype,
+                "row_label": turn.row_label,
+                "request_index": turn.request_index,
+                "request_ts": turn.request_ts.isoformat(),
+                "response_ts": turn.response_ts.isoformat(),
+                "model": turn.model,
+                "service_tier": turn.service_tier,
+                "input_tokens": turn.input_tokens,
+                "cached_input_tokens": turn.cached_input_tokens,
+                "output_tokens": turn.output_tokens,
+                "tools": turn.tools,
+            }
+            if with_costs:
+                payload["estimated_cost"] = cost
+            yield payload
+        while pending_gaps and (watermark_ms is None or pending_gaps[0][0][0] < watermark_ms):
+            _, _, gap = heapq.heappop(pending_gaps)
+            totals.gap_count += 1
+            yield {
+                "type": "gap",
+                "gap_number": totals.gap_count,
+                "from_directory": gap.directory_name,
+                "from_request": gap.from_request,
+                "to_request": gap.to_request,
+                "start": gap.start.isoformat(),
+                "end": gap.end.isoformat(),
+                "gap_ms": gap.end_ms - gap.start_ms,
+                "gap_s": seconds_between(gap.start, gap.end),
+                "turn_ms": gap.turn_duration_ms,
+                "turn_s": seconds_from_ms(gap.turn_duration_ms),
+                "tools": gap.tools,
+            }
+
+    for directory_ts, directory_turns in directories:
+        yield from release(epoch_ms(directory_ts))
+        if not directory_turns:
+            continue
+        if any(a.request_ms > b.request_ms for a, b in zip(directory_turns, directory_turns[1:])):
+            directory_turns = sorted(directory_turns, key=attrgetter("request_ms"))
+        usage = aggregate_usage(directory_turns, model_info_map=model_info_map, show_costs=show_costs)
+        totals.add_usage(usage)
+        gaps = gather_gaps(directory_turns)
+        first_turn, last_turn = directory_turns[0], directory_turns[-1]
+        directory_name = first_turn.directory_name
+        totals.directory_count += 1
+        utilization = directory_utilization(directory_turns)
+        if utilization is not None:
+            totals.concurrency.directories[directory_name] = utilization
+        for turn in directory_turns:
+            totals.turns_by_optype[turn.optype] += 1
+            totals.inference_ms += turn.response_ms - turn.request_ms
+            if totals.first_request_ms is None or turn.request_ms < totals.first_request_ms:
+                totals.first_request_ms = turn.request_ms
+            if turn.log_ms is not None and (totals.last_log_ms is None or turn.log_ms > totals.last_log_ms):
+                totals.last_log_ms = turn.log_ms
+
+        directory_tokens = usage.directory_tokens[directory_name]
+        payload = {
+            "type": "debug_directory",
+            "directory": directory_name,
+            "optype": first_turn.optype,
+            "row_label": first_turn.row_label,
+            "turn_count": len(directory_turns),
+            "gap_count": len(gaps),
+            "first_request": first_turn.request_ts.isoformat(),
+            "last_request": last_turn.request_ts.isoformat(),
+            "input_tokens": directory_tokens["input"],
+            "cached_input_tokens": directory_tokens["cached"],
+            "output_tokens": directory_tokens["output"],
+        }
+        if with_costs:
+            if usage.directory_cost_missing.get(directory_name, False):
+                payload["estimated_cost"] = None
+            else:
+                payload["estimated_cost"] = usage.directory_costs.get(directory_name, 0.0)
+        yield payload
+
+        for turn, cost in zip(directory_turns, usage.turn_costs):
+            heapq.heappush(pending_turns, (turn.request_ms, next(sequence), turn, cost))
+        for gap in gaps:
+            heapq.heappush(pending_gaps, (debug_gap_key(gap), next(sequence), gap))
+    yield from release(None)
+
+    usage = totals.usage()
+    for model_name in sorted(usage.model_tokens):
+        model_usage = usage.model_tokens[model_name]
         payload = {
             "type": "model_usage",
             "model": model_name,
@@ -1483,74 +4757,49 @@ def print_debug(
             "cached_input_tokens": model_usage["cached"],
             "output_tokens": model_usage["output"],
         }
-        if show_costs and model_info_map is not None:
-            if model_cost_missing.get(model_name, False):
+        if with_costs:
+            if usage.model_cost_missing.get(model_name, False):
                 payload["estimated_cost"] = None
             else:
-                payload["estimated_cost"] = model_costs.get(model_name, 0.0)
-        print(json.dumps(payload, sort_keys=True))
-
-    for directory_name, directory_turns in sorted(by_directory.items(), key=lambda item: item[0]):
-        directory_turns = sorted(directory_turns, key=lambda item: item.request_ts)
-        by_optype = directory_turns[0].optype if directory_turns else ""
-        row_label_value = directory_turns[0].row_label if directory_turns else None
-        directory_gaps = [
-            gap
-            for gap in gaps
-            if gap.directory_name == directory_name
-        ]
-        print(
-            json.dumps(
-                {
-                    "type": "debug_directory",
-                    "directory": directory_name,
-                    "optype": by_optype,
-                    "row_label": row_label_value,
-                    "turn_count": len(directory_turns),
-                    "gap_count": len(directory_gaps),
-                    "first_request": directory_turns[0].request_ts.isoformat() if directory_turns else None,
-                    "last_request": directory_turns[-1].request_ts.isoformat() if directory_turns else None,
-                },
-                sort_keys=True,
-            )
-        )
-
-    for i, turn in enumerate(sorted(turns, key=lambda item: item.request_ts), start=1):
-        payload = {
-            "type": "turn",
-            "turn_number": i,
-            "directory": turn.directory_name,
-            "optype": turn.optype,
-            "row_label": turn.row_label,
-            "request_index": turn.request_index,
-            "request_ts": turn.request_ts.isoformat(),
-            "response_ts": turn.response_ts.isoformat(),
-            "model": turn.model,
-            "service_tier": turn.service_tier,
-            "input_tokens": turn.input_tokens,
-            "cached_input_tokens": turn.cached_input_tokens,
-            "output_tokens": turn.output_tokens,
-            "tools": turn.tools,
+                payload["estimated_cost"] = usage.model_costs.get(model_name, 0.0)
+        yield payload
+
+    summary: Dict[str, Any] = {
+        "type": "debug_summary",
+        "turn_count": totals.turn_count,
+        "gap_count": totals.gap_count,
+        "directory_count": totals.directory_count,
+        "turns_by_optype": dict(sorted(totals.turns_by_optype.items())),
+        "inference_ms": totals.inference_ms,
+        "wall_ms": totals.wall_ms,
+        "show_costs": show_costs,
+    }
+    if ingest_stats is not None:
+        speedup = ingest_stats.speedup
+        summary["ingest"] = {
+            "jobs": ingest_stats.jobs,
+            "directories": ingest_stats.directory_count,
+            "cached_directories": ingest_stats.cached_directory_count,
+            "wall_ms": round(ingest_stats.wall_ms, 3),
+            "task_ms": round(ingest_stats.task_ms, 3),
+            "speedup": round(speedup, 3) if speedup is not None else None,
         }
-        if show_costs and model_info_map is not None:
-            payload["estimated_cost"] = cost_for_turn(turn, model_info_map, cost_bands_cache)
-        print(json.dumps(payload, sort_keys=True))
-    for i, gap in enumerate(sorted(gaps, key=lambda item: (item.start, item.directory_name, item.from_request)), start=1):
-        payload = {
-            "type": "gap",
-            "gap_number": i,
-            "from_directory": gap.directory_name,
-            "from_request": gap.from_request,
-            "to_request": gap.to_request,
-            "start": gap.start.isoformat(),
-            "end": gap.end.isoformat(),
-            "gap_ms": ms_between(gap.start, gap.end),
-            "gap_s": seconds_between(gap.start, gap.end),
-            "turn_ms": gap.turn_duration_ms,
-            "turn_s": seconds_from_ms(gap.turn_duration_ms),
-            "tools": gap.tools,
-        }
-        print(json.dumps(payload, sort_keys=True))
+    yield summary
+
+
+def print_debug(
+    directories: Iterable[Tuple[datetime, Sequence[Turn]]],
+    model_info_map: Optional[Dict[str, Dict[str, Any]]] = None,
+    show_costs: bool = False,
+    ingest_stats: Optional[IngestStats] = None,
+    totals: Optional[DebugTotals] = None,
+    output: Optional[TextIO] = None,
+) -> None:
+    # each record is written as soon as it is produced; json.dumps would build a new encoder per record
+    write = (output if output is not None else sys.stdout).write
+    encode = json.JSONEncoder(sort_keys=True).encode
+    for record in iter_debug_records(directories, model_info_map, show_costs, ingest_stats, totals):
+        write(encode(record) + "\n")
 
 
 def main() -> int:
@@ -1561,36 +4810,73 @@ def main() -> int:
 
     if start_arg is not None and explicit_history is None:
         start_candidate_dir = Path(start_arg).expanduser()
-        if start_candidate_dir.is_dir():
+        if start_candidate_dir.is_dir() or (start_candidate_dir.suffix in (".zip", ".json") and start_candidate_dir.is_file()):
             explicit_history = start_candidate_dir
             start_arg = None
 
-    if explicit_history is not None and args.history != DEFAULT_HISTORY_PATH:
+    if explicit_history is not None and args.history is not None:
         raise SystemExit("Use either positional history path or --history, not both.")
 
-    history_root = explicit_history or Path(args.history).expanduser()
-    if not history_root.exists():
-        raise SystemExit(f"History path not found: {history_root}")
+    if explicit_history is not None:
+        history_paths = [explicit_history.expanduser()]
+    else:
+        history_paths = expand_history_patterns(args.history or [DEFAULT_HISTORY_PATH])
+    for history_path in history_paths:
+        if not history_path.exists():
+            raise SystemExit(f"History path not found: {history_path}")
+    history_roots = [open_history_root(history_path) for history_path in history_paths]
+    if args.follow and len(history_roots) > 1:
+        raise SystemExit("--follow cannot be used with several history roots")
+    if args.follow and isinstance(history_roots[0], ArchivePath):
+        raise SystemExit("--follow cannot be used with an archived history")
+    if (args.since is not None or args.until is not None) and (start_arg is not None or args.end is not None):
+        raise SystemExit("Use either --since/--until or start/end times, not both.")
+    if args.follow and args.debug:
+        raise SystemExit("--follow cannot be combined with --debug")
+    headless = bool(args.tool_stats or args.model_perf or args.cache_report or args.export_trace or args.render)
+    if args.follow and headless:
+        raise SystemExit("--follow cannot be combined with --tool-stats, --model-perf, --cache-report, --export-trace or --render")
 
     start_time = parse_time_or_none(start_arg)
     if start_arg is not None and start_time is None:
         raise SystemExit("start must be HH:MM:SS or HH-MM-SS, or a history directory path")
 
-    if start_time is None:
-        day_start = first_history_directory_timestamp(history_root)
-        if day_start is None:
+    profile = StageProfiler() if args.profile else None
+    with profile_stage(profile, "catalog") as totals:
+        catalogs = [HistoryCatalog.scan(history_root) for history_root in history_roots]
+        if totals is not None:
+            totals.items += sum(len(catalog.entries) for catalog in catalogs)
+    first_timestamps = [catalog.first_timestamp() for catalog in catalogs if catalog.entries]
+    last_timestamps = [catalog.last_timestamp() for catalog in catalogs if catalog.entries]
+    if args.since is not None:
+        day_start = parse_datetime_bound(args.since, end_of_day=False)
+    elif start_time is None:
+        if not first_timestamps:
             raise SystemExit("No parseable history directories found")
+        day_start = min(first_timestamps)
     else:
         day_start = datetime.combine(target_day, start_time)
 
     model_info_map: Optional[Dict[str, Dict[str, Any]]] = None
+    pricing_source: Optional[ModelPricingSource] = None
     if args.show_costs:
-        model_info_map = fetch_model_info(BROKK_PROXY_URL, "BROKK", proxy_brokk_api_key())
+        if args.pricing_file is not None:
+            with profile_stage(profile, "pricing") as totals:
+                model_info_map = load_pricing_file(Path(args.pricing_file).expanduser())
+                if totals is not None:
+                    totals.items += len(model_info_map)
+        else:
+            pricing_source = ModelPricingSource(pricing_cache_path(), args.pricing_ttl * 3600)
+            pricing_source.start(BROKK_PROXY_URL, "BROKK", proxy_brokk_api_key())
 
-    if args.end is None:
-        day_end = last_history_directory_timestamp(history_root)
-        if day_end is None:
+    if args.until is not None:
+        day_end = parse_datetime_bound(args.until, end_of_day=True)
+        if day_end < day_start:
+            raise SystemExit("--until must be after --since")
+    elif args.end is None:
+        if not last_timestamps:
             raise SystemExit("No parseable history directories found")
+        day_end = max(last_timestamps)
     else:
         end_time = parse_time_or_none(args.end)
         if end_time is None:
@@ -1602,26 +4888,126 @@ def main() -> int:
         if day_end < day_start:
             raise SystemExit("--end must be after --start")
 
-    turns, gaps = load_data(history_root, day_start, day_end)
-
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    turn_filter = turn_filter_from_args(args)
+    follower = None
+    if args.follow:
+        # without an explicit end the window stays open for task directories created later
+        follower = HistoryFollower(
+            history_roots[0],
+            day_start,
+            day_end if args.end is not None or args.until is not None else None,
+            turn_filter=turn_filter,
+        )
+        catalogs = [follower.catalog]
+    ingest_stats = IngestStats()
+    if args.debug and not headless:
+        # nothing needs the whole window, so records go out as each directory is loaded
+        if pricing_source is not None:
+            with profile_stage(profile, "pricing") as totals:
+                model_info_map = pricing_source.result()
+                if totals is not None:
+                    totals.items += len(model_info_map)
+        debug_totals = DebugTotals()
+        print_debug(
+            iter_history_directories(
+                history_roots,
+                day_start,
+                day_end,
+                use_index=not args.no_index,
+                jobs=jobs,
+                stats=ingest_stats,
+                catalogs=catalogs,
+                profile=profile,
+                turn_filter=turn_filter,
+            ),
+            model_info_map=model_info_map,
+            show_costs=args.show_costs,
+            ingest_stats=ingest_stats,
+            totals=debug_totals,
+        )
+        if profile is not None:
+            print(json.dumps(profile.to_record(), sort_keys=True))
+        print_timing_report(
+            debug_totals.inference_ms,
+            debug_totals.wall_ms,
+            debug_totals.concurrency.profile() if debug_totals.turn_count else None,
+        )
+        print_model_usage_summary(
+            (),
+            model_info_map=model_info_map,
+            show_costs=args.show_costs,
+            usage=debug_totals.usage(),
+        )
+        return 0
+    turns, gaps = load_history_roots(
+        history_roots,
+        day_start,
+        day_end,
+        use_index=not args.no_index,
+        jobs=jobs,
+        stats=ingest_stats,
+        catalogs=catalogs,
+        profile=profile,
+        turn_filter=turn_filter,
+    )
+    if pricing_source is not None:
+        # only the time spent waiting on a refresh that outlasted ingestion shows up here
+        with profile_stage(profile, "pricing") as totals:
+            model_info_map = pricing_source.result()
+            if totals is not None:
+                totals.items += len(model_info_map)
+
+    if args.export_trace:
+        trace_path = Path(args.export_trace).expanduser()
+        with profile_stage(profile, "trace_export") as totals:
+            event_count = write_trace(trace_path, turns, gaps, totals)
+        print(f"Wrote {event_count} trace events to {trace_path}", file=sys.stderr)
+    if args.render:
+        render_path = Path(args.render).expanduser()
+        with profile_stage(profile, "render"):
+            write_static_chart(render_path, turns, gaps, max(100, args.render_width))
+        print(f"Wrote chart to {render_path}", file=sys.stderr)
+
+    usage = aggregate_usage(turns, model_info_map=model_info_map, show_costs=args.show_costs)
     if args.debug:
-        print_debug(turns, gaps, model_info_map=model_info_map, show_costs=args.show_costs)
+        print_debug(
+            directory_turn_groups(turns),
+            model_info_map=model_info_map,
+            show_costs=args.show_costs,
+            ingest_stats=ingest_stats,
+        )
+        if args.tool_stats:
+            for record in tool_stats_records(compute_tool_stats(gaps)):
+                print(json.dumps(record, sort_keys=True))
+        if args.model_perf:
+            for record in model_performance_records(compute_model_performance(turns)[0]):
+                print(json.dumps(record, sort_keys=True))
+        if args.cache_report:
+            for record in cache_report_records(compute_cache_report(turns, model_info_map)):
+                print(json.dumps(record, sort_keys=True))
+        if profile is not None:
+            print(json.dumps(profile.to_record(), sort_keys=True))
         print_timing_summary(turns)
         print_model_usage_summary(
             turns,
             model_info_map=model_info_map,
             show_costs=args.show_costs,
+            usage=usage,
         )
         return 0
 
-    if not turns:
+    if not turns and not args.follow:
         print_timing_summary(turns)
         print_model_usage_summary(
             turns,
             model_info_map=model_info_map,
             show_costs=args.show_costs,
+            usage=usage,
         )
         print("No matching turns in selected window.")
+        if profile is not None:
+            print_profile(profile)
         return 0
 
     print_timing_summary(turns)
@@ -1629,8 +5015,21 @@ def main() -> int:
         turns,
         model_info_map=model_info_map,
         show_costs=args.show_costs,
+        usage=usage,
     )
-    return launch_gui(turns, gaps, day_start, day_end)
+    if headless:
+        if args.tool_stats:
+            print_tool_stats(compute_tool_stats(gaps))
+        if args.model_perf:
+            print_model_performance(*compute_model_performance(turns))
+        if args.cache_report:
+            print_cache_report(compute_cache_report(turns, model_info_map))
+        if profile is not None:
+            print_profile(profile)
+        return 0
+    if follower is not None:
+        follower.seed_turns(turns)
+    return launch_gui(turns, gaps, day_start, day_end, follower=follower, profile=profile)
 
 
 if __name__ == "__main__":
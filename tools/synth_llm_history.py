@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Write a synthetic .brokk/llm-history tree for benchmarking gantt.py and extract_turn.py."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+DEFAULT_TOOLS = ("searchSymbols", "getFileContents", "editFile", "runTests", "answer")
+DEFAULT_MODELS = ("gpt-5", "gpt-5-mini", "claude-sonnet-4-5")
+DEFAULT_OPTYPES = ("Ask", "Search", "Code")
+
+
+@dataclass(frozen=True)
+class SynthSpec:
+    directories: int = 10
+    turns_per_directory: int = 20
+    request_bytes: int = 8 * 1024
+    log_bytes: int = 2 * 1024
+    tools: tuple[str, ...] = DEFAULT_TOOLS
+    max_tools_per_turn: int = 3
+    models: tuple[str, ...] = DEFAULT_MODELS
+    optypes: tuple[str, ...] = DEFAULT_OPTYPES
+    # turns of one extra Code directory; extract_turn.py needs Code turn numbers to be unique
+    # within a worktree, so its benchmark uses this alongside non-Code optypes
+    code_session_turns: int = 0
+    start: datetime = datetime(2024, 5, 1, 8, 0, 0)
+    directory_interval_seconds: int = 30
+    seed: int = 0
+
+
+@dataclass
+class SynthSummary:
+    history_root: Path
+    directories: int = 0
+    turns: int = 0
+    files: int = 0
+    bytes_written: int = 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Write a synthetic .brokk/llm-history tree.")
+    parser.add_argument(
+        "worktree",
+        type=Path,
+        help="Directory to create; the history is written under <worktree>/.brokk/llm-history.",
+    )
+    parser.add_argument("--directories", type=int, default=10, help="Task directories to write (default: 10).")
+    parser.add_argument(
+        "--turns-per-directory",
+        type=int,
+        default=20,
+        help="Turns in each task directory (default: 20).",
+    )
+    parser.add_argument(
+        "--request-kib",
+        type=float,
+        default=8.0,
+        help="Approximate size of each request.json in KiB (default: 8).",
+    )
+    parser.add_argument(
+        "--log-kib",
+        type=float,
+        default=2.0,
+        help="Approximate size of each response .log in KiB (default: 2).",
+    )
+    parser.add_argument(
+        "--tools",
+        default=",".join(DEFAULT_TOOLS),
+        help="Comma-separated tool names to draw tool calls from.",
+    )
+    parser.add_argument(
+        "--max-tools-per-turn",
+        type=int,
+        default=3,
+        help="Upper bound on distinct tools called before each turn (default: 3).",
+    )
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS), help="Comma-separated model names.")
+    parser.add_argument(
+        "--optypes",
+        default=",".join(DEFAULT_OPTYPES),
+        help="Comma-separated optypes assigned to directories in turn (default: Ask,Search,Code).",
+    )
+    parser.add_argument(
+        "--code-session-turns",
+        type=int,
+        default=0,
+        help="Also write one Code directory with this many turns, for extract_turn.py (default: 0).",
+    )
+    parser.add_argument(
+        "--start",
+        default="2024-05-01T08:00:00",
+        help="Timestamp of the first task directory (default: 2024-05-01T08:00:00).",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+    return parser
+
+
+def _padding(size: int) -> str:
+    line = 'def handler(request):  # "quoted" \\ path\\to\\file\n'
+    return (line * (size // len(line) + 1))[:size]
+
+
+def _request_payload(rng: random.Random, spec: SynthSpec, turn_number: int) -> tuple[str, list[str]]:
+    tool_count = rng.randint(0, max(0, min(spec.max_tools_per_turn, len(spec.tools))))
+    tools = rng.sample(spec.tools, tool_count)
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": "You are a coding agent."},
+        {"role": "user", "content": f"Synthetic task, turn {turn_number}."},
+    ]
+    if tools:
+        messages.append(
+            {
+                "role": "assistant",
+                "content": "",
+                "tool_calls": [
+                    {
+                        "id": f"call_{turn_number}_{position}",
+                        "type": "function",
+                        "function": {"name": tool, "arguments": json.dumps({"path": f"src/file{position}.py"})},
+                    }
+                    for position, tool in enumerate(tools)
+                ],
+            }
+        )
+    body = {"model": "synthetic", "messages": messages}
+    remaining = spec.request_bytes - len(json.dumps(body))
+    if remaining > 0:
+        # tool results carry most of the bytes in real requests
+        messages.append({"role": "tool", "name": tools[-1] if tools else "context", "content": _padding(remaining)})
+    return json.dumps(body), tools
+
+
+def _response_log(rng: random.Random, spec: SynthSpec, model: str, tools: list[str]) -> str:
+    prompt_tokens = rng.randint(2_000, 250_000)
+    cached_tokens = int(prompt_tokens * rng.uniform(0.0, 0.95))
+    metadata = {
+        "modelName": model,
+        "inputTokens": prompt_tokens - cached_tokens,
+        "cachedInputTokens": cached_tokens,
+        "outputTokens": rng.randint(50, 4_000),
+    }
+    requests = [{"name": tool, "arguments": "{}"} for tool in tools]
+    head = f"# Request to {model}:\n\n## reasoningContent\nThinking about the task.\n\n## text\n"
+    tail = f"\n\n## toolExecutionRequests\n{json.dumps(requests)}\n\n## metadata\n{json.dumps(metadata)}\n"
+    return head + _padding(max(0, spec.log_bytes - len(head) - len(tail))) + tail
+
+
+def _write(path: Path, text: str, summary: SynthSummary) -> None:
+    data = text.encode("utf-8")
+    path.write_bytes(data)
+    summary.files += 1
+    summary.bytes_written += len(data)
+
+
+def _write_directory(
+    history_root: Path,
+    rng: random.Random,
+    spec: SynthSpec,
+    started: datetime,
+    optype: str,
+    number: int,
+    turn_count: int,
+    summary: SynthSummary,
+) -> None:
+    directory = history_root / f"{started:%Y-%m-%d-%H-%M-%S} {optype} synthetic task {number}"
+    directory.mkdir()
+    summary.directories += 1
+    model = spec.models[number % len(spec.models)]
+    now = started
+    for turn_number in range(1, turn_count + 1):
+        now += timedelta(seconds=rng.randint(1, 15))
+        request_ts = now
+        now += timedelta(seconds=rng.randint(2, 30))
+        index = f"{turn_number:03d}"
+        request_text, tools = _request_payload(rng, spec, turn_number)
+        _write(directory / f"{request_ts:%H-%M.%S} {index}-request.json", request_text, summary)
+        _write(directory / f"{now:%H-%M.%S} {index}-Response.log", _response_log(rng, spec, model, tools), summary)
+        if optype == "Code" and tools:
+            records = [
+                {"toolName": tool, "toolId": f"call_{turn_number}_{position}", "resultText": "ok"}
+                for position, tool in enumerate(tools)
+            ]
+            _write(
+                directory / f"{now:%H-%M.%S} {index}-tools.jsonl",
+                "".join(json.dumps(record) + "\n" for record in records),
+                summary,
+            )
+        summary.turns += 1
+
+
+def _directory_start(candidate: datetime, turn_count: int) -> datetime:
+    # file names only carry a time of day, so a directory must not run past midnight
+    longest = timedelta(seconds=45 * turn_count)
+    if (candidate + longest).date() != candidate.date():
+        return datetime.combine(candidate.date() + timedelta(days=1), datetime.min.time())
+    return candidate
+
+
+def write_history(worktree: Path, spec: SynthSpec) -> SynthSummary:
+    history_root = worktree / ".brokk" / "llm-history"
+    history_root.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(spec.seed)
+    summary = SynthSummary(history_root)
+    started = spec.start
+    for number in range(spec.directories):
+        started = _directory_start(started, spec.turns_per_directory)
+        optype = spec.optypes[number % len(spec.optypes)]
+        _write_directory(history_root, rng, spec, started, optype, number, spec.turns_per_directory, summary)
+        started += timedelta(seconds=spec.directory_interval_seconds)
+    if spec.code_session_turns > 0:
+        started = _directory_start(started, spec.code_session_turns)
+        _write_directory(history_root, rng, spec, started, "Code", spec.directories, spec.code_session_turns, summary)
+    return summary
+
+
+def _split(raw: str) -> tuple[str, ...]:
+    return tuple(value.strip() for value in raw.split(",") if value.strip())
+
+
+def main(argv: list[str] | None = None, stdout: object | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    output_stream = stdout if stdout is not None else sys.stdout
+
+    try:
+        start = datetime.fromisoformat(args.start)
+    except ValueError as exc:
+        parser.error(f"--start: {exc}")
+    spec = SynthSpec(
+        directories=max(0, args.directories),
+        turns_per_directory=max(1, args.turns_per_directory),
+        request_bytes=int(args.request_kib * 1024),
+        log_bytes=int(args.log_kib * 1024),
+        tools=_split(args.tools) or DEFAULT_TOOLS,
+        max_tools_per_turn=max(0, args.max_tools_per_turn),
+        models=_split(args.models) or DEFAULT_MODELS,
+        optypes=_split(args.optypes) or DEFAULT_OPTYPES,
+        code_session_turns=max(0, args.code_session_turns),
+        start=start,
+        seed=args.seed,
+    )
+    try:
+        summary = write_history(args.worktree, spec)
+    except FileExistsError as exc:
+        parser.error(f"history directory already exists: {exc.filename}")
+    print(
+        json.dumps(
+            {
+                "history_root": str(summary.history_root),
+                "directories": summary.directories,
+                "turns": summary.turns,
+                "files": summary.files,
+                "bytes": summary.bytes_written,
+            },
+            indent=2,
+        ),
+        file=output_stream,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
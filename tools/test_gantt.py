@@ -0,0 +1,864 @@
+import gzip
+import io
+import json
+import random
+import shutil
+import zipfile
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+import gantt
+from gantt import HISTORY_INDEX_FILENAME, load_data
+
+
+DAY_START = datetime(2024, 5, 1, 0, 0, 0)
+DAY_END = datetime(2024, 5, 1, 23, 59, 59)
+
+
+def _write_turn(
+    directory: Path,
+    index: str,
+    request_time: str,
+    response_time: str,
+    *,
+    model: str = "gpt-5",
+    input_tokens: int = 100,
+    cached_input_tokens: int = 0,
+    output_tokens: int = 10,
+    tools: tuple[str, ...] = (),
+) -> None:
+    messages: list[dict] = [{"role": "user", "content": "hello"}]
+    if tools:
+        messages.append(
+            {
+                "role": "assistant",
+                "tool_calls": [{"function": {"name": tool, "arguments": "{}"}} for tool in tools],
+            }
+        )
+    (directory / f"{request_time} {index}-request.json").write_text(
+        json.dumps({"messages": messages}),
+        encoding="utf-8",
+    )
+    metadata = {
+        "modelName": model,
+        "inputTokens": input_tokens,
+        "cachedInputTokens": cached_input_tokens,
+        "outputTokens": output_tokens,
+    }
+    (directory / f"{response_time} {index}-Response.log").write_text(
+        f"# Request to {model}:\n\n## text\nok\n\n## metadata\n{json.dumps(metadata)}\n",
+        encoding="utf-8",
+    )
+
+
+def _write_history(root: Path) -> Path:
+    code_dir = root / "2024-05-01-10-00-00 Code first task"
+    code_dir.mkdir(parents=True)
+    _write_turn(code_dir, "001", "10-00.01", "10-00.05", tools=("searchSymbols",))
+    _write_turn(code_dir, "002", "10-00.09", "10-00.20", tools=("editFile", "runTests"))
+
+    ask_dir = root / "2024-05-01-10-00-03 Ask nested question"
+    ask_dir.mkdir()
+    _write_turn(ask_dir, "001", "10-00.03", "10-00.04", model="gpt-5-mini")
+    return root
+
+
+def test_load_data_reuses_history_index_for_unchanged_directories(tmp_path: Path, monkeypatch) -> None:
+    history = _write_history(tmp_path / "llm-history")
+
+    cold_turns, cold_gaps = load_data(history, DAY_START, DAY_END)
+    assert (history / HISTORY_INDEX_FILENAME).is_file()
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("unchanged directories must be served from the index")
+
+    monkeypatch.setattr(gantt, "parse_metadata_from_log", fail)
+    monkeypatch.setattr(gantt, "parse_tool_names", fail)
+    warm_turns, warm_gaps = load_data(history, DAY_START, DAY_END)
+
+    assert warm_turns == cold_turns
+    assert warm_gaps == cold_gaps
+    assert [turn.tools for turn in warm_turns] == [("searchSymbols",), (), ("editFile", "runTests")]
+
+
+def test_load_data_reparses_directories_that_changed_since_indexing(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    load_data(history, DAY_START, DAY_END)
+
+    _write_turn(history / "2024-05-01-10-00-00 Code first task", "003", "10-00.30", "10-00.40", output_tokens=77)
+    turns, gaps = load_data(history, DAY_START, DAY_END)
+
+    assert [turn.request_index for turn in turns] == ["001", "001", "002", "003"]
+    assert turns[-1].output_tokens == 77
+    assert len(gaps) == 2
+
+
+def test_history_index_appends_changed_directories_and_compacts_when_stale(tmp_path: Path, monkeypatch) -> None:
+    index_path = tmp_path / HISTORY_INDEX_FILENAME
+
+    def lines() -> list[str]:
+        return index_path.read_text(encoding="utf-8").splitlines()
+
+    index = gantt.HistoryIndex.load(index_path)
+    index.store("a", "sig-a", [{"n": 1}])
+    index.store("b", "sig-b", [{"n": 2}])
+    index.save()
+    assert len(lines()) == 3
+
+    first_lines = lines()
+    index = gantt.HistoryIndex.load(index_path)
+    index.store("a", "sig-a2", [{"n": 3}])
+    index.retain({"a"})
+    index.save()
+    # the old lines stay put; the changed directory and the removal are appended
+    assert lines()[:3] == first_lines and len(lines()) == 5
+
+    index = gantt.HistoryIndex.load(index_path)
+    assert index.lookup("a", "sig-a2") == [{"n": 3}]
+    assert index.lookup("a", "sig-a") is None
+    assert index.lookup("b", "sig-b") is None
+
+    with index_path.open("a", encoding="utf-8") as file:
+        file.write('{"directory": "c", "signa')
+    index = gantt.HistoryIndex.load(index_path)
+    assert index.lookup("a", "sig-a2") == [{"n": 3}]
+    index.store("c", "sig-c", [])
+    index.save()
+    # nothing is appended onto a torn line, the live lines are rewritten instead
+    assert len(lines()) == 3
+
+    monkeypatch.setattr(gantt, "HISTORY_INDEX_MIN_STALE_LINES", 0)
+    for position in range(5):
+        index = gantt.HistoryIndex.load(index_path)
+        index.store("a", f"sig-a{position}", [{"n": position}])
+        index.save()
+        assert len(lines()) <= 1 + 2 * 2
+    index = gantt.HistoryIndex.load(index_path)
+    assert index.lookup("a", "sig-a4") == [{"n": 4}]
+    assert index.lookup("c", "sig-c") == []
+
+
+def test_load_data_with_worker_processes_matches_serial_ordering(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+
+    serial_turns, serial_gaps = load_data(history, DAY_START, DAY_END, use_index=False)
+    stats = gantt.IngestStats()
+    parallel_turns, parallel_gaps = load_data(history, DAY_START, DAY_END, use_index=False, jobs=2, stats=stats)
+
+    assert parallel_turns == serial_turns
+    assert parallel_gaps == serial_gaps
+    assert stats.jobs == 2
+    assert stats.directory_count == 2
+    assert stats.cached_directory_count == 0
+
+
+def test_parse_metadata_from_log_reads_trailing_metadata_block(tmp_path: Path, monkeypatch) -> None:
+    log_path = tmp_path / "10-00.05 001-Response.log"
+    metadata = {"modelName": "gpt-5", "inputTokens": 12, "cachedInputTokens": 3, "outputTokens": 4, "serviceTier": "flex"}
+    log_path.write_text(
+        "## text\n" + ("x" * 50_000) + "\n## metadata\nnot the real one\n" + ("y" * 50_000)
+        + f"\n## metadata\n{json.dumps(metadata)}\n",
+        encoding="utf-8",
+    )
+
+    expected = ("gpt-5", 12, 3, 4, "flex")
+    assert gantt.parse_metadata_from_log(log_path) == expected
+
+    # a metadata block larger than the tail window falls back to a forward scan
+    monkeypatch.setattr(gantt, "LOG_TAIL_WINDOW_BYTES", 16)
+    assert gantt.parse_metadata_from_log(log_path) == expected
+
+
+def test_parse_tool_names_streams_large_request_payloads_like_json_load(tmp_path: Path, monkeypatch) -> None:
+    payload = {
+        "model": "gpt-5",
+        "messages": [
+            {"role": "system", "content": "ignore {\"name\": \"fake\"} and [brackets]"},
+            {
+                "content": "x" * 200_000,
+                "tool_calls": [
+                    {"id": "1", "function": {"arguments": "{\"name\": \"nope\"}", "name": "searchSymbols"}},
+                    {"name": "getFileé", "function": "not-a-dict"},
+                ],
+                "role": "Assistant",
+            },
+            {"role": "tool", "name": "searchSymbols", "content": [{"text": "\"quoted\" \\ backslash"}]},
+            {"role": "user", "name": 42},
+            "not a message",
+        ],
+        "stream": True,
+    }
+    payload_path = tmp_path / "10-00.01 001-request.json"
+    payload_path.write_text(json.dumps(payload), encoding="utf-8")
+
+    assert gantt.parse_tool_names(payload_path) == ["searchSymbols", "getFileé"]
+
+    scanned = []
+    iter_request_messages = gantt.iter_request_messages
+    monkeypatch.setattr(gantt, "iter_request_messages", lambda file: scanned.append(1) or iter_request_messages(file))
+    monkeypatch.setattr(gantt, "JSON_SCAN_MIN_BYTES", 1024)
+    assert gantt.parse_tool_names(payload_path) == ["searchSymbols", "getFileé"]
+    assert scanned == [1]
+
+    payload_path.write_text(json.dumps(payload)[:-10], encoding="utf-8")
+    assert gantt.parse_tool_names(payload_path) == []
+    monkeypatch.setattr(gantt, "JSON_SCAN_MIN_BYTES", 8 * 1024 * 1024)
+    assert gantt.parse_tool_names(payload_path) == []
+
+
+def test_history_catalog_answers_window_queries_from_one_scan(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    (history / "2024-05-02-08-30-00 Code next day").mkdir()
+    (history / "not a task directory").mkdir()
+    (history / HISTORY_INDEX_FILENAME).write_text("", encoding="utf-8")
+
+    catalog = gantt.HistoryCatalog.scan(history)
+
+    assert catalog.first_timestamp() == datetime(2024, 5, 1, 10, 0, 0)
+    assert catalog.last_timestamp() == datetime(2024, 5, 2, 8, 30, 0)
+    assert [entry.name for entry in catalog.window(datetime(2024, 5, 1, 10, 0, 1), DAY_END)] == [
+        "2024-05-01-10-00-03 Ask nested question",
+    ]
+    assert [entry.name for entry in catalog.window(DAY_START, datetime(2024, 5, 1, 10, 0, 3))] == [
+        "2024-05-01-10-00-00 Code first task",
+        "2024-05-01-10-00-03 Ask nested question",
+    ]
+
+
+def test_history_follower_reports_only_changed_directories(tmp_path: Path, monkeypatch) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    turns, _ = load_data(history, DAY_START, DAY_END, use_index=False)
+    follower = gantt.HistoryFollower(history, DAY_START, None, turns)
+
+    assert follower.poll() == {}
+
+    code_dir = history / "2024-05-01-10-00-00 Code first task"
+    parsed_requests: list[str] = []
+    original_parse_tool_names = gantt.parse_tool_names
+
+    def tracking_parse_tool_names(path: Path) -> list[str]:
+        parsed_requests.append(path.name)
+        return original_parse_tool_names(path)
+
+    monkeypatch.setattr(gantt, "parse_tool_names", tracking_parse_tool_names)
+    _write_turn(code_dir, "003", "10-00.30", "10-00.40")
+    new_dir = history / "2024-05-02-09-00-00 Ask later question"
+    new_dir.mkdir()
+    _write_turn(new_dir, "001", "09-00.01", "09-00.02")
+
+    changed = follower.poll()
+
+    assert sorted(changed) == [code_dir.name, new_dir.name]
+    assert [turn.request_index for turn in changed[code_dir.name]] == ["001", "002", "003"]
+    assert sorted(parsed_requests) == ["09-00.01 001-request.json", "10-00.30 003-request.json"]
+    assert follower.poll() == {}
+
+
+def test_history_follower_picks_up_what_was_written_during_ingestion(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    follower = gantt.HistoryFollower(history, DAY_START, None)
+
+    code_dir = history / "2024-05-01-10-00-00 Code first task"
+    _write_turn(code_dir, "003", "10-00.30", "10-00.40")
+    new_dir = history / "2024-05-01-11-00-00 Ask asked mid-load"
+    new_dir.mkdir()
+    _write_turn(new_dir, "001", "11-00.01", "11-00.02")
+    turns, _ = load_data(history, DAY_START, DAY_END, use_index=False, catalog=follower.catalog)
+    assert new_dir.name not in {turn.directory_name for turn in turns}
+    follower.seed_turns(turns)
+
+    changed = follower.poll()
+
+    assert sorted(changed) == [code_dir.name, new_dir.name]
+    assert [turn.request_index for turn in changed[code_dir.name]] == ["001", "002", "003"]
+    assert [turn.request_index for turn in changed[new_dir.name]] == ["001"]
+    assert follower.poll() == {}
+
+
+def test_history_follower_revives_quiet_directories_on_cold_checks(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    turns, _ = load_data(history, DAY_START, DAY_END, use_index=False)
+    follower = gantt.HistoryFollower(history, DAY_START, None, turns, hot_seconds=0, cold_check_polls=2)
+    code_dir = history / "2024-05-01-10-00-00 Code first task"
+    assert follower.hot_directories == {}
+    assert code_dir.name in follower.cold_directories
+
+    _write_turn(code_dir, "003", "10-00.30", "10-00.40")
+    assert follower.poll() == {}
+    changed = follower.poll()
+
+    assert [turn.request_index for turn in changed[code_dir.name]] == ["001", "002", "003"]
+    assert code_dir.name not in follower.cold_directories
+    assert follower.poll() == {}
+    assert code_dir.name in follower.cold_directories
+
+
+def test_spatial_hit_index_returns_overlapping_rects_topmost_first() -> None:
+    index = gantt.SpatialHitIndex(cell_size=10)
+    index.add("wide", 0, 0, 95, 8, payload="bar")
+    index.add("box", 40, 4, 10, 30, payload="gap")
+
+    assert index.query(45, 5) == ["box", "wide"]
+    assert index.query(90, 2) == ["wide"]
+    assert index.query(45, 30) == ["box"]
+    assert index.query(200, 200) == []
+    assert index.payloads["box"] == "gap"
+
+    index.add("box", 60, 50, 5, 5)
+    assert index.query(45, 30) == []
+    assert index.query(62, 52) == ["box"]
+
+    index.remove("wide")
+    assert index.query(90, 2) == []
+
+
+def test_aggregate_spans_folds_narrow_turns_into_density_buckets() -> None:
+    spans = [(0, 2), (1, 3), (4, 5), (10, 40), (41, 42), (60, 61), (61, 63)]
+
+    individual, buckets = gantt.aggregate_spans(spans, min_span_px=4, bucket_px=6)
+
+    assert individual == [3, 4]
+    assert [(bucket.left, bucket.right, bucket.count) for bucket in buckets] == [(0, 6, 3), (60, 66, 2)]
+    assert buckets[0].busy_px == 5
+    assert buckets[1].utilization == 3 / 6
+
+
+def _naive_row_groups(row_labels, row_start, row_end):
+    parent = {}
+    for index, row_name in enumerate(row_labels):
+        parent[row_name] = None
+        for candidate in reversed(row_labels[:index]):
+            if row_start[candidate] <= row_start[row_name] and row_end[row_name] <= row_end[candidate]:
+                parent[row_name] = candidate
+                break
+    depth = {}
+    root = {}
+    for row_name in row_labels:
+        depth[row_name] = 0
+        root[row_name] = row_name
+        while parent[root[row_name]] is not None:
+            root[row_name] = parent[root[row_name]]
+            depth[row_name] += 1
+    return parent, depth, root
+
+
+def test_compute_row_groups_matches_pairwise_containment_scan() -> None:
+    rng = random.Random(9)
+    for _ in range(200):
+        row_start = {}
+        row_end = {}
+        for index in range(rng.randint(1, 40)):
+            start = gantt.epoch_ms(DAY_START) + rng.randint(0, 60) * 1000
+            row_start[f"row{index:02d}"] = start
+            row_end[f"row{index:02d}"] = start + rng.randint(0, 60) * 1000
+        row_labels = sorted(row_start, key=lambda row: (row_start[row], row))
+
+        assert gantt.compute_row_groups(row_labels, row_start, row_end) == _naive_row_groups(
+            row_labels, row_start, row_end
+        )
+
+
+def test_load_data_profile_counts_items_per_stage_across_workers(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+
+    for jobs in (1, 2):
+        profile = gantt.StageProfiler()
+        load_data(history, DAY_START, DAY_END, use_index=False, jobs=jobs, profile=profile)
+        stages = profile.to_record()["stages"]
+
+        assert stages["catalog"]["items"] == 2
+        assert stages["directory_scan"]["items"] == 6
+        assert stages["log_metadata"]["items"] == 3
+        assert stages["request_json"]["items"] == 3
+        assert stages["request_json"]["bytes_read"] == sum(
+            path.stat().st_size for path in history.glob("*/*-request.json")
+        )
+        assert stages["gaps"]["items"] == 1
+        assert "index_load" not in stages
+
+
+def test_model_pricing_source_prefers_fresh_cache_and_falls_back_to_stale(tmp_path: Path, monkeypatch) -> None:
+    cache_path = tmp_path / "cache" / "model-info.json"
+    snapshot = {"data": [{"model_name": "gpt-5", "model_info": {"input_cost_per_token": 1e-6}}]}
+    fetched: list[str] = []
+
+    def fetch(proxy_url, _proxy_setting, _api_key):
+        fetched.append(proxy_url)
+        return snapshot if proxy_url == "online" else None
+
+    monkeypatch.setattr(gantt, "fetch_model_info_payload", fetch)
+
+    source = gantt.ModelPricingSource(cache_path, ttl_seconds=3600)
+    source.start("online", "BROKK", None)
+    assert source.result() == {"gpt-5": {"input_cost_per_token": 1e-6}}
+    assert gantt.read_pricing_cache(cache_path)[0] == snapshot
+
+    fresh = gantt.ModelPricingSource(cache_path, ttl_seconds=3600)
+    fresh.start("online", "BROKK", None)
+    assert fresh.result() == {"gpt-5": {"input_cost_per_token": 1e-6}}
+    assert fetched == ["online"]
+
+    stale = gantt.ModelPricingSource(cache_path, ttl_seconds=0)
+    stale.start("offline", "BROKK", None)
+    assert stale.result() == {"gpt-5": {"input_cost_per_token": 1e-6}}
+    assert fetched == ["online", "offline"]
+
+    pricing_file = tmp_path / "model-info.json"
+    pricing_file.write_text(json.dumps(snapshot), encoding="utf-8")
+    assert gantt.load_pricing_file(pricing_file) == {"gpt-5": {"input_cost_per_token": 1e-6}}
+
+
+def test_aggregate_usage_matches_per_turn_pricing_with_and_without_numpy(monkeypatch) -> None:
+    model_info_map = {
+        "gpt-5": {
+            "input_cost_per_token": 1e-6,
+            "cache_read_input_token_cost": 1e-7,
+            "output_cost_per_token": 1e-5,
+            "input_cost_per_token_above_200k_tokens": 2e-6,
+            "pricing_tiers": {"flex": {"input_cost_per_token": 5e-7, "output_cost_per_token": 5e-6}},
+        },
+        "gpt-5-mini": {"input_cost_per_token": 2e-7, "output_cost_per_token": 8e-7},
+    }
+    rng = random.Random(12)
+    turns = []
+    for position in range(500):
+        request_ts = DAY_START + timedelta(seconds=position)
+        turns.append(
+            gantt.Turn(
+                directory_name=f"dir{position % 7}",
+                optype="Code",
+                row_label="Code dir",
+                request_index=f"{position:03d}",
+                request_ms=gantt.epoch_ms(request_ts),
+                response_ms=gantt.epoch_ms(request_ts) + 2000,
+                directory_path=Path(f"dir{position % 7}"),
+                log_name=None,
+                log_ms=None,
+                model=rng.choice(["gpt-5", "gpt-5-mini", "unpriced", None] if position % 7 == 0 else ["gpt-5", "gpt-5-mini", None]),
+                service_tier=rng.choice([None, "flex", "priority"]),
+                input_tokens=rng.randint(0, 300_000),
+                cached_input_tokens=rng.randint(0, 50_000),
+                output_tokens=rng.randint(0, 5_000),
+                tools=(),
+            )
+        )
+
+    bands: dict = {}
+    expected_costs = []
+    for turn in turns:
+        band = gantt.price_band_for_turn(turn, model_info_map, bands)
+        expected_costs.append(
+            None
+            if band is None
+            else turn.input_tokens * band.input_cost_per_token
+            + turn.cached_input_tokens * band.cached_input_cost_per_token
+            + turn.output_tokens * band.output_cost_per_token
+        )
+    expected_directory_costs: dict = {}
+    for turn, cost in zip(turns, expected_costs):
+        expected_directory_costs[turn.directory_name] = expected_directory_costs.get(turn.directory_name, 0.0) + (cost or 0.0)
+    # only dir0 has turns on the unpriced model, so it has no complete cost
+    del expected_directory_costs["dir0"]
+
+    results = [gantt.aggregate_usage(turns, model_info_map, show_costs=True)]
+    monkeypatch.setattr(gantt, "np", None)
+    results.append(gantt.aggregate_usage(turns, model_info_map, show_costs=True))
+
+    for usage in results:
+        assert usage.turn_costs == pytest.approx(expected_costs, rel=1e-12)
+        assert usage.directory_costs == pytest.approx(expected_directory_costs, rel=1e-9)
+        assert usage.model_cost_missing == {"unpriced": True}
+        assert usage.directory_cost_missing == {"dir0": True}
+        assert usage.model_tokens["<missing>"]["input"] == sum(
+            turn.input_tokens for turn in turns if turn.model is None
+        )
+        assert sum(row["output"] for row in usage.directory_tokens.values()) == sum(turn.output_tokens for turn in turns)
+    assert results[0].model_tokens == results[1].model_tokens
+    assert results[0].model_costs == pytest.approx(results[1].model_costs, rel=1e-12)
+
+
+def test_compute_concurrency_sweeps_in_flight_calls_and_directory_utilization(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    turns, _ = load_data(history, DAY_START, DAY_END, use_index=False)
+
+    profile = gantt.compute_concurrency(turns)
+
+    start = gantt.epoch_ms(datetime(2024, 5, 1, 10, 0, 1))
+    assert profile.series == [(start, 1), (start + 2000, 2), (start + 3000, 1), (start + 4000, 0), (start + 8000, 1), (start + 19000, 0)]
+    assert profile.peak == 2
+    assert profile.peak_ms == start + 2000
+    assert profile.busy_ms == 4000 + 11000
+    assert profile.wall_ms == 19000
+    code = profile.directories["2024-05-01-10-00-00 Code first task"]
+    assert (code.wall_ms, code.busy_ms, code.gap_ms) == (19000, 15000, 4000)
+    assert profile.directories["2024-05-01-10-00-03 Ask nested question"].utilization == 1.0
+
+    # back-to-back calls hand over at the same instant and never overlap
+    first, second = turns[1], turns[2]
+    second.request_ms = first.response_ms
+    assert gantt.compute_concurrency([first, second]).peak == 1
+
+
+def test_concurrency_sweep_replacing_directories_matches_a_fresh_sweep() -> None:
+    rng = random.Random(21)
+    base_ms = gantt.epoch_ms(DAY_START)
+
+    def random_turns(directory_name: str, count: int) -> list:
+        turns = []
+        for position in range(count):
+            request_ms = base_ms + rng.randint(0, 600) * 1000
+            turns.append(
+                gantt.Turn(
+                    directory_name=directory_name,
+                    optype="Code",
+                    row_label="Code dir",
+                    request_index=f"{position:03d}",
+                    request_ms=request_ms,
+                    response_ms=request_ms + rng.choice([0, 1000, rng.randint(1, 90) * 1000]),
+                    model=None,
+                    directory_path=Path(directory_name),
+                    log_name=None,
+                    log_ms=None,
+                    service_tier=None,
+                    input_tokens=0,
+                    cached_input_tokens=0,
+                    output_tokens=0,
+                    tools=(),
+                )
+            )
+        return sorted(turns, key=lambda turn: turn.request_ms)
+
+    rows = {f"dir{position}": random_turns(f"dir{position}", 20) for position in range(6)}
+    sweep = gantt.ConcurrencySweep([turn for turns in rows.values() for turn in turns])
+    for step in range(40):
+        directory_name = f"dir{rng.randint(0, 8)}"
+        previous = rows.get(directory_name, [])
+        if step % 3 == 0:
+            replacement = previous[: rng.randint(0, len(previous))]
+        else:
+            replacement = sorted(previous + random_turns(directory_name, rng.randint(1, 5)), key=lambda turn: turn.request_ms)
+        sweep.replace_directory(directory_name, previous, replacement)
+        rows[directory_name] = replacement
+
+        expected = gantt.ConcurrencySweep([turn for turns in rows.values() for turn in turns]).profile()
+        incremental = sweep.profile()
+        assert incremental.series == expected.series
+        assert (incremental.peak, incremental.peak_ms, incremental.busy_ms) == (expected.peak, expected.peak_ms, expected.busy_ms)
+        assert incremental.inference_ms == expected.inference_ms
+        assert incremental.directories == expected.directories
+
+    streamed = gantt.RequestOrderSweep()
+    for turn in sorted((turn for turns in rows.values() for turn in turns), key=lambda turn: turn.request_ms):
+        streamed.add(turn)
+    streamed_profile = streamed.profile()
+    assert (streamed_profile.peak, streamed_profile.peak_ms, streamed_profile.busy_ms) == (
+        expected.peak,
+        expected.peak_ms,
+        expected.busy_ms,
+    )
+    assert (streamed_profile.start_ms, streamed_profile.end_ms, streamed_profile.inference_ms) == (
+        expected.start_ms,
+        expected.end_ms,
+        expected.inference_ms,
+    )
+
+
+def test_quantile_sketch_stays_within_relative_accuracy_and_merges() -> None:
+    rng = random.Random(15)
+    values = [rng.lognormvariate(8, 1.5) for _ in range(20_000)] + [0.0] * 50
+    left = gantt.QuantileSketch()
+    right = gantt.QuantileSketch()
+    for position, value in enumerate(values):
+        (left if position % 2 else right).add(value)
+    left.merge(right)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert left.quantile(q) == pytest.approx(exact, rel=0.011)
+    assert left.count == len(values)
+    assert left.max == max(values)
+    assert len(left.buckets) < 1_000
+    assert gantt.QuantileSketch().quantile(0.5) is None
+
+
+def test_tool_stats_attribute_gap_durations_to_each_tool(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    _write_turn(history / "2024-05-01-10-00-00 Code first task", "003", "10-00.50", "10-00.55", tools=("runTests",))
+    _, gaps = load_data(history, DAY_START, DAY_END, use_index=False)
+
+    records = {record["tool"]: record for record in gantt.tool_stats_records(gantt.compute_tool_stats(gaps))}
+
+    assert sorted(records) == ["editFile", "runTests"]
+    assert records["runTests"]["count"] == 2
+    assert records["runTests"]["total_ms"] == 4000 + 30000
+    assert records["runTests"]["max_ms"] == 30000
+    assert records["editFile"]["p50_ms"] == pytest.approx(4000, rel=0.01)
+
+
+def test_model_performance_splits_latency_by_prompt_band_and_trend(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    code_dir = history / "2024-05-01-10-00-00 Code first task"
+    _write_turn(code_dir, "003", "10-00.30", "10-00.50", input_tokens=150_000, cached_input_tokens=60_000, output_tokens=400)
+    turns, _ = load_data(history, DAY_START, DAY_END, use_index=False)
+
+    performance, window_start, window_end = gantt.compute_model_performance(turns, trend_buckets=7)
+
+    assert window_end - window_start == 49_000
+    gpt5 = performance[("gpt-5", "standard")]
+    assert gpt5.turns == 3
+    assert gpt5.output_tokens_per_second == (10 + 10 + 400) / (4 + 11 + 20)
+    assert {band: sketch.count for band, sketch in gpt5.latency_by_band.items()} == {"<200k": 2, ">=200k": 1}
+    assert gpt5.trend_output_tokens == [10, 10, 0, 0, 400, 0, 0]
+    assert gpt5.trend_tokens_per_second()[:3] == [10 / 4, 10 / 11, None]
+    assert performance[("gpt-5-mini", "standard")].latency_ms == 1000
+
+
+def test_cache_report_flags_drops_and_prices_missed_prefix(tmp_path: Path) -> None:
+    history = tmp_path / "llm-history"
+    code_dir = history / "2024-05-01-10-00-00 Code first task"
+    code_dir.mkdir(parents=True)
+    _write_turn(code_dir, "001", "10-00.01", "10-00.05", input_tokens=1_000, cached_input_tokens=0)
+    _write_turn(code_dir, "002", "10-00.09", "10-00.20", input_tokens=200, cached_input_tokens=1_000)
+    _write_turn(code_dir, "003", "10-00.30", "10-00.40", input_tokens=1_300, cached_input_tokens=100)
+    turns, _ = load_data(history, DAY_START, DAY_END, use_index=False)
+    model_info_map = {"gpt-5": {"input_cost_per_token": 1e-6, "cache_read_input_token_cost": 1e-7}}
+
+    report = gantt.compute_cache_report(turns, model_info_map)
+
+    cache_turns = report.turns["2024-05-01-10-00-00 Code first task"]
+    assert [cache_turn.missed_tokens for cache_turn in cache_turns] == [0, 0, 1_100]
+    assert [cache_turn.dropped for cache_turn in cache_turns] == [False, False, True]
+    assert cache_turns[2].miss_cost == pytest.approx(1_100 * 9e-7)
+    totals = report.models["gpt-5"]
+    assert (totals.drops, totals.hit_ratio) == (1, 1_100 / 3_600)
+    assert gantt.compute_cache_report(turns).directories["2024-05-01-10-00-00 Code first task"].miss_cost_missing
+
+
+def test_export_trace_nests_directories_under_their_root_group(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    turns, gaps = load_data(history, DAY_START, DAY_END, use_index=False)
+    trace_path = tmp_path / "trace.json.gz"
+
+    event_count = gantt.write_trace(trace_path, turns, gaps)
+
+    with gzip.open(trace_path, "rt", encoding="utf-8") as file:
+        events = json.load(file)["traceEvents"]
+    assert len(events) == event_count
+    threads = {event["args"]["name"]: (event["pid"], event["tid"]) for event in events if event["name"] == "thread_name"}
+    assert threads == {
+        "2024-05-01-10-00-00 Code first task": (1, 1),
+        "  2024-05-01-10-00-03 Ask nested question": (1, 2),
+    }
+    slices = [(event["tid"], event["ts"], event["dur"]) for event in events if event["ph"] == "X"]
+    assert sorted(slices)[0] == (1, gantt.epoch_ms(DAY_START.replace(hour=10, second=1)) * 1000, 4_000_000)
+    assert [event["ph"] for event in events if event.get("cat") == "gap"] == ["b", "e", "s", "f"]
+
+
+def test_render_static_chart_writes_nested_rows_gaps_and_buckets(tmp_path: Path) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    dense_dir = history / "2024-05-01-11-00-00 Code dense task"
+    dense_dir.mkdir()
+    for second in range(0, 40, 2):
+        _write_turn(dense_dir, f"{second + 1:03d}", f"11-00.{second:02d}", f"11-00.{second + 1:02d}")
+    turns, gaps = load_data(history, DAY_START, DAY_END, use_index=False)
+    chart_path = tmp_path / "chart.svg"
+
+    gantt.write_static_chart(chart_path, turns, gaps, plot_width=60)
+
+    namespace = "{http://www.w3.org/2000/svg}"
+    svg = ElementTree.parse(chart_path).getroot()
+    texts = [element.text for element in svg.iter(f"{namespace}text")]
+    assert "  Ask question [linked]" in texts
+    titles = [element.text for element in svg.iter(f"{namespace}title")]
+    assert "editFile\nrunTests" in titles
+    assert any(title.endswith(" turns") for title in titles)
+    assert "+3580s" in texts
+
+
+def test_load_data_reads_history_from_zip_archive_via_worktree_reference(tmp_path: Path, monkeypatch) -> None:
+    worktree = tmp_path / "brokkbench" / "run-1"
+    history = _write_history(worktree / ".brokk" / "llm-history")
+    expected_turns, expected_gaps = load_data(history, DAY_START, DAY_END, use_index=False)
+    archive_path = tmp_path / "brokkbench-archive" / "run-1.zip"
+    archive_path.parent.mkdir()
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path in sorted(worktree.rglob("*")):
+            if path.is_file() and path.name != HISTORY_INDEX_FILENAME:
+                archive.write(path, f"run-1/{path.relative_to(worktree).as_posix()}")
+    reference = tmp_path / "reference.json"
+    reference.write_text(json.dumps({"worktree": "brokkbench/run-1"}), encoding="utf-8")
+    shutil.rmtree(worktree)
+
+    history_root = gantt.open_history_root(reference)
+    cold_turns, cold_gaps = load_data(history_root, DAY_START, DAY_END, jobs=2)
+
+    assert isinstance(history_root, gantt.ArchivePath)
+    assert [gantt.turn_to_record(turn) for turn in cold_turns] == [gantt.turn_to_record(turn) for turn in expected_turns]
+    assert cold_gaps == expected_gaps
+    assert cold_turns[0].log_path.read_text().endswith("}\n")
+    assert archive_path.with_name(f"run-1.zip{HISTORY_INDEX_FILENAME}").is_file()
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("unchanged archive directories must be served from the index")
+
+    monkeypatch.setattr(gantt, "parse_metadata_from_log", fail)
+    warm_turns, _ = load_data(history_root, DAY_START, DAY_END)
+    assert warm_turns == cold_turns
+
+
+def test_load_history_roots_merges_roots_across_days_into_one_timeline(tmp_path: Path) -> None:
+    first = _write_history(tmp_path / "run-a" / ".brokk" / "llm-history")
+    second = tmp_path / "run-b" / ".brokk" / "llm-history"
+    code_dir = second / "2024-05-02-09-00-00 Code first task"
+    code_dir.mkdir(parents=True)
+    _write_turn(code_dir, "001", "09-00.01", "09-00.02")
+    _write_turn(code_dir, "002", "09-00.05", "09-00.09")
+    late_dir = second / "2024-05-01-10-00-02 Search late task"
+    late_dir.mkdir()
+    _write_turn(late_dir, "001", "10-00.02", "10-00.06")
+
+    roots = gantt.expand_history_patterns([str(tmp_path / "run-*" / ".brokk" / "llm-history")])
+    turns, gaps = gantt.load_history_roots(roots, DAY_START, datetime(2024, 5, 2, 23, 59), use_index=False)
+
+    assert roots == [first, second]
+    assert [(turn.directory_name.split("/")[0], turn.request_index) for turn in turns] == [
+        ("run-a", "001"),
+        ("run-b", "001"),
+        ("run-a", "001"),
+        ("run-a", "002"),
+        ("run-b", "001"),
+        ("run-b", "002"),
+    ]
+    assert [turn.request_ms for turn in turns] == sorted(turn.request_ms for turn in turns)
+    assert {gap.directory_name for gap in gaps} == {"run-a/2024-05-01-10-00-00 Code first task", "run-b/2024-05-02-09-00-00 Code first task"}
+    assert turns[-1].row_label == "run-b Code task"
+    assert gantt.parse_datetime_bound("2024-05-02", end_of_day=True) == datetime(2024, 5, 2, 23, 59, 59, 999999)
+
+
+def test_turn_filters_skip_reads_and_leave_the_index_alone(tmp_path: Path, monkeypatch) -> None:
+    history = _write_history(tmp_path / "llm-history")
+    opened_logs: list[str] = []
+    opened_requests: list[str] = []
+    parse_metadata = gantt.parse_metadata_from_log
+    parse_tools = gantt.parse_tool_names
+    monkeypatch.setattr(gantt, "parse_metadata_from_log", lambda path, totals=None: opened_logs.append(path.name) or parse_metadata(path, totals))
+    monkeypatch.setattr(gantt, "parse_tool_names", lambda path: opened_requests.append(path.name) or parse_tools(path))
+
+    ask_only = gantt.TurnFilter(optypes=frozenset({"ask"}))
+    turns, _ = load_data(history, DAY_START, DAY_END, turn_filter=ask_only)
+    assert [turn.directory_name for turn in turns] == ["2024-05-01-10-00-03 Ask nested question"]
+    assert opened_logs == ["10-00.04 001-Response.log"]
+    assert (history / HISTORY_INDEX_FILENAME).is_file()
+
+    (history / HISTORY_INDEX_FILENAME).unlink()
+    opened_logs.clear()
+    opened_requests.clear()
+    narrow = gantt.TurnFilter(models=("gpt-5",), min_duration_ms=5_000, tools=frozenset({"runTests"}))
+    turns, gaps = load_data(history, DAY_START, DAY_END, turn_filter=narrow)
+    assert [(turn.directory_name, turn.request_index) for turn in turns] == [("2024-05-01-10-00-00 Code first task", "002")]
+    assert gaps == []
+    assert opened_logs == ["10-00.20 002-Response.log"]
+    assert opened_requests == ["10-00.09 002-request.json"]
+    assert not (history / HISTORY_INDEX_FILENAME).exists()
+
+    load_data(history, DAY_START, DAY_END)
+    monkeypatch.setattr(gantt, "parse_metadata_from_log", None)
+    warm_turns, _ = load_data(history, DAY_START, DAY_END, turn_filter=narrow)
+    assert warm_turns == turns
+
+
+def test_model_filter_does_not_report_gaps_across_a_filtered_turn(tmp_path: Path) -> None:
+    history = tmp_path / "llm-history"
+    directory = history / "2024-05-01-10-00-00 Code mixed models"
+    directory.mkdir(parents=True)
+    _write_turn(directory, "001", "10-00.01", "10-00.05")
+    _write_turn(directory, "002", "10-00.06", "10-00.30", model="other-model")
+    _write_turn(directory, "003", "10-00.31", "10-00.40")
+    _write_turn(directory, "004", "10-00.42", "10-00.50")
+    gpt_only = gantt.TurnFilter(models=("gpt-5",))
+
+    for use_index in (False, True):
+        load_data(history, DAY_START, DAY_END, use_index=use_index)
+        turns, gaps = load_data(history, DAY_START, DAY_END, use_index=use_index, turn_filter=gpt_only)
+        assert [turn.request_index for turn in turns] == ["001", "003", "004"]
+        assert [(gap.from_request, gap.to_request) for gap in gaps] == [("003", "004")]
+
+    turns, _ = load_data(history, DAY_START, DAY_END, use_index=False, turn_filter=gpt_only)
+    follower = gantt.HistoryFollower(history, DAY_START, None, turns, turn_filter=gpt_only)
+    _write_turn(directory, "005", "10-00.52", "10-00.55", model="other-model")
+    _write_turn(directory, "006", "10-00.57", "10-00.59")
+    followed = follower.poll()[directory.name]
+    assert [turn.request_index for turn in followed] == ["001", "003", "004", "006"]
+    assert [(gap.from_request, gap.to_request) for gap in gantt.gather_gaps(followed)] == [("003", "004")]
+
+
+def test_log_document_indexes_sections_and_pages_without_splitting_utf8(tmp_path: Path) -> None:
+    text_body = "## Findings\n" + "é" * 10 + "\n"
+    log_path = tmp_path / "10-00.05 001-Response.log"
+    log_path.write_text(
+        f"# Request to gpt-5:\n\n## reasoningContent\nthinking\n\n## text\n{text_body}\n## metadata\n{{}}\n",
+        encoding="utf-8",
+    )
+
+    document = gantt.LogDocument(log_path)
+    try:
+        assert [section.name for section in document.sections] == ["reasoningContent", "text", "metadata"]
+        text_section = document.sections[1]
+        pages = []
+        offset = text_section.start
+        while offset < text_section.end:
+            page, offset = document.page(text_section, offset, limit=13)
+            pages.append(page)
+        assert pages[0] == "## Findings\né"
+        assert "".join(pages) == text_body + "\n"
+    finally:
+        document.close()
+
+    error_log = b"# Response:\n\n[Error: boom\n  at Llm.java:10]\n\n## reasoningContent\n\n## text\n\n## metadata\n{}\n"
+    error_sections = gantt.index_log_sections(error_log)
+    assert [section.name for section in error_sections] == ["response", "reasoningContent", "text", "metadata"]
+    assert error_log[error_sections[0].start : error_sections[0].end].strip() == b"[Error: boom\n  at Llm.java:10]"
+    assert gantt.index_log_sections(b"# Response:\n\n## text\nok\n")[0].name == "text"
+
+    assert gantt.index_log_sections(b"") == []
+    assert gantt.index_log_sections(b"plain output\n") == [gantt.LogSection("log", 0, 13)]
+
+
+def test_debug_records_stream_as_directories_load_with_the_summary_last(tmp_path: Path) -> None:
+    history_root = _write_history(tmp_path / "llm-history")
+    streamed = io.StringIO()
+    totals = gantt.DebugTotals()
+    gantt.print_debug(gantt.iter_history_directories([history_root], DAY_START, DAY_END), output=streamed, totals=totals)
+    records = [json.loads(line) for line in streamed.getvalue().splitlines()]
+
+    assert [record["type"] for record in records] == [
+        "debug_directory",
+        "turn",
+        "debug_directory",
+        "turn",
+        "turn",
+        "gap",
+        "model_usage",
+        "model_usage",
+        "debug_summary",
+    ]
+    code_directory = records[0]
+    assert (code_directory["turn_count"], code_directory["gap_count"]) == (2, 1)
+    assert code_directory["first_request"] == "2024-05-01T10:00:01"
+    assert code_directory["last_request"] == "2024-05-01T10:00:09"
+    turn_records = [record for record in records if record["type"] == "turn"]
+    assert [(record["turn_number"], record["request_index"]) for record in turn_records] == [(1, "001"), (2, "001"), (3, "002")]
+    assert turn_records[0]["directory"] == "2024-05-01-10-00-00 Code first task"
+    assert records[5]["from_request"] == "001"
+    assert (records[-1]["directory_count"], records[-1]["turn_count"], records[-1]["gap_count"]) == (2, 3, 1)
+    assert totals.concurrency.profile().peak >= 1
+
+    # turns already in memory, in any order, come out exactly as ingestion streams them
+    turns, _ = load_data(history_root, DAY_START, DAY_END)
+    in_memory = io.StringIO()
+    gantt.print_debug(gantt.directory_turn_groups(list(reversed(turns))), output=in_memory)
+    assert in_memory.getvalue() == streamed.getvalue()
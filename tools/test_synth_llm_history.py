@@ -0,0 +1,50 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import gantt
+from extract_turn import extract_turn_messages
+from synth_llm_history import SynthSpec, main, write_history
+
+
+def test_write_history_round_trips_through_load_data(tmp_path: Path) -> None:
+    spec = SynthSpec(
+        directories=4,
+        turns_per_directory=5,
+        request_bytes=2048,
+        log_bytes=512,
+        optypes=("Ask", "Search"),
+        code_session_turns=3,
+    )
+    summary = write_history(tmp_path, spec)
+
+    assert summary.directories == 5
+    assert summary.turns == 23
+    assert sum(path.stat().st_size for path in summary.history_root.rglob("*") if path.is_file()) == summary.bytes_written
+
+    day_start = spec.start.replace(hour=0, minute=0, second=0)
+    turns, gaps = gantt.load_data(summary.history_root, day_start, day_start + timedelta(days=1), use_index=False)
+
+    assert len(turns) == 23
+    assert {turn.optype for turn in turns} == {"Ask", "Search", "Code"}
+    assert all(turn.response_ms > turn.request_ms for turn in turns)
+    assert all(turn.model in spec.models for turn in turns)
+    assert len(gaps) == 23 - 5
+
+
+def test_write_history_code_session_is_readable_by_extract_turn(tmp_path: Path) -> None:
+    write_history(tmp_path, SynthSpec(directories=2, turns_per_directory=3, optypes=("Ask",), code_session_turns=4))
+
+    extracted = extract_turn_messages(tmp_path, 2)
+
+    assert extracted["messages"][1]["text"] == "Synthetic task, turn 2."
+
+
+def test_main_prints_summary(tmp_path: Path, capsys) -> None:
+    assert main([str(tmp_path / "wt"), "--directories", "2", "--turns-per-directory", "3", "--start", "2024-05-01T23:59:00"]) == 0
+
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["turns"] == 6
+    names = sorted(path.name for path in Path(summary["history_root"]).iterdir())
+    # the first directory would run past midnight, so it starts on the next day
+    assert [datetime.strptime(name[:19], "%Y-%m-%d-%H-%M-%S").day for name in names] == [2, 2]